@@ -0,0 +1,250 @@
+"""
+Benchmark lexing of visual polyhedra files.
+
+Compares the regex lexer in convert_visual_polyhedra.py against the original
+character-by-character lexer on every file in data/*.txt, and checks that both
+produce the same token stream.
+
+    uv run python -m scripts.benchmarks.bench_lexer
+"""
+
+import argparse
+import glob
+import time
+from typing import Optional
+
+from scripts.convert_visual_polyhedra import TokenType, VisualPolyhedraLexer
+
+
+# The lexer and token before the lexer was regex-driven
+class ReferenceToken:
+    def __init__(
+        self, ttype: TokenType, lexeme: Optional[str], pos: int, line: int, column: int
+    ) -> None:
+        self.ttype = ttype
+        self.lexeme = lexeme
+        self.pos = pos
+        self.line = line
+        self.column = column
+
+
+class ReferenceLexer:
+    def __init__(self) -> None:
+        self.tokenstream: list[ReferenceToken] = []
+        self.pos: int = 0
+
+    @staticmethod
+    def munch_num(
+        input: str, pos: int, line: int, column: int
+    ) -> tuple[ReferenceToken, int]:
+        lexeme = ""
+        offset = 0
+        while pos + offset < len(input) and input[pos + offset].isnumeric():
+            lexeme += input[pos + offset]
+            offset += 1
+
+        if pos + offset >= len(input) or input[pos + offset] != ".":
+            return (ReferenceToken(TokenType.INT, lexeme, pos, line, column), offset)
+        offset += 1
+        lexeme += "."
+
+        while pos + offset < len(input) and input[pos + offset].isnumeric():
+            lexeme += input[pos + offset]
+            offset += 1
+
+        return (ReferenceToken(TokenType.FLOAT, lexeme, pos, line, column), offset)
+
+    @staticmethod
+    def munch_name(
+        input: str, pos: int, line: int, column: int
+    ) -> tuple[ReferenceToken, int]:
+        if pos >= len(input) or not input[pos].isalpha():
+            raise Exception(f"Cannot parse name at position {pos}")
+
+        lexeme = input[pos]
+        offset = 1
+
+        while pos + offset < len(input) and input[pos + offset].isalnum():
+            lexeme += input[pos + offset]
+            offset += 1
+
+        return (ReferenceToken(TokenType.NAME, lexeme, pos, line, column), offset)
+
+    def lex(self, input: str):
+        i = 0
+        line = 1
+        column = 1
+        while i < len(input):
+            match input[i]:
+                case "(":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.LPAREN, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case ")":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.RPAREN, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "{":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.LBRACE, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "}":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.RBRACE, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "[":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.LSQUARE, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "]":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.RSQUARE, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "=":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.EQ, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "-":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.MINUS, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case ",":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.COMMA, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "*":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.STAR, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "+":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.PLUS, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "/":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.SLASH, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "^":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.CARET, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case ":":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.COLON, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case ";":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.SEMI, None, i, line, column)
+                    )
+                    i += 1
+                    column += 1
+                case "\n":
+                    self.tokenstream.append(
+                        ReferenceToken(TokenType.NEWLINE, None, i, line, column)
+                    )
+                    i += 1
+                    line += 1
+                    column = 1
+                case " " | "\t":
+                    i += 1
+                    column += 1
+                case "0" | "1" | "2" | "3" | "4" | "5" | "6" | "7" | "8" | "9":
+                    tok, offset = self.munch_num(input, i, line, column)
+                    self.tokenstream.append(tok)
+                    i += offset
+                    column += offset
+                case _:
+                    tok, offset = self.munch_name(input, i, line, column)
+                    self.tokenstream.append(tok)
+                    i += offset
+                    column += offset
+        self.tokenstream.append(ReferenceToken(TokenType.EOF, None, i, line, column))
+
+
+def reference_lex(content: str) -> list[ReferenceToken]:
+    lexer = ReferenceLexer()
+    lexer.lex(content)
+    return lexer.tokenstream
+
+
+def regex_lex(content: str) -> VisualPolyhedraLexer:
+    lexer = VisualPolyhedraLexer()
+    lexer.lex(content)
+    return lexer
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing")
+    args = parser.parse_args()
+
+    contents = []
+    for path in sorted(glob.glob("data/*.txt")):
+        if path.endswith("polyhedron_list.txt"):
+            continue
+        with open(path) as f:
+            contents.append(f.read())
+
+    num_tokens = 0
+    for content in contents:
+        expected = [
+            (t.ttype, t.lexeme, t.pos, t.line, t.column) for t in reference_lex(content)
+        ]
+        lexer = regex_lex(content)
+        tokens = [
+            (t.ttype, t.lexeme, t.pos, t.line, t.column) for t in lexer.tokenstream
+        ]
+        assert tokens == expected
+        num_tokens += len(tokens)
+
+    reference = best_of(lambda: [reference_lex(c) for c in contents], args.repeat)
+    regex = best_of(lambda: [regex_lex(c) for c in contents], args.repeat)
+    size = sum(len(c) for c in contents)
+    print(f"{len(contents)} files, {size / 1e6:.2f} MB, {num_tokens} tokens")
+    print(f"{'lexer':<12} {'time':>9} {'tokens/s':>12} {'speedup':>8}")
+    for name, seconds in [("reference", reference), ("regex", regex)]:
+        print(
+            f"{name:<12} {seconds:>8.4f}s {num_tokens / seconds:>12.0f} "
+            f"{reference / seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
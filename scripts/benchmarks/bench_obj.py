@@ -0,0 +1,121 @@
+"""
+Benchmark OBJ loading.
+
+Compares read_obj in vertexprint.py, buffered and memory-mapped, against the
+original line-by-line parse_obj loop on a synthetic torus scan with v/vt/vn
+face tokens.
+
+    uv run python -m scripts.benchmarks.bench_obj
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from scripts.benchmarks.meshes import torus
+from scripts.vertexprint import read_obj
+
+
+# The loop of parse_obj before read_obj, including its per-face print
+def reference_read_obj(filepath: str, echo: bool = True):
+    vertices = []
+    faces = []
+    with open(filepath, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            parts = line.split()
+            if not parts:
+                continue
+
+            if parts[0] == "v":
+                vertex = [float(x) for x in parts[1:4]]
+                vertices.append(vertex)
+            elif parts[0] == "f":
+                face = []
+                for vert_def in parts[1:]:
+                    indices = vert_def.split("/")[0]
+                    face.append(int(indices) - 1)
+                faces.append(face)
+                if echo:
+                    print(face)
+    return np.array(vertices, dtype=float), faces
+
+
+# Torus of rings x segments quads, with texture coordinates and normals
+def write_torus_obj(path: str, rings: int, segments: int) -> int:
+    points, normals, quads = torus(rings, segments)
+    quads = np.array(quads) + 1
+
+    with open(path, "w") as f:
+        f.write("# synthetic torus\n")
+        for x, y, z in points:
+            f.write(f"v {x:.6f} {y:.6f} {z:.6f}\n")
+        for x, y, z in normals:
+            f.write(f"vn {x:.6f} {y:.6f} {z:.6f}\n")
+        f.write("vt 0 0\n")
+        for quad in quads:
+            f.write("f " + " ".join(f"{k}/1/{k}" for k in quad) + "\n")
+    return len(quads)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing")
+    parser.add_argument(
+        "--faces", type=int, default=200_000, help="Approximate number of faces"
+    )
+    args = parser.parse_args()
+
+    segments = 200
+    rings = max(args.faces // segments, 3)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "torus.obj")
+        num_faces = write_torus_obj(path, rings, segments)
+        size = os.path.getsize(path)
+
+        vertices, faces = reference_read_obj(path, echo=False)
+        for memory_map in (False, True):
+            mesh = read_obj(path, memory_map=memory_map)
+            assert np.array_equal(mesh.vertices, vertices)
+            assert mesh.faces() == faces
+
+        def reference():
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    reference_read_obj(path)
+
+        timings = {
+            "reference": best_of(reference, args.repeat),
+            "reference, no print": best_of(
+                lambda: reference_read_obj(path, echo=False), args.repeat
+            ),
+            "read_obj": best_of(lambda: read_obj(path, memory_map=False), args.repeat),
+            "read_obj, mmap": best_of(
+                lambda: read_obj(path, memory_map=True), args.repeat
+            ),
+        }
+
+    print(f"{num_faces} faces, {size / 1e6:.1f} MB")
+    print(f"{'reader':<24} {'time':>9} {'speedup':>8}")
+    for name, seconds in timings.items():
+        print(f"{name:<24} {seconds:>8.4f}s {timings['reference'] / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark how the Polyhedron pipeline scales with mesh size.
+
+Times parsing, the edge table, adjacency, vertex figure annotation and its
+signatures, edge lengths and OpenSCAD argument serialization on the catalog
+solids in data/ and on geodesic icospheres and quad tori of growing size, and
+reports throughput and traced memory per vertex.
+
+    uv run python -m scripts.benchmarks.bench_pipeline --max-faces 1500000
+"""
+
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import scripts.vertexprint as vertexprint
+from scripts.benchmarks.meshes import icosphere, torus, write_obj
+from scripts.convert_visual_polyhedra import parse_visual_polyhedra_file
+from scripts.vertexprint import GlobalOptions, OpenscadArgs, Polyhedron, Profiler
+
+STAGES = [
+    "parse",
+    "edge_table",
+    "adjacency",
+    "annotate_vertex_figures",
+    "signatures",
+    "compute_edge_lengths",
+    "serialize",
+]
+
+
+# A benchmark mesh. parse() reads it from disk and returns name, vertices and
+# faces for the Polyhedron constructor.
+class Case:
+    def __init__(self, name: str, family: str, parse) -> None:
+        self.name: str = name
+        self.family: str = family
+        self.parse = parse
+
+
+def catalog_cases() -> list[Case]:
+    cases = []
+    for path in sorted(glob.glob("data/*.txt")):
+        if path.endswith("polyhedron_list.txt"):
+            continue
+
+        def parse(path=path):
+            solid = parse_visual_polyhedra_file(path)
+            return solid.name, np.array(solid.vertices), solid.faces
+
+        cases.append(Case(os.path.basename(path)[:-4], "catalog", parse))
+    return cases
+
+
+def obj_case(directory: str, name: str, family: str, vertices, faces) -> Case:
+    path = os.path.join(directory, f"{name}.obj")
+    write_obj(path, vertices, faces)
+
+    def parse():
+        mesh = vertexprint.read_obj(path)
+        return name, mesh.vertices, mesh.faces()
+
+    return Case(name, family, parse)
+
+
+# Icospheres and tori of about the same face counts, up to max_faces
+def synthetic_cases(directory: str, max_faces: int) -> list[Case]:
+    cases = []
+    level = 0
+    while 20 * 4**level <= max_faces:
+        vertices, faces = icosphere(level)
+        cases.append(
+            obj_case(directory, f"icosphere{level}", "icosphere", vertices, faces)
+        )
+        side = max(int(round((20 * 4**level) ** 0.5)), 3)
+        vertices, _, quads = torus(side, side)
+        cases.append(
+            obj_case(directory, f"torus{side}x{side}", "torus", vertices, quads)
+        )
+        level += 1
+    return cases
+
+
+# Seconds per stage for one run of the pipeline on case, measured with a
+# fresh Profiler
+def run_stages(case: Case, options: GlobalOptions) -> tuple[dict[str, float], int]:
+    profiler = Profiler()
+    profiler.start()
+    vertexprint.PROFILER = profiler
+    with profiler.stage("parse"):
+        name, vertices, faces = case.parse()
+    polyhedron = Polyhedron(name, vertices, faces, options)
+    with profiler.stage("serialize"):
+        OpenscadArgs(polyhedron, options).mesh_assignments()
+    vertexprint.PROFILER = Profiler()
+
+    seconds = dict.fromkeys(STAGES, 0.0)
+    for record in profiler.finished():
+        seconds[record.name] += record.wall
+    return seconds, len(vertices)
+
+
+# Peak traced bytes while parsing and building the Polyhedron
+def peak_memory(case: Case, options: GlobalOptions) -> int:
+    tracemalloc.start()
+    try:
+        name, vertices, faces = case.parse()
+        Polyhedron(name, vertices, faces, options)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing")
+    parser.add_argument(
+        "--max-faces",
+        type=int,
+        default=100_000,
+        help="Largest synthetic mesh, in faces (default 100000)",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracemalloc pass"
+    )
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    options = GlobalOptions()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        cases = catalog_cases() + synthetic_cases(directory, args.max_faces)
+        print(
+            f"{'mesh':<32} {'vertices':>9} "
+            + " ".join(f"{stage[:9]:>9}" for stage in STAGES)
+            + f" {'vertices/s':>11} {'B/vertex':>9}"
+        )
+        for case in cases:
+            runs = [run_stages(case, options) for _ in range(args.repeat)]
+            num_vertices = runs[0][1]
+            seconds = {stage: min(run[stage] for run, _ in runs) for stage in STAGES}
+            # Signatures are part of annotate_vertex_figures
+            total = sum(seconds.values()) - seconds["signatures"]
+            memory = None if args.no_memory else peak_memory(case, options)
+            results.append(
+                {
+                    "mesh": case.name,
+                    "family": case.family,
+                    "vertices": num_vertices,
+                    "seconds": seconds,
+                    "vertices_per_second": num_vertices / total,
+                    "bytes_per_vertex": (
+                        None if memory is None else memory / num_vertices
+                    ),
+                }
+            )
+            print(
+                f"{case.name:<32} {num_vertices:>9} "
+                + " ".join(f"{seconds[stage]:>8.4f}s" for stage in STAGES)
+                + f" {num_vertices / total:>11.0f} "
+                + ("-" if memory is None else f"{memory / num_vertices:>9.0f}")
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"time": time.time(), "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark what the SCAD library costs each OpenSCAD process.
+
+Every holder render is a fresh OpenSCAD process that parses and evaluates
+vertex_holders.scad and solids.scad. This times a process that calls one
+function from each of them, with the library as it is and with the catalog
+solids of scad/catalog folded back into a geometry.scad that both include, as
+they did before the catalog was split out.
+
+    uv run python -m scripts.benchmarks.bench_scad_parse
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+# Evaluates the top-level assignments of both files, as rendering a holder does
+DRIVER = """use <vertex_holders.scad>
+use <solids.scad>
+echo(direction_to_euler([0, 0, 1]), max_dist([[1, 0, 0]]));
+"""
+
+
+# Copy of scad/ where vertex_holders.scad and solids.scad include every
+# catalog solid
+def monolithic_library(directory: str) -> None:
+    lines = ["include <geometry_utils.scad>\n"]
+    for path in sorted(glob.glob(os.path.join(directory, "catalog", "*.scad"))):
+        with open(path) as f:
+            lines += [line for line in f if not line.startswith(("//", "include <"))]
+        lines.append("\n")
+    with open(os.path.join(directory, "geometry.scad"), "w") as f:
+        f.writelines(lines)
+    for name in ["vertex_holders.scad", "solids.scad"]:
+        path = os.path.join(directory, name)
+        with open(path) as f:
+            source = f.read()
+        with open(path, "w") as f:
+            f.write("include <geometry.scad>\n" + source)
+
+
+# Lines of the library files that a render parses
+def library_lines(directory: str) -> int:
+    names = ["interface.scad", "vertex_holders.scad", "solids.scad", "constants.scad"]
+    if os.path.exists(os.path.join(directory, "geometry.scad")):
+        names += ["geometry.scad", "geometry_utils.scad"]
+    total = 0
+    for name in names:
+        with open(os.path.join(directory, name)) as f:
+            total += sum(1 for _ in f)
+    return total
+
+
+def median_run(directory: str, repeat: int) -> float:
+    driver = os.path.join(directory, "driver.scad")
+    with open(driver, "w") as f:
+        f.write(DRIVER)
+    output = os.path.join(directory, "driver.echo")
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            ["openscad", "-o", output, driver],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per timing")
+    parser.add_argument(
+        "--vertices",
+        type=int,
+        default=120,
+        help="Holder renders to scale the saving to (default 120)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        split = os.path.join(directory, "split")
+        monolithic = os.path.join(directory, "monolithic")
+        shutil.copytree("scad", split)
+        shutil.copytree("scad", monolithic)
+        monolithic_library(monolithic)
+
+        print(f"{'library':<12} {'lines':>7} {'median':>9}")
+        timings = {}
+        for name, path in [("monolithic", monolithic), ("split", split)]:
+            timings[name] = median_run(path, args.repeat)
+            print(f"{name:<12} {library_lines(path):>7} {timings[name]:>8.3f}s")
+
+    saved = timings["monolithic"] - timings["split"]
+    print(
+        f"saved {saved * 1e3:.1f} ms per process, "
+        f"{saved * args.vertices:.1f} s over {args.vertices} holder renders"
+    )
+
+
+if __name__ == "__main__":
+    main()
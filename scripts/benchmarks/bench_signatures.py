@@ -0,0 +1,147 @@
+"""
+Benchmark vertex figure signatures used for tag grouping.
+
+Compares the vectorized signatures in vertexprint.py against the original
+per-vertex triple loop on the catalog solids in data/ and on synthetic
+high-valence vertex figures.
+
+    uv run python -m scripts.benchmarks.bench_signatures
+"""
+
+import argparse
+import glob
+import time
+
+import numpy as np
+
+from scripts.convert_visual_polyhedra import parse_visual_polyhedra_file
+from scripts.vertexprint import (
+    GlobalOptions,
+    Polyhedron,
+    VertexAdjacency,
+    VertexFigureEngine,
+    signature_blake2b,
+    signature_bytes,
+)
+
+
+# The signature computed by Polyhedron.vertex_figure_signature before it was
+# vectorized
+def reference_signature(vecs) -> tuple[int, ...]:
+    precision = 100000
+    n = len(vecs)
+    dots = sorted(
+        [
+            round(np.dot(vecs[i], vecs[j]) * precision)
+            for i in range(n)
+            for j in range(i, n)
+        ]
+    )
+    triples = sorted(
+        [
+            round(np.dot(np.cross(vecs[i], vecs[j]), vecs[k]) * precision)
+            for i in range(n)
+            for j in range(n)
+            for k in range(n)
+        ]
+    )
+    return tuple(dots + triples)
+
+
+def reference_tags(engine: VertexFigureEngine) -> list[int]:
+    tags: dict[tuple[int, ...], int] = {}
+    result = []
+    for i in range(len(engine.adjacency)):
+        signature = reference_signature(engine.vecs[engine.figure_slice(i)])
+        result.append(tags.setdefault(signature, len(tags)))
+    return result
+
+
+def vectorized_tags(engine: VertexFigureEngine, signature_hash) -> list[int]:
+    tags: dict = {}
+    keys = engine.signatures(signature_hash)
+    return [tags.setdefault(key, len(tags)) for key in keys]
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def catalog_engines() -> list[tuple[str, VertexFigureEngine]]:
+    engines = []
+    options = GlobalOptions()
+    for path in sorted(glob.glob("data/*.txt")):
+        if path.endswith("polyhedron_list.txt"):
+            continue
+        solid = parse_visual_polyhedra_file(path)
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        engine = VertexFigureEngine(
+            polyhedron.vertices, polyhedron.adjacency, options
+        )
+        engines.append((solid.name, engine))
+    return engines
+
+
+# num_vertices hubs, each joined to `degree` random leaves
+def synthetic_engine(num_vertices: int, degree: int) -> tuple[str, VertexFigureEngine]:
+    rng = np.random.default_rng(0)
+    hubs = rng.normal(size=(num_vertices, 3))
+    leaves = hubs[:, np.newaxis] + rng.normal(size=(num_vertices, degree, 3))
+    vertices = np.concatenate([hubs, leaves.reshape(-1, 3)])
+    edges = [
+        (hub, num_vertices + hub * degree + j)
+        for hub in range(num_vertices)
+        for j in range(degree)
+    ]
+    adjacency = VertexAdjacency.from_edges(len(vertices), edges)
+    return (
+        f"synthetic_{num_vertices}x{degree}",
+        VertexFigureEngine(vertices, adjacency, GlobalOptions()),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing")
+    args = parser.parse_args()
+
+    cases = catalog_engines() + [
+        synthetic_engine(500, 6),
+        synthetic_engine(100, 12),
+    ]
+
+    print(
+        f"{'mesh':<40} {'vertices':>9} {'reference':>10} {'bytes':>10} "
+        f"{'blake2b':>10} {'speedup':>8}"
+    )
+    total_reference = 0.0
+    total_vectorized = 0.0
+    for name, engine in cases:
+        expected = reference_tags(engine)
+        assert vectorized_tags(engine, signature_bytes) == expected, name
+        assert vectorized_tags(engine, signature_blake2b) == expected, name
+
+        reference = best_of(lambda: reference_tags(engine), args.repeat)
+        vectorized = best_of(lambda: vectorized_tags(engine, signature_bytes), args.repeat)
+        hashed = best_of(lambda: vectorized_tags(engine, signature_blake2b), args.repeat)
+        total_reference += reference
+        total_vectorized += vectorized
+        print(
+            f"{name:<40} {len(engine.adjacency):>9} {reference:>9.4f}s "
+            f"{vectorized:>9.4f}s {hashed:>9.4f}s {reference / vectorized:>7.1f}x"
+        )
+    print(
+        f"{'total':<40} {'':>9} {total_reference:>9.4f}s {total_vectorized:>9.4f}s "
+        f"{'':>10} {total_reference / total_vectorized:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark vertexprint CLI startup.
+
+Times a dry-run preview of the cube in fresh interpreters, next to a bare
+interpreter and to importing the slow modules that vertexprint.py only imports
+in the stages that use them.
+
+    uv run python -m scripts.benchmarks.bench_startup
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from scripts.convert_visual_polyhedra import parse_visual_polyhedra_file
+
+SLOW_MODULES = ["matplotlib.pyplot", "pymeshlab", "stl_reader", "cairo"]
+
+
+def median_run(command: list[str], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cube = os.path.join(directory, "cube.obj")
+        parse_visual_polyhedra_file("data/Cube.txt").to_obj(cube)
+
+        cases = {
+            "interpreter": [sys.executable, "-c", "pass"],
+            "slow modules": [
+                sys.executable,
+                "-c",
+                "; ".join(f"import {name}" for name in SLOW_MODULES),
+            ],
+            "dry-run preview": [
+                sys.executable,
+                "scripts/vertexprint.py",
+                "--file",
+                cube,
+                "--dry-run",
+            ],
+        }
+        timings = {
+            name: median_run(command, args.repeat) for name, command in cases.items()
+        }
+
+    print(f"{'run':<20} {'median':>9}")
+    for name, seconds in timings.items():
+        print(f"{name:<20} {seconds:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Synthetic meshes for the benchmarks.
+
+Geodesic icospheres and quad tori of any size, as a vertex array and a list
+of faces, and a plain OBJ writer for them.
+"""
+
+import numpy as np
+
+ICOSAHEDRON_FACES = [
+    [0, 11, 5],
+    [0, 5, 1],
+    [0, 1, 7],
+    [0, 7, 10],
+    [0, 10, 11],
+    [1, 5, 9],
+    [5, 11, 4],
+    [11, 10, 2],
+    [10, 7, 6],
+    [7, 1, 8],
+    [3, 9, 4],
+    [3, 4, 2],
+    [3, 2, 6],
+    [3, 6, 8],
+    [3, 8, 9],
+    [4, 9, 5],
+    [2, 4, 11],
+    [6, 2, 10],
+    [8, 6, 7],
+    [9, 8, 1],
+]
+
+
+# Unit icosahedron with each triangle split into four `level` times, 20 * 4**level
+# outward-facing triangles
+def icosphere(level: int) -> tuple[np.ndarray, list[list[int]]]:
+    t = (1 + 5**0.5) / 2
+    vertices = np.array(
+        [
+            [-1, t, 0],
+            [1, t, 0],
+            [-1, -t, 0],
+            [1, -t, 0],
+            [0, -1, t],
+            [0, 1, t],
+            [0, -1, -t],
+            [0, 1, -t],
+            [t, 0, -1],
+            [t, 0, 1],
+            [-t, 0, -1],
+            [-t, 0, 1],
+        ]
+    )
+    vertices /= np.linalg.norm(vertices, axis=1)[:, np.newaxis]
+    faces = np.array(ICOSAHEDRON_FACES)
+    for _ in range(level):
+        a, b, c = faces.T
+        sides = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]]]), axis=1)
+        sides = np.concatenate([sides, np.sort(faces[:, [2, 0]], axis=1)])
+        unique, inverse = np.unique(sides, axis=0, return_inverse=True)
+        midpoints = vertices[unique].mean(axis=1)
+        midpoints /= np.linalg.norm(midpoints, axis=1)[:, np.newaxis]
+        ab, bc, ca = (len(vertices) + inverse).reshape(3, -1)
+        vertices = np.concatenate([vertices, midpoints])
+        faces = np.concatenate(
+            [
+                np.stack([a, ab, ca], axis=1),
+                np.stack([b, bc, ab], axis=1),
+                np.stack([c, ca, bc], axis=1),
+                np.stack([ab, bc, ca], axis=1),
+            ]
+        )
+    return vertices, faces.tolist()
+
+
+# Torus of rings x segments quads around the z axis, with outward normals
+def torus(
+    rings: int, segments: int, major: float = 3.0
+) -> tuple[np.ndarray, np.ndarray, list[list[int]]]:
+    u = 2 * np.pi * np.arange(rings) / rings
+    v = 2 * np.pi * np.arange(segments) / segments
+    uu, vv = np.meshgrid(u, v, indexing="ij")
+    normals = np.stack(
+        [np.cos(uu) * np.cos(vv), np.sin(uu) * np.cos(vv), np.sin(vv)], axis=-1
+    ).reshape(-1, 3)
+    centers = np.stack([np.cos(uu), np.sin(uu), np.zeros_like(uu)], axis=-1)
+    vertices = (major * centers).reshape(-1, 3) + normals
+
+    i, j = np.meshgrid(np.arange(rings), np.arange(segments), indexing="ij")
+    corners = [
+        i * segments + j,
+        ((i + 1) % rings) * segments + j,
+        ((i + 1) % rings) * segments + (j + 1) % segments,
+        i * segments + (j + 1) % segments,
+    ]
+    quads = np.stack([c.ravel() for c in corners], axis=1)
+    return vertices, normals, quads.tolist()
+
+
+def write_obj(path: str, vertices: np.ndarray, faces: list[list[int]]) -> None:
+    with open(path, "w") as f:
+        for x, y, z in vertices:
+            f.write(f"v {x:.6f} {y:.6f} {z:.6f}\n")
+        for face in faces:
+            f.write("f " + " ".join(str(k + 1) for k in face) + "\n")
@@ -1,4 +1,12 @@
 import argparse
+import glob
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from typing import Optional
 
@@ -26,17 +34,36 @@ class TokenType(Enum):
     SEMI = 20
 
 
+# 1-based line and column of pos in source; (-1, -1) for tokens that the
+# parser made up
+def line_and_column(source: str, pos: int) -> tuple[int, int]:
+    if pos < 0:
+        return (-1, -1)
+    line_start = source.rfind("\n", 0, pos) + 1
+    return (source.count("\n", 0, pos) + 1, pos - line_start + 1)
+
+
 # A subset of openscad's tokens, plus tokens for David McCooey's visual
-# polyhedra files
+# polyhedra files. Tokens keep a reference to the lexed source so that their
+# line and column are only computed when an error message needs them.
 class Token:
+    __slots__ = ("ttype", "lexeme", "pos", "source")
+
     def __init__(
-        self, ttype: TokenType, lexeme: Optional[str], pos: int, line: int, column: int
+        self, ttype: TokenType, lexeme: Optional[str], pos: int, source: str = ""
     ) -> None:
         self.ttype = ttype
         self.lexeme = lexeme
         self.pos = pos
-        self.line = line
-        self.column = column
+        self.source = source
+
+    @property
+    def line(self) -> int:
+        return line_and_column(self.source, self.pos)[0]
+
+    @property
+    def column(self) -> int:
+        return line_and_column(self.source, self.pos)[1]
 
     def literal(self) -> str:
         match self.ttype:
@@ -131,185 +158,160 @@ class VisualPolyhedron:
             vertices.append(evaluated)
         return vertices
 
-    def to_obj(self, filepath: str) -> None:
-        vertices = self.vertices
-        faces = self.faces
+    def obj_lines(self) -> list[str]:
+        lines = [f"v {v[0]} {v[1]} {v[2]}\n" for v in self.vertices]
+        for face in self.faces:
+            # OBJ faces are 1-indexed
+            face_str = " ".join(str(int(v) + 1) for v in face)
+            lines.append(f"f {face_str}\n")
+        return lines
 
+    def to_obj(self, filepath: str) -> None:
         with open(filepath, "w") as f:
-            for v in vertices:
-                f.write(f"v {v[0]} {v[1]} {v[2]}\n")
-
-            for face in faces:
-                # OBJ faces are 1-indexed
-                face_str = " ".join(str(int(v) + 1) for v in face)
-                f.write(f"f {face_str}\n")
-
+            f.writelines(self.obj_lines())
+
+    # Sorted (low, high) vertex pairs of the face boundaries
+    def edges(self) -> list[tuple[int, int]]:
+        edges = set()
+        for face in self.faces:
+            indices = [int(v) for v in face]
+            for a, b in zip(indices, indices[1:] + indices[:1]):
+                edges.add((min(a, b), max(a, b)))
+        return sorted(edges)
+
+    # OpenSCAD definitions of <name>_vertices and <name>_edges, with the
+    # constants as exact expressions where the source gives them. Meant to be
+    # written to scad/catalog, next to geometry_utils.scad
+    def scad_lines(self) -> list[str]:
+        prefix = scad_identifier(self.name)
+
+        def expression(tokens: list[Token]) -> str:
+            return "".join(
+                (
+                    f"{prefix}_{token.lexeme}"
+                    if token.ttype == TokenType.NAME
+                    and token.lexeme in self.constant_floats
+                    else token.literal()
+                )
+                for token in tokens
+            )
 
-# Lex Visual Polyhedra files
+        lines = ["include <../geometry_utils.scad>\n"]
+        for const in self.constant_sequence:
+            exact = self.constant_exacts[const]
+            value = expression(exact) if exact else repr(self.constant_floats[const])
+            lines.append(f"{prefix}_{const}={value};\n")
+        lines.append(f"{prefix}_vertices=[\n")
+        lines += [
+            f"{expression(tokens)},\n" for tokens in self.vertex_tokenstream.values()
+        ]
+        lines.append("];\n")
+        lines.append(f"{prefix}_edges=[\n")
+        lines += [f"[{a},{b}],\n" for a, b in self.edges()]
+        lines.append("];\n")
+        return lines
+
+    def to_scad(self, filepath: str) -> None:
+        with open(filepath, "w") as f:
+            f.writelines(self.scad_lines())
+
+
+# "Snub Cube (laevo)" -> "snub_cube_laevo"
+def scad_identifier(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+PUNCTUATION = {
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "{": TokenType.LBRACE,
+    "}": TokenType.RBRACE,
+    "[": TokenType.LSQUARE,
+    "]": TokenType.RSQUARE,
+    "=": TokenType.EQ,
+    "-": TokenType.MINUS,
+    ",": TokenType.COMMA,
+    "*": TokenType.STAR,
+    "+": TokenType.PLUS,
+    "/": TokenType.SLASH,
+    "^": TokenType.CARET,
+    ":": TokenType.COLON,
+    ";": TokenType.SEMI,
+    "\n": TokenType.NEWLINE,
+}
+
+# Blanks before a token are consumed with it. Group 1 is a float, 2 an int
+# (numbers start with an ASCII digit; a "." makes them floats), 3 a name (a
+# letter followed by letters and digits), 4 punctuation and 5 anything else.
+TOKEN_PATTERN = re.compile(
+    r"[ \t]*(?:"
+    r"([0-9]\d*\.\d*)"
+    r"|([0-9]\d*)"
+    r"|([^\W\d_][^\W_]*)"
+    r"|([(){}\[\]=\-,*+/^:;\n])"
+    r"|(.))",
+    re.DOTALL,
+)
+TOKEN_GROUP_TYPES = (None, TokenType.FLOAT, TokenType.INT, TokenType.NAME)
+
+
+# Lex Visual Polyhedra files. Tokens are stored as parallel lists of types,
+# lexemes and positions; Token objects are only built by get and peek.
 class VisualPolyhedraLexer:
     def __init__(self) -> None:
-        self.tokenstream: list[Token] = []
+        self.source: str = ""
+        self.ttypes: list[TokenType] = []
+        self.lexemes: list[Optional[str]] = []
+        self.positions: list[int] = []
         self.pos: int = 0
 
-    @staticmethod
-    def munch_num(input: str, pos: int, line: int, column: int) -> tuple[Token, int]:
-        lexeme = ""
-        offset = 0
-        while pos + offset < len(input) and input[pos + offset].isnumeric():
-            lexeme += input[pos + offset]
-            offset += 1
-
-        if pos + offset >= len(input) or input[pos + offset] != ".":
-            return (Token(TokenType.INT, lexeme, pos, line, column), offset)
-        offset += 1
-        lexeme += "."
-
-        while pos + offset < len(input) and input[pos + offset].isnumeric():
-            lexeme += input[pos + offset]
-            offset += 1
-
-        return (Token(TokenType.FLOAT, lexeme, pos, line, column), offset)
-
-    @staticmethod
-    def munch_name(input: str, pos: int, line: int, column: int) -> tuple[Token, int]:
-        if pos >= len(input) or not input[pos].isalpha():
-            raise Exception(f"Cannot parse name at position {pos}")
-
-        lexeme = input[pos]
-        offset = 1
-
-        while pos + offset < len(input) and input[pos + offset].isalnum():
-            lexeme += input[pos + offset]
-            offset += 1
-
-        return (Token(TokenType.NAME, lexeme, pos, line, column), offset)
+    @property
+    def tokenstream(self) -> list[Token]:
+        return [self.token(i) for i in range(len(self.ttypes))]
 
     def lex(self, input: str):
-        i = 0
-        line = 1
-        column = 1
-        while i < len(input):
-            match input[i]:
-                case "(":
-                    self.tokenstream.append(
-                        Token(TokenType.LPAREN, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case ")":
-                    self.tokenstream.append(
-                        Token(TokenType.RPAREN, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "{":
-                    self.tokenstream.append(
-                        Token(TokenType.LBRACE, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "}":
-                    self.tokenstream.append(
-                        Token(TokenType.RBRACE, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "[":
-                    self.tokenstream.append(
-                        Token(TokenType.LSQUARE, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "]":
-                    self.tokenstream.append(
-                        Token(TokenType.RSQUARE, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "=":
-                    self.tokenstream.append(Token(TokenType.EQ, None, i, line, column))
-                    i += 1
-                    column += 1
-                case "-":
-                    self.tokenstream.append(
-                        Token(TokenType.MINUS, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case ",":
-                    self.tokenstream.append(
-                        Token(TokenType.COMMA, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "*":
-                    self.tokenstream.append(
-                        Token(TokenType.STAR, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "+":
-                    self.tokenstream.append(
-                        Token(TokenType.PLUS, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "/":
-                    self.tokenstream.append(
-                        Token(TokenType.SLASH, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "^":
-                    self.tokenstream.append(
-                        Token(TokenType.CARET, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case ":":
-                    self.tokenstream.append(
-                        Token(TokenType.COLON, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case ";":
-                    self.tokenstream.append(
-                        Token(TokenType.SEMI, None, i, line, column)
-                    )
-                    i += 1
-                    column += 1
-                case "\n":
-                    self.tokenstream.append(
-                        Token(TokenType.NEWLINE, None, i, line, column)
-                    )
-                    i += 1
-                    line += 1
-                    column = 1
-                case " " | "\t":
-                    i += 1
-                    column += 1
-                case "0" | "1" | "2" | "3" | "4" | "5" | "6" | "7" | "8" | "9":
-                    (tok, offset) = self.munch_num(input, i, line, column)
-                    self.tokenstream.append(tok)
-                    i += offset
-                    column += offset
-                case _:
-                    (tok, offset) = self.munch_name(input, i, line, column)
-                    self.tokenstream.append(tok)
-                    i += offset
-                    column += offset
-        self.tokenstream.append(Token(TokenType.EOF, None, i, line, column))
+        self.source = input
+        ttypes = self.ttypes
+        lexemes = self.lexemes
+        positions = self.positions
+        for match in TOKEN_PATTERN.finditer(input):
+            group = match.lastindex
+            if group == 4:
+                ttypes.append(PUNCTUATION[match[4]])
+                lexemes.append(None)
+            elif group == 5:
+                pos = match.start(5)
+                line, column = line_and_column(input, pos)
+                raise Exception(
+                    f"Cannot parse name at position {pos} "
+                    f"(line {line}, column {column})"
+                )
+            else:
+                ttypes.append(TOKEN_GROUP_TYPES[group])
+                lexemes.append(match[group])
+            positions.append(match.start(group))
+        ttypes.append(TokenType.EOF)
+        lexemes.append(None)
+        positions.append(len(input))
+
+    def token(self, i: int) -> Token:
+        return Token(self.ttypes[i], self.lexemes[i], self.positions[i], self.source)
 
     def get(self) -> Token:
-        token = self.tokenstream[self.pos]
+        token = self.token(self.pos)
         self.pos += 1
         return token
 
     def peek(self, i: int) -> Token:
         assert i >= 0
-        assert self.pos + i <= len(self.tokenstream)
-        token = self.tokenstream[self.pos + i - 1]
-        return token
+        assert self.pos + i <= len(self.ttypes)
+        return self.token(self.pos + i - 1)
+
+    # Type of peek(i), without building a Token
+    def peek_ttype(self, i: int) -> TokenType:
+        assert i >= 0
+        assert self.pos + i <= len(self.ttypes)
+        return self.ttypes[self.pos + i - 1]
 
 
 # Constant definitions in visual polyhedra files can be followed by a 'where'
@@ -378,18 +380,18 @@ class VisualPolyhedraParser:
 
     def linebreak(self):
         self.expect(TokenType.NEWLINE)
-        while self.lexer.peek(1).ttype == TokenType.NEWLINE:
+        while self.lexer.peek_ttype(1) == TokenType.NEWLINE:
             self.expect(TokenType.NEWLINE)
 
     # name_def := names* \n
     def name_def(self):
         names = []
-        while self.lexer.peek(1).ttype in {
+        while self.lexer.peek_ttype(1) in {
             TokenType.NAME,
             TokenType.LPAREN,
             TokenType.RPAREN,
         }:
-            match self.lexer.peek(1).ttype:
+            match self.lexer.peek_ttype(1):
                 case TokenType.NAME:
                     names.append(self.expect(TokenType.NAME).lexeme)
                 case TokenType.LPAREN:
@@ -410,22 +412,22 @@ class VisualPolyhedraParser:
         exactv: list[Token] = []
 
         self.expect(TokenType.EQ)
-        ttype = self.lexer.peek(1).ttype
+        ttype = self.lexer.peek_ttype(1)
         if ttype == TokenType.FLOAT:
             floatv = float(self.expect(TokenType.FLOAT).literal())
-            ttype = self.lexer.peek(1).ttype
+            ttype = self.lexer.peek_ttype(1)
 
             if ttype == TokenType.NEWLINE:
                 pass
             elif ttype == TokenType.EQ:
                 self.expect(TokenType.EQ)
-                while self.is_expression_ttype(self.lexer.peek(1).ttype):
+                while self.is_expression_ttype(self.lexer.peek_ttype(1)):
                     exactv.append(self.expect_expression())
             else:
                 self.syntax_error()
 
         elif self.is_expression_ttype(ttype):
-            while self.is_expression_ttype(self.lexer.peek(1).ttype):
+            while self.is_expression_ttype(self.lexer.peek_ttype(1)):
                 exactv.append(self.expect_expression())
 
         self.linebreak()
@@ -436,7 +438,9 @@ class VisualPolyhedraParser:
             region == ConstantRegion.WHERE and const not in self.constant_where_sequence
         ):
             self.constant_where_sequence.append(const)
-        if const not in self.constant_exacts:
+        # Sources list the decimal values first and repeat the constants with
+        # their exact expressions
+        if not self.constant_exacts.get(const):
             self.constant_exacts[const] = exactv
         if const not in self.constant_floats:
             self.constant_floats[const] = float(floatv)
@@ -457,10 +461,10 @@ class VisualPolyhedraParser:
     # value := -? [name|int|float]
     def value(self) -> list[Token]:
         token_list = []
-        if self.lexer.peek(1).ttype == TokenType.MINUS:
+        if self.lexer.peek_ttype(1) == TokenType.MINUS:
             token_list.append(self.expect(TokenType.MINUS))
 
-        ttype = self.lexer.peek(1).ttype
+        ttype = self.lexer.peek_ttype(1)
         match ttype:
             case TokenType.NAME:
                 token_list.append(self.expect(TokenType.NAME))
@@ -480,14 +484,14 @@ class VisualPolyhedraParser:
         assert name is not None
         self.expect(TokenType.EQ)
         self.expect(TokenType.LPAREN)
-        token_list.append(Token(TokenType.LSQUARE, None, -1, -1, -1))
+        token_list.append(Token(TokenType.LSQUARE, None, -1))
         token_list += self.value()
         token_list.append(self.expect(TokenType.COMMA))
         token_list += self.value()
         token_list.append(self.expect(TokenType.COMMA))
         token_list += self.value()
         self.expect(TokenType.RPAREN)
-        token_list.append(Token(TokenType.RSQUARE, None, -1, -1, -1))
+        token_list.append(Token(TokenType.RSQUARE, None, -1))
         self.linebreak()
 
         self.vertices[name] = token_list
@@ -497,8 +501,8 @@ class VisualPolyhedraParser:
         face = []
         self.expect(TokenType.LBRACE)
         while (
-            self.lexer.peek(1).ttype == TokenType.INT
-            and self.lexer.peek(2).ttype == TokenType.COMMA
+            self.lexer.peek_ttype(1) == TokenType.INT
+            and self.lexer.peek_ttype(2) == TokenType.COMMA
         ):
             face.append(self.expect(TokenType.INT).lexeme)
             self.expect(TokenType.COMMA)
@@ -510,12 +514,12 @@ class VisualPolyhedraParser:
 
     # constant_block := constant_def*
     def constant_block(self, region: ConstantRegion):
-        t1 = self.lexer.peek(1).ttype
-        t2 = self.lexer.peek(2).ttype
-        t3 = self.lexer.peek(3).ttype
-        t4 = self.lexer.peek(4).ttype
-        t5 = self.lexer.peek(5).ttype
-        t6 = self.lexer.peek(6).ttype
+        t1 = self.lexer.peek_ttype(1)
+        t2 = self.lexer.peek_ttype(2)
+        t3 = self.lexer.peek_ttype(3)
+        t4 = self.lexer.peek_ttype(4)
+        t5 = self.lexer.peek_ttype(5)
+        t6 = self.lexer.peek_ttype(6)
         while (
             t1 == TokenType.NAME
             and t2 == TokenType.EQ
@@ -538,18 +542,18 @@ class VisualPolyhedraParser:
             )
         ):
             self.constant_def(region)
-            t1 = self.lexer.peek(1).ttype
-            t2 = self.lexer.peek(2).ttype
-            t3 = self.lexer.peek(3).ttype
-            t4 = self.lexer.peek(4).ttype
-            t5 = self.lexer.peek(5).ttype
-            t6 = self.lexer.peek(6).ttype
+            t1 = self.lexer.peek_ttype(1)
+            t2 = self.lexer.peek_ttype(2)
+            t3 = self.lexer.peek_ttype(3)
+            t4 = self.lexer.peek_ttype(4)
+            t5 = self.lexer.peek_ttype(5)
+            t6 = self.lexer.peek_ttype(6)
 
     # vertex_block := vertex_def*
     def vertex_block(self):
         while (
-            self.lexer.peek(1).ttype == TokenType.NAME
-            and self.lexer.peek(2).ttype == TokenType.EQ
+            self.lexer.peek_ttype(1) == TokenType.NAME
+            and self.lexer.peek_ttype(2) == TokenType.EQ
         ):
             self.vertex_def()
 
@@ -559,7 +563,7 @@ class VisualPolyhedraParser:
             self.syntax_error()
         self.expect(TokenType.COLON)
         self.linebreak()
-        while self.lexer.peek(1).ttype == TokenType.LBRACE:
+        while self.lexer.peek_ttype(1) == TokenType.LBRACE:
             self.face_def()
 
     # polyhedron := name_def constant_block vertex_block face_block EOF
@@ -587,7 +591,7 @@ class VisualPolyhedraParser:
         )
 
     def dump_tokenstream(self):
-        while self.lexer.peek(1).ttype != TokenType.EOF:
+        while self.lexer.peek_ttype(1) != TokenType.EOF:
             tok = self.lexer.get()
             print(tok.ttype, tok.lexeme)
 
@@ -602,31 +606,305 @@ def parse_visual_polyhedra_file(filepath: str) -> VisualPolyhedron:
     return polyhedron
 
 
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Batch conversion                                                          │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+# Lists solids rather than describing one, so directory batches skip it
+LIST_FILE_NAME = "polyhedron_list.txt"
+
+# Catalog slugs in list files, like 01-p-cube: an index, a class letter and the
+# hyphenated solid name
+CATALOG_SLUG_PATTERN = re.compile(r"\d+-[a-z]-(?P<name>[a-z0-9-]+)")
+
+# First line of OBJ files converted with --check hash
+SOURCE_DIGEST_PREFIX = "# source sha256 "
+SCAD_SOURCE_DIGEST_PREFIX = "// source sha256 "
+
+OUTPUT_FORMATS = ("obj", "scad")
+
+
+class ConversionResult:
+    def __init__(
+        self,
+        input_file: str,
+        output_file: Optional[str],
+        status: str,
+        seconds: float = 0.0,
+        error: str = "",
+    ) -> None:
+        self.input_file = input_file
+        self.output_file = output_file
+        # "converted", "skipped" or "failed"
+        self.status = status
+        self.seconds = seconds
+        self.error = error
+
+
+# Input files of a batch: the solids in a directory, the files matching a glob,
+# or the entries of a list file. List entries are paths relative to the list
+# file, with or without their .txt extension, or catalog slugs naming a solid
+# file next to the list file.
+def batch_inputs(source: str, list_file: bool = False) -> list[str]:
+    if list_file:
+        base = os.path.dirname(source)
+        slugs = None
+        inputs = []
+        with open(source) as f:
+            for line in f:
+                entry = line.strip()
+                if not entry or entry.startswith("#"):
+                    continue
+                path = os.path.join(base, entry)
+                if not os.path.exists(path) and os.path.exists(path + ".txt"):
+                    path += ".txt"
+                match = CATALOG_SLUG_PATTERN.fullmatch(entry)
+                if not os.path.exists(path) and match is not None:
+                    if slugs is None:
+                        slugs = catalog_slugs(base)
+                    path = slugs.get(slug_key(match["name"]), path)
+                inputs.append(path)
+        return inputs
+    if os.path.isdir(source):
+        return sorted(
+            path
+            for path in glob.glob(os.path.join(source, "*.txt"))
+            if os.path.basename(path) != LIST_FILE_NAME
+        )
+    return sorted(glob.glob(source))
+
+
+# Solid names compared case- and punctuation-blind, so that the slug
+# lsnub-cube finds LsnubCube.txt
+def slug_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+# Solid files in directory by slug_key of their name
+def catalog_slugs(directory: str) -> dict[str, str]:
+    return {
+        slug_key(os.path.basename(path)[: -len(".txt")]): path
+        for path in sorted(glob.glob(os.path.join(directory, "*.txt")))
+        if os.path.basename(path) != LIST_FILE_NAME
+    }
+
+
+def default_output_path(
+    input_file: str, output_dir: Optional[str] = None, output_format: str = "obj"
+) -> str:
+    if input_file.endswith(".txt"):
+        output_path = f"{input_file.rsplit('.', 1)[0]}.{output_format}"
+    else:
+        output_path = f"{input_file}.{output_format}"
+    if output_dir is not None:
+        output_path = os.path.join(output_dir, os.path.basename(output_path))
+    return output_path
+
+
+def source_digest(input_file: str) -> str:
+    with open(input_file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# The digest line is a comment in the output's format, told by its extension
+def digest_prefix(output_file: str) -> str:
+    if output_file.endswith(".scad"):
+        return SCAD_SOURCE_DIGEST_PREFIX
+    return SOURCE_DIGEST_PREFIX
+
+
+# check is "mtime" (the output is newer than its input) or "hash" (the output
+# records the digest of its input on its first line)
+def is_up_to_date(input_file: str, output_file: str, check: str) -> bool:
+    if not os.path.exists(output_file):
+        return False
+    if check == "hash":
+        with open(output_file) as f:
+            first_line = f.readline().rstrip("\n")
+        return first_line == digest_prefix(output_file) + source_digest(input_file)
+    return os.path.getmtime(output_file) >= os.path.getmtime(input_file)
+
+
+# Write through a temporary file in the same directory, so that readers never
+# see a partial output
+def write_atomic(path: str, lines: list[str]) -> None:
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Runs in a worker process. Writes SCAD if output_file ends in .scad, OBJ
+# otherwise
+def convert_file(input_file: str, output_file: str, check: str) -> ConversionResult:
+    start = time.perf_counter()
+    try:
+        polyhedron = parse_visual_polyhedra_file(input_file)
+        if output_file.endswith(".scad"):
+            lines = polyhedron.scad_lines()
+        else:
+            lines = polyhedron.obj_lines()
+        if check == "hash":
+            digest = source_digest(input_file)
+            lines.insert(0, f"{digest_prefix(output_file)}{digest}\n")
+        write_atomic(output_file, lines)
+    except Exception as e:
+        return ConversionResult(
+            input_file, output_file, "failed", time.perf_counter() - start, str(e)
+        )
+    return ConversionResult(
+        input_file, output_file, "converted", time.perf_counter() - start
+    )
+
+
+# Convert inputs in a process pool. Inputs whose outputs are up to date are
+# skipped unless force is set.
+def convert_batch(
+    inputs: list[str],
+    output_dir: Optional[str] = None,
+    jobs: Optional[int] = None,
+    check: str = "mtime",
+    force: bool = False,
+    output_format: str = "obj",
+) -> list[ConversionResult]:
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    results: dict[str, ConversionResult] = {}
+    pending = []
+    for input_file in inputs:
+        output_file = default_output_path(input_file, output_dir, output_format)
+        if not os.path.exists(input_file):
+            results[input_file] = ConversionResult(
+                input_file, None, "failed", error="No such file"
+            )
+        elif not force and is_up_to_date(input_file, output_file, check):
+            results[input_file] = ConversionResult(input_file, output_file, "skipped")
+        else:
+            pending.append((input_file, output_file))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(convert_file, input_file, output_file, check)
+                for input_file, output_file in pending
+            ]
+            for future in futures:
+                result = future.result()
+                results[result.input_file] = result
+    return [results[input_file] for input_file in inputs]
+
+
+def print_batch_summary(results: list[ConversionResult]) -> None:
+    width = max((len(r.input_file) for r in results), default=0)
+    for result in results:
+        line = (
+            f"{result.input_file:<{width}}  {result.status:<9}  {result.seconds:7.3f}s"
+        )
+        if result.error:
+            line += f"  {result.error}"
+        print(line)
+    counts = {
+        status: sum(r.status == status for r in results)
+        for status in ("converted", "skipped", "failed")
+    }
+    total = sum(r.seconds for r in results)
+    print(
+        f"{len(results)} files: {counts['converted']} converted, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed "
+        f"({total:.2f} seconds of conversion time)"
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description="Convert visual polyhedron text files to .obj"
+        description="Convert visual polyhedron text files to .obj or .scad"
+    )
+    parser.add_argument(
+        "input_file",
+        help="Visual polyhedron text file. A directory or a quoted glob converts "
+        "every matching file in a batch",
     )
-    parser.add_argument("input_file", help="Visual polyhedron text file")
     parser.add_argument(
         "-o",
         "--output",
         dest="output_file",
-        help="Output OBJ file path. If not specified, will use input filename with .obj extension.",
+        help="Output file path. If not specified, will use input filename with the "
+        "extension of --format.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=OUTPUT_FORMATS,
+        default="obj",
+        help="obj writes a mesh; scad writes OpenSCAD <name>_vertices and "
+        "<name>_edges definitions, as in scad/catalog (default: obj)",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Treat input_file as a list of solids, one path relative to the "
+        "list file or catalog slug (01-p-cube) per line, and convert them in a "
+        "batch",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Batch output directory. If not specified, outputs are written next "
+        "to their inputs",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of files to convert at once (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--check",
+        choices=["mtime", "hash"],
+        default="mtime",
+        help="Skip batch inputs whose output is newer than the input (mtime) or "
+        "was converted from identical input (hash)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert batch inputs even if their outputs are up to date",
     )
 
     args = parser.parse_args()
 
+    if args.list or os.path.isdir(args.input_file) or glob.has_magic(args.input_file):
+        inputs = batch_inputs(args.input_file, list_file=args.list)
+        results = convert_batch(
+            inputs,
+            args.output_dir,
+            args.jobs,
+            args.check,
+            args.force,
+            args.output_format,
+        )
+        print_batch_summary(results)
+        if any(result.status == "failed" for result in results):
+            sys.exit(1)
+        return
+
     polyhedron = parse_visual_polyhedra_file(args.input_file)
 
     if args.output_file:
         output_path = args.output_file
     else:
-        if args.input_file.endswith(".txt"):
-            output_path = args.input_file.rsplit(".", 1)[0] + ".obj"
-        else:
-            output_path = args.input_file + ".obj"
+        output_path = default_output_path(
+            args.input_file, output_format=args.output_format
+        )
 
-    polyhedron.to_obj(output_path)
+    if args.output_format == "scad":
+        polyhedron.to_scad(output_path)
+    else:
+        polyhedron.to_obj(output_path)
 
 
 if __name__ == "__main__":
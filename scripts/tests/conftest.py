@@ -0,0 +1,227 @@
+"""
+Performance regression gate.
+
+Tests marked perf are skipped unless pytest runs with --perf. They time a
+workload with the perf fixture and compare the median of --perf-runs runs
+against scripts/tests/perf_baseline.json. A workload fails when its median
+exceeds the baseline median by more than --perf-tolerance plus three times
+the larger median absolute deviation of the two.
+
+    uv run pytest -m perf --perf
+    uv run pytest -m perf --perf-update     # rewrite the baseline
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import pytest
+
+PERF_BASELINE = Path(__file__).parent / "perf_baseline.json"
+
+# Untimed runs before the timed ones, to settle caches and lazy imports
+WARMUP_RUNS = 3
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "performance regression gate")
+    group.addoption(
+        "--perf",
+        action="store_true",
+        help="Run the perf workloads and compare them against the baseline",
+    )
+    group.addoption(
+        "--perf-update",
+        action="store_true",
+        help="Run the perf workloads and rewrite the baseline with the results",
+    )
+    group.addoption("--perf-runs", type=int, default=7, help="Timed runs per workload")
+    group.addoption(
+        "--perf-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown as a fraction of the baseline median",
+    )
+    group.addoption(
+        "--perf-baseline", default=str(PERF_BASELINE), help="Baseline JSON file"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "perf: timed workload compared against the perf baseline"
+    )
+    config.stash[PERF_GATE] = PerfGate(config)
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.stash[PERF_GATE].enabled:
+        return
+    skip = pytest.mark.skip(reason="perf workload, run with --perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_sessionfinish(session):
+    gate = session.config.stash[PERF_GATE]
+    if gate.update and gate.results:
+        gate.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    gate = config.stash[PERF_GATE]
+    if gate.results:
+        terminalreporter.section("perf")
+        for line in gate.report():
+            terminalreporter.write_line(line)
+
+
+# Median and median absolute deviation of a workload's run times, in seconds
+class Timing:
+    def __init__(self, median: float, mad: float, runs: int) -> None:
+        self.median: float = median
+        self.mad: float = mad
+        self.runs: int = runs
+
+    # The garbage collector is off while a run is timed, so that collections
+    # triggered by whatever earlier tests left on the heap do not land in it
+    @staticmethod
+    def measure(workload: Callable[[], object], runs: int) -> "Timing":
+        for _ in range(WARMUP_RUNS):
+            workload()
+        times = []
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(runs):
+                gc.collect()
+                start = time.perf_counter()
+                workload()
+                times.append(time.perf_counter() - start)
+        finally:
+            if enabled:
+                gc.enable()
+        median = statistics.median(times)
+        mad = statistics.median(abs(t - median) for t in times)
+        return Timing(median, mad, runs)
+
+    @staticmethod
+    def from_json(data: dict) -> "Timing":
+        return Timing(data["median"], data["mad"], data["runs"])
+
+    def to_json(self) -> dict:
+        return {
+            "median": round(self.median, 6),
+            "mad": round(self.mad, 6),
+            "runs": self.runs,
+        }
+
+
+# Slowest median a workload may reach before it counts as a regression
+def threshold(baseline: Timing, current: Timing, tolerance: float) -> float:
+    return baseline.median * (1 + tolerance) + 3 * max(baseline.mad, current.mad)
+
+
+def describe(name: str, baseline: Optional[Timing], current: Timing, limit) -> str:
+    if baseline is None:
+        return f"{name:<36} {current.median * 1e3:>9.2f} ms   (no baseline)"
+    change = current.median / baseline.median - 1
+    verdict = "SLOWER" if limit is not None and current.median > limit else "ok"
+    return (
+        f"{name:<36} {current.median * 1e3:>9.2f} ms   baseline "
+        f"{baseline.median * 1e3:>9.2f} ms ± {baseline.mad * 1e3:.2f}   "
+        f"{change:>+7.1%}   limit {limit * 1e3:.2f} ms   {verdict}"
+    )
+
+
+class PerfGate:
+    def __init__(self, config) -> None:
+        self.update: bool = config.getoption("perf_update")
+        self.enabled: bool = config.getoption("perf") or self.update
+        self.runs: int = config.getoption("perf_runs")
+        self.tolerance: float = config.getoption("perf_tolerance")
+        self.path = Path(config.getoption("perf_baseline"))
+        self.baseline: dict[str, Timing] = {}
+        self.machine: Optional[str] = None
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            self.machine = data.get("machine")
+            self.baseline = {
+                name: Timing.from_json(timing)
+                for name, timing in data["workloads"].items()
+            }
+        self.results: dict[str, Timing] = {}
+
+    # Times workload and fails the calling test if it has no baseline entry or
+    # regressed against it. With --perf-update, only records the timing.
+    # runs raises --perf-runs for workloads whose run times scatter widely
+    def check(
+        self,
+        name: str,
+        workload: Callable[[], object],
+        runs: Optional[int] = None,
+    ) -> Timing:
+        current = Timing.measure(workload, max(self.runs, runs or 0))
+        self.results[name] = current
+        if self.update:
+            return current
+        baseline = self.baseline.get(name)
+        if baseline is None:
+            pytest.fail(
+                f"no perf baseline for {name}; refresh it with --perf-update",
+                pytrace=False,
+            )
+        limit = threshold(baseline, current, self.tolerance)
+        if current.median > limit:
+            pytest.fail(describe(name, baseline, current, limit), pytrace=False)
+        return current
+
+    def report(self) -> list[str]:
+        lines = []
+        if self.update:
+            lines.append(f"baseline written to {self.path}")
+        elif self.machine is not None and self.machine != machine_description():
+            lines.append(f"baseline recorded on {self.machine}")
+        for name, current in self.results.items():
+            baseline = None if self.update else self.baseline.get(name)
+            limit = (
+                None
+                if baseline is None
+                else threshold(baseline, current, self.tolerance)
+            )
+            lines.append(describe(name, baseline, current, limit))
+        return lines
+
+    # Merges the results into the baseline, so refreshing a subset of the
+    # workloads with -k keeps the others
+    def save(self) -> None:
+        workloads = {name: timing.to_json() for name, timing in self.baseline.items()}
+        workloads.update(
+            {name: timing.to_json() for name, timing in self.results.items()}
+        )
+        data = {
+            "machine": machine_description(),
+            "workloads": dict(sorted(workloads.items())),
+        }
+        self.path.write_text(json.dumps(data, indent=1) + "\n")
+
+
+def machine_description() -> str:
+    return (
+        f"{platform.system()} {platform.machine()}, {os.cpu_count()} cpus, "
+        f"python {platform.python_version()}"
+    )
+
+
+PERF_GATE = pytest.StashKey[PerfGate]()
+
+
+@pytest.fixture
+def perf(request) -> PerfGate:
+    return request.config.stash[PERF_GATE]
@@ -16,10 +16,84 @@ import pytest
 from pathlib import Path
 
 from scripts.convert_visual_polyhedra import (
+    TokenType,
+    VisualPolyhedraLexer,
     VisualPolyhedraParser,
+    batch_inputs,
+    convert_batch,
+    default_output_path,
+    is_up_to_date,
     parse_visual_polyhedra_file,
 )
 
+REPO_DIR = Path(__file__).parent.parent.parent
+
+class TestVisualPolyhedraLexer:
+    """Tests for the VisualPolyhedraLexer class."""
+
+    def test_token_stream(self):
+        """Test token types, lexemes and positions of a constant and a vertex."""
+        lexer = VisualPolyhedraLexer()
+        lexer.lex("C0 = 0.5 = sqrt(2)/4\nV0 = (-C0, 1, 2.)\n")
+
+        tokens = [(t.ttype, t.lexeme) for t in lexer.tokenstream]
+        assert tokens == [
+            (TokenType.NAME, "C0"),
+            (TokenType.EQ, None),
+            (TokenType.FLOAT, "0.5"),
+            (TokenType.EQ, None),
+            (TokenType.NAME, "sqrt"),
+            (TokenType.LPAREN, None),
+            (TokenType.INT, "2"),
+            (TokenType.RPAREN, None),
+            (TokenType.SLASH, None),
+            (TokenType.INT, "4"),
+            (TokenType.NEWLINE, None),
+            (TokenType.NAME, "V0"),
+            (TokenType.EQ, None),
+            (TokenType.LPAREN, None),
+            (TokenType.MINUS, None),
+            (TokenType.NAME, "C0"),
+            (TokenType.COMMA, None),
+            (TokenType.INT, "1"),
+            (TokenType.COMMA, None),
+            (TokenType.FLOAT, "2."),
+            (TokenType.RPAREN, None),
+            (TokenType.NEWLINE, None),
+            (TokenType.EOF, None),
+        ]
+        assert [t.pos for t in lexer.tokenstream][:3] == [0, 3, 5]
+
+    def test_line_and_column(self):
+        """Test that line and column are derived from the token position."""
+        lexer = VisualPolyhedraLexer()
+        lexer.lex("Cube\n\n  V0 = (0, 0, 0)\n")
+
+        token = lexer.tokenstream[3]
+        assert token.lexeme == "V0"
+        assert (token.line, token.column) == (3, 3)
+        eof = lexer.tokenstream[-1]
+        assert (eof.line, eof.column) == (4, 1)
+
+    def test_unknown_character(self):
+        """Test that an unknown character is reported with its line and column."""
+        lexer = VisualPolyhedraLexer()
+
+        with pytest.raises(Exception, match="line 2, column 4"):
+            lexer.lex("Cube\nV0 _ 1\n")
+
+    def test_catalog_files_lex(self):
+        """Test that every catalog file lexes to a stream ending in EOF."""
+        data_dir = Path(__file__).parent.parent.parent / "data"
+        for path in sorted(data_dir.glob("*.txt")):
+            if path.name == "polyhedron_list.txt":
+                continue
+            lexer = VisualPolyhedraLexer()
+            lexer.lex(path.read_text())
+
+            assert lexer.ttypes[-1] == TokenType.EOF
+            assert len(lexer.ttypes) == len(lexer.lexemes) == len(lexer.positions)
+
 
 class TestVisualPolyhedronToObj:
     """Tests for the VisualPolyhedron.to_obj() method."""
@@ -357,6 +431,195 @@ Faces:
                 assert content.count("f ") == 6
 
 
+SQUARE = """Square
+
+V0 = (0, 0, 0)
+V1 = (1, 0, 0)
+V2 = (1, 1, 0)
+V3 = (0, 1, 0)
+
+Faces:
+{ 0, 1, 2, 3 }
+
+"""
+
+
+class TestBatchConversion:
+    """Tests for batch conversion of directories, globs and list files."""
+
+    @staticmethod
+    def write_inputs(directory: Path, names: list[str]) -> list[Path]:
+        paths = []
+        for name in names:
+            path = directory / f"{name}.txt"
+            path.write_text(SQUARE.replace("Square", name))
+            paths.append(path)
+        return paths
+
+    def test_directory_skips_list_file(self, tmp_path):
+        """Test that a directory batch converts every solid but the list."""
+        self.write_inputs(tmp_path, ["A", "B"])
+        (tmp_path / "polyhedron_list.txt").write_text("A\nB\n")
+
+        inputs = batch_inputs(str(tmp_path))
+
+        assert [Path(p).name for p in inputs] == ["A.txt", "B.txt"]
+
+    def test_rerun_skips_up_to_date_outputs(self, tmp_path):
+        """Test that a second batch skips outputs newer than their inputs."""
+        inputs = [str(p) for p in self.write_inputs(tmp_path, ["A", "B"])]
+        out = tmp_path / "out"
+
+        first = convert_batch(inputs, str(out), jobs=2)
+        os.utime(inputs[1], (0, 2e9))
+        second = convert_batch(inputs, str(out), jobs=2)
+
+        assert [r.status for r in first] == ["converted", "converted"]
+        assert [r.status for r in second] == ["skipped", "converted"]
+        assert (out / "A.obj").read_text().count("v ") == 4
+        assert not list(out.glob("*.tmp"))
+
+    def test_hash_check_detects_changed_input(self, tmp_path):
+        """Test that hash checks reconvert changed inputs even if outputs are newer."""
+        (path,) = self.write_inputs(tmp_path, ["A"])
+
+        convert_batch([str(path)], check="hash")
+        unchanged = convert_batch([str(path)], check="hash")
+        path.write_text(SQUARE.replace("V3 = (0, 1, 0)", "V3 = (0, 2, 0)"))
+        os.utime(path, (0, 0))
+        changed = convert_batch([str(path)], check="hash")
+
+        assert unchanged[0].status == "skipped"
+        assert changed[0].status == "converted"
+        assert "v 0.0 2.0 0.0" in (tmp_path / "A.obj").read_text()
+
+    def test_list_file_reports_errors(self, tmp_path):
+        """Test that missing and malformed list entries fail without stopping the batch."""
+        self.write_inputs(tmp_path, ["A"])
+        (tmp_path / "Broken.txt").write_text("Broken\n\nV0 = (0, 0\n")
+        list_path = tmp_path / "solids.txt"
+        list_path.write_text("# solids\nA\nBroken.txt\nMissing\n")
+
+        results = convert_batch(batch_inputs(str(list_path), list_file=True))
+
+        assert [r.status for r in results] == ["converted", "failed", "failed"]
+        assert results[1].error
+        assert results[2].error == "No such file"
+
+    def test_list_file_catalog_slugs(self, tmp_path):
+        """Test that catalog slugs in a list file find the solid files next to it."""
+        self.write_inputs(tmp_path, ["LsnubCube", "Cube"])
+        list_path = tmp_path / "solids.txt"
+        list_path.write_text("11-a-lsnub-cube\n01-p-cube\n02-p-octahedron\n")
+
+        inputs = batch_inputs(str(list_path), list_file=True)
+
+        assert [Path(p).name for p in inputs] == [
+            "LsnubCube.txt",
+            "Cube.txt",
+            "02-p-octahedron",
+        ]
+
+    def test_repo_list_file(self, tmp_path):
+        """Test that every solid in data/polyhedron_list.txt converts."""
+        list_path = REPO_DIR / "data" / "polyhedron_list.txt"
+
+        inputs = batch_inputs(str(list_path), list_file=True)
+        results = convert_batch(inputs, str(tmp_path))
+
+        assert len(set(inputs)) == len(list_path.read_text().split())
+        assert {r.status for r in results} == {"converted"}
+
+    def test_main_glob_batch(self, tmp_path):
+        """Test that main() converts a glob in a batch and prints a summary."""
+        self.write_inputs(tmp_path, ["A", "B"])
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "scripts.convert_visual_polyhedra",
+                str(tmp_path / "*.txt"),
+                "--output-dir",
+                str(tmp_path / "out"),
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0
+        assert "2 files: 2 converted, 0 skipped, 0 failed" in result.stdout
+        assert (tmp_path / "out" / "B.obj").exists()
+
+
+class TestScadOutput:
+    """Tests for the OpenSCAD catalog output."""
+
+    def test_scad_lines_prefix_constants(self):
+        """Test that constants keep their exact expressions under the solid's prefix."""
+        input_str = """Snub Thing (laevo)
+
+C0 = 0.5
+C0 = x / 2
+WHERE:  x = sqrt(1)
+
+V0 = ( C0, 0.0, -C0)
+V1 = (0, 1, 0)
+V2 = (1, 0, 0)
+
+Faces:
+{ 0, 2, 1 }
+"""
+        polyhedron = VisualPolyhedraParser(input_str).parse()
+
+        assert polyhedron.scad_lines() == [
+            "include <../geometry_utils.scad>\n",
+            "snub_thing_laevo_x=sqrt(1);\n",
+            "snub_thing_laevo_C0=snub_thing_laevo_x/2;\n",
+            "snub_thing_laevo_vertices=[\n",
+            "[snub_thing_laevo_C0,0.0,-snub_thing_laevo_C0],\n",
+            "[0,1,0],\n",
+            "[1,0,0],\n",
+            "];\n",
+            "snub_thing_laevo_edges=[\n",
+            "[0,1],\n",
+            "[0,2],\n",
+            "[1,2],\n",
+            "];\n",
+        ]
+
+    def test_batch_scad_hash_check(self, tmp_path):
+        """Test that SCAD batches record the source digest as a SCAD comment."""
+        path = tmp_path / "A.txt"
+        path.write_text(SQUARE.replace("Square", "A"))
+        out = tmp_path / "catalog"
+
+        first = convert_batch([str(path)], str(out), check="hash", output_format="scad")
+        second = convert_batch(
+            [str(path)], str(out), check="hash", output_format="scad"
+        )
+
+        lines = (out / "A.scad").read_text().splitlines()
+        assert [r.status for r in first + second] == ["converted", "skipped"]
+        assert lines[0].startswith("// source sha256 ")
+        assert "a_edges=[" in lines
+
+    def test_catalog_is_up_to_date(self):
+        """Test that scad/catalog was regenerated from the current data files."""
+        inputs = batch_inputs(str(REPO_DIR / "data"))
+        catalog = str(REPO_DIR / "scad" / "catalog")
+
+        stale = [
+            path
+            for path in inputs
+            if not is_up_to_date(
+                path, default_output_path(path, catalog, "scad"), "hash"
+            )
+        ]
+
+        assert stale == []
+
+
 class TestEdgeCases:
     """Tests for edge cases and error handling."""
 
@@ -0,0 +1,112 @@
+"""
+Performance regression workloads.
+
+Skipped unless pytest runs with --perf or --perf-update; see conftest.py.
+Each test times one fixed workload and compares it against
+perf_baseline.json.
+"""
+
+import numpy as np
+import pytest
+from pathlib import Path
+from scripts.benchmarks.meshes import icosphere, torus
+from scripts.convert_visual_polyhedra import parse_visual_polyhedra_file
+from scripts.vertexprint import (
+    AssemblyPreview,
+    GlobalOptions,
+    OffsetType,
+    OpenscadArgs,
+    Polyhedron,
+    VertexFigure,
+)
+
+pytestmark = pytest.mark.perf
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+CATALOG = sorted(p for p in DATA_DIR.glob("*.txt") if p.name != "polyhedron_list.txt")
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    solids = [parse_visual_polyhedra_file(str(path)) for path in CATALOG]
+    return [(s.name, np.array(s.vertices), s.faces) for s in solids]
+
+
+@pytest.fixture(scope="module")
+def sphere():
+    vertices, faces = icosphere(3)
+    return Polyhedron("icosphere3", vertices, faces, GlobalOptions())
+
+
+class TestPerf:
+    """Timed workloads compared against the perf baseline."""
+
+    def test_converter_catalog(self, perf):
+        """Parse every catalog solid and format it as OBJ."""
+
+        def workload():
+            for path in CATALOG:
+                parse_visual_polyhedra_file(str(path)).obj_lines()
+
+        perf.check("converter_catalog", workload)
+
+    def test_polyhedron_catalog(self, perf, catalog):
+        """Build a Polyhedron for every catalog solid."""
+        options = GlobalOptions()
+
+        def workload():
+            for name, vertices, faces in catalog:
+                Polyhedron(name, vertices, faces, options)
+
+        perf.check("polyhedron_catalog", workload)
+
+    @pytest.mark.parametrize("offset_type", list(OffsetType))
+    def test_polyhedron_icosphere(self, perf, offset_type):
+        """Build a Polyhedron for a 1280-face icosphere with each offset type."""
+        vertices, faces = icosphere(3)
+        options = GlobalOptions(offset_type=offset_type)
+        perf.check(
+            f"polyhedron_icosphere3_{offset_type.value}",
+            lambda: Polyhedron("icosphere3", vertices, faces, options),
+        )
+
+    def test_polyhedron_torus(self, perf):
+        """Build a Polyhedron for a 48x48 quad torus."""
+        vertices, _, quads = torus(48, 48)
+        options = GlobalOptions()
+        perf.check(
+            "polyhedron_torus48",
+            lambda: Polyhedron("torus48", vertices, quads, options),
+        )
+
+    def test_vertex_figures(self, perf, sphere):
+        """Compute every vertex figure of the icosphere one at a time.
+
+        Spends its time in thousands of small numpy calls, so single runs
+        scatter more than the others do; the median is taken over more runs.
+        """
+        options = GlobalOptions()
+
+        def workload():
+            for vf in sphere.vertex_figures:
+                VertexFigure(
+                    vf.vertex, vf.vertex_index, vf.vecs, vf.neighbors, 0, options
+                )
+
+        perf.check("vertex_figures_icosphere3", workload, runs=21)
+
+    def test_openscad_args(self, perf, sphere):
+        """Serialize the icosphere to OpenSCAD arguments for one holder."""
+        options = GlobalOptions()
+        perf.check(
+            "openscad_args_icosphere3",
+            lambda: OpenscadArgs(sphere, options).to_openscad_args(),
+        )
+
+    def test_assembly_preview(self, perf, sphere):
+        """Build the assembly preview mesh of the icosphere."""
+        options = GlobalOptions()
+        perf.check(
+            "assembly_preview_icosphere3",
+            lambda: AssemblyPreview(sphere, options),
+        )
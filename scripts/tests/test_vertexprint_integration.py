@@ -8,21 +8,65 @@ These tests verify the core functionality including:
 - OpenscadArgs class argument generation
 """
 
+import contextlib
+import json
 import tempfile
 import os
+import subprocess
+import sys
 import numpy as np
 import pytest
+import stl_reader
+import scripts.vertexprint as vertexprint
+from pathlib import Path
+from scripts.convert_visual_polyhedra import parse_visual_polyhedra_file
 from scripts.vertexprint import (
+    AssemblyPreview,
+    BuildManifest,
     GlobalOptions,
+    LabelCache,
     VertexType,
     OffsetType,
     ObjectType,
     Polyhedron,
     OpenscadArgs,
+    OpenscadEngine,
+    OpenscadFeatures,
+    Profiler,
     VertexFigure,
+    VertexAdjacency,
+    VertexFigureEngine,
+    RenderBackend,
+    RenderCache,
+    RenderJob,
+    RenderMode,
+    RenderScheduler,
+    ScadCodegen,
+    TubePlacements,
+    align_vertex_figures,
+    call_openscad,
+    EdgeTable,
+    flat_holder_scad,
+    holder_fn,
+    HalfEdgeMesh,
+    load_compiled,
+    parse_obj,
     parse_stl,
+    PREVIEW_FN,
+    read_obj,
+    render_all,
+    revolved_mesh,
+    rotation_matrices,
+    save_binary_stl,
+    save_compiled,
+    signature_blake2b,
+    TubularHolderBuilder,
 )
 
+REPO_DIR = Path(__file__).parent.parent.parent
+DATA_DIR = REPO_DIR / "data"
+CATALOG = sorted(p for p in DATA_DIR.glob("*.txt") if p.name != "polyhedron_list.txt")
+
 
 class TestGlobalOptions:
     """Tests for GlobalOptions class."""
@@ -281,6 +325,157 @@ class TestPolyhedron:
         assert len(edges) == 3
 
 
+class TestVertexAdjacency:
+    """Tests for VertexAdjacency class."""
+
+    def test_from_edges(self):
+        """Test CSR construction from an edge list."""
+        edges = [(0, 1), (1, 2), (0, 2), (2, 3)]
+        adjacency = VertexAdjacency.from_edges(5, edges)
+
+        assert len(adjacency) == 5
+        assert adjacency.offsets.tolist() == [0, 2, 4, 7, 8, 8]
+        assert adjacency.neighbors_of(0).tolist() == [1, 2]
+        assert adjacency.neighbors_of(2).tolist() == [0, 1, 3]
+        assert adjacency.degree(3) == 1
+        assert adjacency.degree(4) == 0
+
+    def test_slot(self):
+        """Test slot lookup of an edge in a vertex neighbor list."""
+        adjacency = VertexAdjacency.from_edges(4, [(0, 1), (1, 2), (0, 2), (2, 3)])
+
+        assert adjacency.slot(2, 0) == 0
+        assert adjacency.slot(2, 3) == 2
+        with pytest.raises(KeyError):
+            adjacency.slot(0, 3)
+
+    def test_polyhedron_neighbors_match_edges(self):
+        """Test that vertex figure neighbors are read from the adjacency."""
+        vertices = np.array([
+            [0.0, 0.0, 0.0],
+            [1.0, 0.0, 0.0],
+            [1.0, 1.0, 0.0],
+            [0.0, 1.0, 0.0],
+        ])
+        faces = [["0", "1", "2", "3"]]
+
+        options = GlobalOptions(offset_type=OffsetType.PER_HALF_EDGE)
+        polyhedron = Polyhedron("square", vertices, faces, options)
+
+        for vf in polyhedron.vertex_figures:
+            expected = sorted(
+                b if a == vf.vertex_index else a
+                for a, b in polyhedron.edges
+                if vf.vertex_index in (a, b)
+            )
+            assert list(vf.neighbors) == expected
+
+
+class TestEdgeTable:
+    """Tests for EdgeTable class."""
+
+    def test_from_faces(self):
+        """Test that face edges are deduplicated and sorted by endpoints."""
+        faces = [["0", "1", "2"], [2, 1, 3], [3, 9], []]
+        edges = EdgeTable.from_faces(faces, 4)
+
+        assert list(edges) == [(0, 1), (0, 2), (1, 2), (1, 3), (2, 3)]
+        assert (1, 3) in edges
+        assert (3, 1) not in edges
+        assert edges.index(np.array([3, 0]), np.array([2, 1])).tolist() == [4, 0]
+
+    def test_names_rank_offset_lengths(self):
+        """Test that edges are named by rank of offset length."""
+        edges = EdgeTable.from_faces([[0, 1, 2]], 3)
+        edges.set_lengths(np.array([3.0, 1.0, 2.0]), np.array([2.0, 0.0, 1.0]))
+
+        assert edges.names.tolist() == [2, 0, 1]
+        assert edges.by_offset_length()["offset_length"].tolist() == [0.0, 1.0, 2.0]
+        assert edges[(0, 1)] == {"length": 3.0, "offset_length": 2.0, "name": 2}
+        assert dict(edges.items())[(1, 2)]["name"] == 1
+
+    @pytest.mark.parametrize("offset_type", list(OffsetType))
+    def test_offsets_match_offset_for_edge(self, offset_type):
+        """Test that vectorized edge offsets agree with offset_for_edge."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "TruncatedCuboctahedron.txt")
+        options = GlobalOptions(offset_type=offset_type)
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+
+        v1_offset, v2_offset = polyhedron.edge_offsets()
+
+        for i, (v1, v2) in enumerate(polyhedron.edges):
+            assert polyhedron.offset_for_edge(v1, v2) == pytest.approx(
+                (v1_offset[i], v2_offset[i])
+            )
+
+
+class TestHalfEdgeMesh:
+    """Tests for HalfEdgeMesh class."""
+
+    def test_closed_mesh(self):
+        """Test twin, next and slot consistency on a cube."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, GlobalOptions()
+        )
+        half_edges = polyhedron.half_edges
+
+        assert len(half_edges) == 24
+        h = np.arange(24)
+        assert (half_edges.twin[half_edges.twin] == h).all()
+        assert (half_edges.origin[half_edges.twin] == half_edges.target).all()
+        assert (half_edges.origin[half_edges.next] == half_edges.target).all()
+        assert (half_edges.next[half_edges.prev] == h).all()
+        assert (half_edges.face[half_edges.next] == half_edges.face).all()
+        for i in h:
+            origin, target = half_edges.origin[i], half_edges.target[i]
+            assert half_edges.slot[i] == polyhedron.adjacency.slot(origin, target)
+            assert list(polyhedron.edges)[half_edges.edge[i]] == tuple(
+                sorted((origin, target))
+            )
+            assert half_edges.find(origin, target) == i
+            assert half_edges.slots(origin, target) == (
+                polyhedron.adjacency.slot(origin, target),
+                polyhedron.adjacency.slot(target, origin),
+            )
+        assert half_edges.find(0, 0) == -1
+
+    def test_neighbor_cycle(self):
+        """Test that fans visit every neighbor in face order."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "TruncatedCuboctahedron.txt")
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, GlobalOptions()
+        )
+        half_edges = polyhedron.half_edges
+
+        for vf in polyhedron.vertex_figures:
+            cycle = half_edges.neighbor_cycle(vf.vertex_index)
+            assert sorted(cycle) == list(vf.neighbors)
+            # Consecutive neighbors share a face with the vertex
+            fan = half_edges.fan(vf.vertex_index)
+            for h, g in zip(fan, fan[1:]):
+                assert half_edges.face[half_edges.twin[h]] == half_edges.face[g]
+
+    def test_boundary(self):
+        """Test an open fan of two triangles."""
+        faces = [[0, 1, 2], [0, 2, 3]]
+        adjacency = VertexAdjacency.from_edges(
+            4, [(0, 1), (1, 2), (0, 2), (2, 3), (0, 3)]
+        )
+        edges = EdgeTable.from_faces(faces, 4)
+
+        half_edges = HalfEdgeMesh.from_faces(faces, adjacency, edges)
+
+        assert (half_edges.twin >= 0).sum() == 2
+        assert half_edges.neighbor_cycle(0) == [3, 2, 1]
+        assert half_edges.neighbor_cycle(1) == [0, 2]
+        assert half_edges.slots(0, 1) == (0, -1)
+        assert half_edges.slots(1, 0) == (-1, 0)
+        assert half_edges.slots(2, 0) == (0, 1)
+
+
 class TestVertexFigure:
     """Tests for VertexFigure class."""
 
@@ -381,6 +576,1080 @@ class TestVertexFigure:
         assert len(vf.half_edge_offset) == 3
         assert vf.vertex_offset > 0
 
+    @pytest.mark.parametrize("y", [np.pi / 2, -np.pi / 2])
+    def test_gimbal_lock_angles_are_radians(self, y):
+        """Test that gimbal locked rotations decompose into radians."""
+        vecs = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        vf = VertexFigure(np.zeros(3), 0, vecs, [1, 2], 0, GlobalOptions())
+        angles = np.array([[0.3, y, 0.0]])
+
+        euler = vf.matrix_to_rotation(rotation_matrices(angles)[0])
+
+        np.testing.assert_allclose(euler, angles[0], atol=1e-12)
+
+    def test_flipped_angles_are_radians(self):
+        """Test that a figure facing away from the target turns by pi."""
+        vecs = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        vf = VertexFigure(np.zeros(3), 0, vecs, [1, 2], 0, GlobalOptions())
+
+        _, euler = vf.reorient_to(np.array([0.0, 0.0, -1.0]))
+
+        assert euler == [np.pi, 0.0, 0.0]
+
+
+class TestVertexFigureEngine:
+    """Tests for VertexFigureEngine class."""
+
+    @staticmethod
+    def perturbed_octahedron() -> tuple[np.ndarray, list[list[str]]]:
+        rng = np.random.default_rng(0)
+        vertices = np.array([
+            [1.0, 0.0, 0.0],
+            [-1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.0, -1.0, 0.0],
+            [0.0, 0.0, 1.0],
+            [0.0, 0.0, -1.0],
+        ]) + rng.normal(scale=0.1, size=(6, 3))
+        faces = [
+            ["0", "2", "4"], ["2", "1", "4"], ["1", "3", "4"], ["3", "0", "4"],
+            ["2", "0", "5"], ["1", "2", "5"], ["3", "1", "5"], ["0", "3", "5"],
+        ]
+        return vertices, faces
+
+    @pytest.mark.parametrize("offset_type", list(OffsetType))
+    def test_matches_vertex_figure(self, offset_type):
+        """Test that batched geometry matches per-vertex VertexFigure results."""
+        vertices, faces = self.perturbed_octahedron()
+        options = GlobalOptions(offset_type=offset_type)
+        polyhedron = Polyhedron("octahedron", vertices, faces, options)
+        engine = VertexFigureEngine(vertices, polyhedron.adjacency, options)
+
+        for i in range(len(vertices)):
+            figure = engine.figure_slice(i)
+            vf = VertexFigure(
+                vertices[i],
+                i,
+                engine.vecs[figure],
+                polyhedron.adjacency.neighbors_of(i),
+                0,
+                options,
+            )
+            np.testing.assert_allclose(engine.half_edge_offset[figure], vf.half_edge_offset)
+            assert engine.vertex_offset[i] == pytest.approx(vf.vertex_offset)
+            np.testing.assert_allclose(engine.normal[i], vf.normal())
+            np.testing.assert_allclose(engine.plane_normal[i], vf.plane_normal())
+            np.testing.assert_allclose(engine.std[figure], vf.std, atol=1e-12)
+            np.testing.assert_allclose(engine.euler[i], vf.euler, atol=1e-12)
+
+    def test_low_degree_vertices(self):
+        """Test that figures without a plane normal are left unrotated."""
+        vertices = np.array([
+            [0.0, 0.0, 0.0],
+            [1.0, 0.0, 0.0],
+            [0.5, 0.866025, 0.0],
+        ])
+        faces = [["0", "1", "2"]]
+        options = GlobalOptions()
+        polyhedron = Polyhedron("triangle", vertices, faces, options)
+        engine = VertexFigureEngine(vertices, polyhedron.adjacency, options)
+
+        assert np.isnan(engine.plane_normal).all()
+        assert not np.isnan(engine.normal).any()
+        np.testing.assert_array_equal(engine.std, engine.vecs)
+        np.testing.assert_array_equal(engine.euler, np.zeros((3, 3)))
+
+    def test_gimbal_lock_angles_are_radians(self):
+        """Test that gimbal locked rotations decompose into radians."""
+        vertices, faces = self.perturbed_octahedron()
+        options = GlobalOptions()
+        polyhedron = Polyhedron("octahedron", vertices, faces, options)
+        engine = VertexFigureEngine(vertices, polyhedron.adjacency, options)
+        angles = np.array([[0.3, np.pi / 2, 0.0], [-0.7, -np.pi / 2, 0.0]])
+
+        euler = engine.matrix_to_rotation(rotation_matrices(angles))
+
+        np.testing.assert_allclose(euler, angles, atol=1e-12)
+
+
+class TestVertexFigureSignature:
+    """Tests for vertex figure signatures and tag grouping."""
+
+    @staticmethod
+    def reference_signature(vecs) -> tuple[int, ...]:
+        """The signature computed before it was vectorized."""
+        precision = 100000
+        n = len(vecs)
+        dots = sorted(
+            round(np.dot(vecs[i], vecs[j]) * precision)
+            for i in range(n)
+            for j in range(i, n)
+        )
+        triples = sorted(
+            round(np.dot(np.cross(vecs[i], vecs[j]), vecs[k]) * precision)
+            for i in range(n)
+            for j in range(n)
+            for k in range(n)
+        )
+        return tuple(dots + triples)
+
+    @pytest.mark.parametrize("path", CATALOG, ids=lambda p: p.stem)
+    def test_catalog_tags_match_reference(self, path):
+        """Test that tags match the reference signature on catalog solids."""
+        solid = parse_visual_polyhedra_file(path)
+        options = GlobalOptions()
+        polyhedron = Polyhedron(solid.name, np.array(solid.vertices), solid.faces, options)
+
+        reference: dict[tuple[int, ...], int] = {}
+        expected = [
+            reference.setdefault(self.reference_signature(vf.vecs), len(reference))
+            for vf in polyhedron.vertex_figures
+        ]
+        assert [vf.tag for vf in polyhedron.vertex_figures] == expected
+
+    def test_pluggable_hash(self):
+        """Test that a digest hash gives the same tags as the default."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "TruncatedCuboctahedron.txt")
+        vertices = np.array(solid.vertices)
+        options = GlobalOptions()
+        default = Polyhedron(solid.name, vertices, solid.faces, options)
+        hashed = Polyhedron(
+            solid.name, vertices, solid.faces, options, signature_hash=signature_blake2b
+        )
+
+        assert [vf.tag for vf in default.vertex_figures] == [
+            vf.tag for vf in hashed.vertex_figures
+        ]
+
+    def test_rotation_invariance(self):
+        """Test that a rotated vertex figure keeps its signature."""
+        vertices, faces = TestVertexFigureEngine.perturbed_octahedron()
+        polyhedron = Polyhedron("octahedron", vertices, faces, GlobalOptions())
+        vecs = polyhedron.vertex_figures[0].vecs
+        angle = 0.7
+        rotation = np.array([
+            [np.cos(angle), -np.sin(angle), 0.0],
+            [np.sin(angle), np.cos(angle), 0.0],
+            [0.0, 0.0, 1.0],
+        ])
+
+        assert polyhedron.vertex_figure_signature(vecs) == (
+            polyhedron.vertex_figure_signature(vecs @ rotation.T)
+        )
+
+
+class TestHolderClasses:
+    """Tests for grouping congruent vertex holders."""
+
+    @staticmethod
+    def rotation_z(angle: float) -> np.ndarray:
+        return np.array([
+            [np.cos(angle), -np.sin(angle), 0.0],
+            [np.sin(angle), np.cos(angle), 0.0],
+            [0.0, 0.0, 1.0],
+        ])
+
+    def test_align_rotated_figure(self):
+        """Test alignment of a figure rotated about z with permuted slots."""
+        source = np.array([
+            [0.8, 0.0, 0.6],
+            [0.0, 0.6, -0.8],
+            [-0.6, -0.8, 0.0],
+        ])
+        offsets = np.array([1.0, 2.0, 3.0])
+        rotation = self.rotation_z(1.1)
+        perm = np.array([2, 0, 1])
+        target = source[perm] @ rotation.T
+
+        Q, found = align_vertex_figures(source, target, offsets, offsets[perm])
+
+        np.testing.assert_allclose(Q, rotation, atol=1e-12)
+        assert found.tolist() == perm.tolist()
+
+    def test_align_mirrored_figure(self):
+        """Test that mirror images align with a reflection."""
+        source = np.array([
+            [0.8, 0.0, 0.6],
+            [0.0, 0.6, -0.8],
+            [-0.6, -0.8, 0.0],
+        ])
+        offsets = np.zeros(3)
+        target = source * [1.0, -1.0, 1.0]
+
+        Q, _ = align_vertex_figures(source, target, offsets, offsets)
+
+        assert np.linalg.det(Q) < 0
+        np.testing.assert_allclose(source @ Q.T, target, atol=1e-12)
+
+    def test_align_rejects_different_offsets(self):
+        """Test that congruent figures with different offsets do not align."""
+        source = np.array([
+            [0.8, 0.0, 0.6],
+            [0.0, 0.6, -0.8],
+            [-0.6, -0.8, 0.0],
+        ])
+
+        assert align_vertex_figures(source, source, np.zeros(3), np.ones(3)) is None
+
+    @pytest.mark.parametrize("offset_type", list(OffsetType))
+    def test_disdyakis_triacontahedron_classes(self, offset_type):
+        """Test that the 62 vertices of a disdyakis triacontahedron form 3 classes."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "DisdyakisTriacontahedron.txt")
+        options = GlobalOptions(offset_type=offset_type)
+        polyhedron = Polyhedron(solid.name, np.array(solid.vertices), solid.faces, options)
+
+        classes = polyhedron.holder_classes()
+
+        assert len(classes) == 3
+        assert sorted(len(c.members) for c in classes) == [12, 20, 30]
+        for holder_class in classes:
+            rep = polyhedron.vertex_figures[holder_class.representative]
+            for i in holder_class.members:
+                vf = polyhedron.vertex_figures[i]
+                moved = rep.std @ holder_class.alignments[i].T
+                distances = np.linalg.norm(vf.std[:, np.newaxis] - moved, axis=2)
+                assert vf.tag == holder_class.tag
+                assert distances.min(axis=1).max() < 1e-6
+
+    def test_per_tag_manifest(self):
+        """Test that a dry run in per_tag mode writes the vertex manifest."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cuboctahedron.txt")
+        options = GlobalOptions(render_mode=RenderMode.PER_TAG, dry_run=True)
+        polyhedron = Polyhedron(solid.name, np.array(solid.vertices), solid.faces, options)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            call_openscad(polyhedron, options, generate_outputs=True, output_dir=tmpdir)
+            with open(os.path.join(tmpdir, "manifest.csv")) as f:
+                lines = f.read().splitlines()
+
+        assert lines[0] == "vertex,tag,file,count,mirrored"
+        assert len(lines) == 1 + len(polyhedron.vertices)
+        assert all(line.split(",")[2:4] == ["t000.stl", "12"] for line in lines[1:])
+
+
+@pytest.fixture
+def fake_openscad(tmp_path, monkeypatch):
+    """Put an openscad on PATH that logs its calls and writes its -o file.
+
+    FAKE_OPENSCAD_FAILURES makes the first calls fail and FAKE_OPENSCAD_SLEEP
+    delays every call. --version and --help are answered without logging;
+    FAKE_OPENSCAD_HELP replaces the help text.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "openscad.log"
+    script = bin_dir / "openscad"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import os, sys, time\n"
+        "if sys.argv[1:] == ['--version']:\n"
+        "    sys.exit(print('OpenSCAD version 2021.01', file=sys.stderr))\n"
+        "if sys.argv[1:] == ['--help']:\n"
+        "    sys.exit(print(os.environ.get('FAKE_OPENSCAD_HELP', '--enable arg')))\n"
+        f"open({str(log)!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')\n"
+        f"calls = len(open({str(log)!r}).read().splitlines())\n"
+        "time.sleep(float(os.environ.get('FAKE_OPENSCAD_SLEEP', 0)))\n"
+        "if calls <= int(os.environ.get('FAKE_OPENSCAD_FAILURES', 0)):\n"
+        "    sys.exit('ERROR: fake failure')\n"
+        "if '-o' in sys.argv:\n"
+        "    open(sys.argv[sys.argv.index('-o') + 1], 'w').write('solid fake\\n')\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(REPO_DIR)
+    return log
+
+
+class TestRenderCache:
+    """Tests for RenderCache class."""
+
+    def test_second_run_hits_cache(self, tmp_path, fake_openscad):
+        """Test that an identical rerun renders nothing."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(cache_dir=str(tmp_path / "cache"))
+        polyhedron = Polyhedron(solid.name, np.array(solid.vertices), solid.faces, options)
+
+        call_openscad(polyhedron, options, True, str(tmp_path / "first"))
+        renders = len(fake_openscad.read_text().splitlines())
+        call_openscad(polyhedron, options, True, str(tmp_path / "second"))
+
+        assert renders == 8
+        assert len(fake_openscad.read_text().splitlines()) == renders
+        assert (tmp_path / "second" / "v007.stl").read_text() == "solid fake\n"
+
+    def test_key_depends_on_geometry_options(self, tmp_path):
+        """Test that geometry options change the key and colors do not."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        vertices = np.array(solid.vertices)
+        cache = RenderCache(str(tmp_path), 1 << 20, scad_dir=str(REPO_DIR / "scad"))
+
+        def key(**kwargs):
+            options = GlobalOptions(**kwargs)
+            polyhedron = Polyhedron(solid.name, vertices, solid.faces, options)
+            return cache.key(OpenscadArgs(polyhedron, options), 0, "vertex_holder")
+
+        assert key() == key(colors=["black"])
+        assert key() != key(wall_thickness=2.0)
+        assert key() != key(label_vertices=False)
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entries are evicted first."""
+        cache = RenderCache(str(tmp_path / "cache"), 25, scad_dir=str(REPO_DIR / "scad"))
+        for i, key in enumerate(["aa1", "bb2", "cc3"]):
+            source = tmp_path / f"{key}.stl"
+            source.write_text("x" * 10)
+            cache.store(key, str(source))
+            os.utime(cache.path(key), (i, i))
+        assert cache.fetch("aa1", str(tmp_path / "out.stl"))
+
+        cache.evict()
+
+        assert not os.path.exists(cache.path("bb2"))
+        assert os.path.exists(cache.path("aa1"))
+        assert os.path.exists(cache.path("cc3"))
+        assert cache.evicted == 1
+
+    def test_hits_record_stored_renderer(self, tmp_path, fake_openscad):
+        """Test that build.json names the renderer of restored outputs."""
+        cache = RenderCache(str(tmp_path / "cache"), 1 << 20)
+        (job,) = TestRenderScheduler.render_jobs(tmp_path, 1)
+        source = tmp_path / "old.stl"
+        source.write_text("solid old\n")
+        key = cache.key(job.openscad_args, 0, "vertex_holder")
+        cache.store(key, str(source), "openscad 2019.05 cgal")
+        outputs = BuildManifest(str(tmp_path))
+        scheduler = RenderScheduler(renderer="openscad 2021.01 cgal")
+
+        render_all(scheduler, [job], cache, outputs=outputs)
+
+        entry = outputs.artifacts["v000.stl"]
+        assert entry["renderer"] == "openscad 2019.05 cgal"
+        assert entry["cached"] is True
+        assert not fake_openscad.exists()
+
+        cache.max_bytes = 0
+        cache.evict()
+        assert os.listdir(os.path.dirname(cache.path(key))) == []
+
+    def test_forced_rerender_keeps_entries(self, tmp_path, fake_openscad):
+        """Test that re-rendering over restored outputs leaves the cache intact."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        output_dir = str(tmp_path / "out")
+
+        def render(output_dir, **kwargs):
+            options = GlobalOptions(
+                cache_dir=str(tmp_path / "cache"),
+                backend=RenderBackend.NATIVE,
+                render_mode=RenderMode.PER_TAG,
+                force=True,
+                **kwargs,
+            )
+            polyhedron = Polyhedron(
+                solid.name, np.array(solid.vertices), solid.faces, options
+            )
+            call_openscad(polyhedron, options, True, output_dir)
+            return (Path(output_dir) / "t000.stl").read_bytes()
+
+        original = render(output_dir)
+        assert render(output_dir) == original
+        assert render(output_dir, wall_thickness=2.0) != original
+
+        assert render(str(tmp_path / "again")) == original
+
+
+def modification_times(output_dir) -> dict[str, int]:
+    return {
+        p.name: p.stat().st_mtime_ns
+        for p in Path(output_dir).iterdir()
+        if p.name != "build.json"
+    }
+
+
+class TestBuildManifest:
+    """Tests for incremental regeneration with BuildManifest."""
+
+    def generate(self, tmp_path, **options):
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(**options)
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+        return modification_times(tmp_path / "out")
+
+    def changed(self, before, after) -> set[str]:
+        return {
+            name
+            for name in before.keys() | after.keys()
+            if before.get(name) != after.get(name)
+        }
+
+    def test_rerun_rebuilds_nothing(self, tmp_path, fake_openscad):
+        """Test that an identical rerun leaves every output untouched."""
+        before = self.generate(tmp_path)
+        after = self.generate(tmp_path)
+
+        assert len(fake_openscad.read_text().splitlines()) == 8
+        assert self.changed(before, after) == set()
+
+    def test_rods_per_cut_touches_only_svgs(self, tmp_path, fake_openscad):
+        """Test that rods_per_cut rebuilds the SVGs and removes stale ones."""
+        before = self.generate(tmp_path)
+        after = self.generate(tmp_path, rods_per_cut=5)
+
+        assert self.changed(before, after) == {
+            "lasercut000.svg",
+            "lasercut001.svg",
+            "lasercut002.svg",
+        }
+        after = self.generate(tmp_path)
+        assert "lasercut001.svg" not in after
+        assert len(fake_openscad.read_text().splitlines()) == 8
+
+    def test_label_vertices_touches_only_stls(self, tmp_path, fake_openscad):
+        """Test that label_vertices rebuilds the vertex holders only."""
+        before = self.generate(tmp_path)
+        after = self.generate(tmp_path, label_vertices=False)
+
+        assert self.changed(before, after) == {f"v{i:03}.stl" for i in range(8)}
+
+    def test_offset_type_rebuilds_vertices_csv(self, tmp_path, fake_openscad):
+        """Test that vertices.csv follows the edge names offset_type ranks."""
+        before = self.generate(tmp_path)
+        after = self.generate(tmp_path, offset_type=OffsetType.PER_HALF_EDGE)
+
+        assert {"vertices.csv", "lengths.csv"} <= self.changed(before, after)
+
+    def test_modified_output_is_rebuilt(self, tmp_path, fake_openscad):
+        """Test that outputs changed or removed since are regenerated."""
+        self.generate(tmp_path)
+        (tmp_path / "out" / "v003.stl").write_text("edited\n")
+        (tmp_path / "out" / "lengths.csv").unlink()
+
+        self.generate(tmp_path)
+
+        assert len(fake_openscad.read_text().splitlines()) == 9
+        assert (tmp_path / "out" / "v003.stl").read_text() == "solid fake\n"
+        assert (tmp_path / "out" / "lengths.csv").exists()
+
+    def test_force(self, tmp_path, fake_openscad):
+        """Test that force ignores the manifest."""
+        self.generate(tmp_path)
+        self.generate(tmp_path, force=True)
+
+        assert len(fake_openscad.read_text().splitlines()) == 16
+
+
+class TestProfiler:
+    """Tests for Profiler class."""
+
+    def test_disabled(self):
+        """Test that stages are not recorded before start()."""
+        profiler = Profiler()
+        with profiler.stage("parse"):
+            profiler.add("render_job", 1.0)
+
+        assert profiler.finished() == []
+
+    def test_nested_stages(self):
+        """Test that nested stages are recorded parent first with their paths."""
+        profiler = Profiler()
+        profiler.start(trace_memory=True)
+        with profiler.stage("parse"):
+            with profiler.stage("edge_table"):
+                data = np.ones(1 << 20)
+            del data
+        with profiler.stage("render", "vertex_holder"):
+            profiler.add("render_job", 2.5, "v000.stl")
+
+        records = profiler.finished()
+        assert [r.path for r in records] == [
+            "parse",
+            "parse/edge_table",
+            "render",
+            "render/render_job",
+        ]
+        assert records[1].peak_traced >= 8 << 20
+        assert records[0].peak_traced >= records[1].peak_traced
+        assert records[0].wall >= records[1].wall
+        assert records[3].wall == 2.5 and records[3].cpu is None
+        assert records[2].detail == "vertex_holder"
+
+    def test_hooks_and_sinks(self):
+        """Test that hooks wrap only their stages and sinks see every record."""
+        profiler = Profiler()
+        profiler.start()
+        entered, finished = [], []
+
+        @contextlib.contextmanager
+        def hook(stage):
+            entered.append(stage)
+            yield
+
+        profiler.add_hook(hook, ["annotate_vertex_figures"])
+        profiler.add_sink(lambda record: finished.append(record.path))
+        with profiler.stage("parse"):
+            with profiler.stage("annotate_vertex_figures"):
+                pass
+
+        assert entered == ["annotate_vertex_figures"]
+        assert finished == ["parse/annotate_vertex_figures", "parse"]
+
+    def test_pipeline_report(self, tmp_path, monkeypatch):
+        """Test that the pipeline stages appear in the JSON and table reports."""
+        profiler = Profiler()
+        profiler.start()
+        monkeypatch.setattr(vertexprint, "PROFILER", profiler)
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(dry_run=True)
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+
+        profiler.save(str(tmp_path / "profile.json"))
+        stages = json.loads((tmp_path / "profile.json").read_text())["stages"]
+        assert [stage["stage"] for stage in stages] == [
+            "edge_table",
+            "adjacency",
+            "annotate_vertex_figures",
+            "annotate_vertex_figures/signatures",
+            "compute_edge_lengths",
+            "vertices.csv",
+            "lengths.csv",
+            "histogram.png",
+            "lasercut",
+        ]
+        assert "annotate_vertex_figures" in profiler.report()
+
+
+class TestRenderScheduler:
+    """Tests for RenderScheduler class."""
+
+    @staticmethod
+    def render_jobs(tmp_path, count: int) -> list[RenderJob]:
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions()
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        openscad_args = OpenscadArgs(polyhedron, options)
+        return [
+            RenderJob(openscad_args, i, str(tmp_path / f"v{i:03d}.stl"))
+            for i in range(count)
+        ]
+
+    def test_renders_all_jobs(self, tmp_path, fake_openscad):
+        """Test that every job is rendered through a payload file."""
+        results = RenderScheduler(jobs=2).run(self.render_jobs(tmp_path, 4))
+
+        assert all(result.ok for result in results), [r.stderr for r in results]
+        assert [result.job.vertex_index for result in results] == [0, 1, 2, 3]
+        calls = fake_openscad.read_text().splitlines()
+        assert len(calls) == 4
+        assert all(call.endswith(".stl.scad") for call in calls)
+
+    def test_failure_is_reported(self, tmp_path, fake_openscad, monkeypatch):
+        """Test that a failed render keeps its exit code and stderr."""
+        monkeypatch.setenv("FAKE_OPENSCAD_FAILURES", "1")
+        (result,) = RenderScheduler().run(self.render_jobs(tmp_path, 1))
+
+        assert not result.ok
+        assert result.returncode == 1
+        assert "fake failure" in result.stderr
+        assert result.reason() == "exit code 1"
+
+    def test_failure_is_retried(self, tmp_path, fake_openscad, monkeypatch):
+        """Test that a failed render succeeds on retry."""
+        monkeypatch.setenv("FAKE_OPENSCAD_FAILURES", "1")
+        (result,) = RenderScheduler(retries=1).run(self.render_jobs(tmp_path, 1))
+
+        assert result.ok
+        assert result.attempts == 2
+
+    def test_timeout_kills_render(self, tmp_path, fake_openscad, monkeypatch):
+        """Test that a render exceeding the timeout is killed."""
+        monkeypatch.setenv("FAKE_OPENSCAD_SLEEP", "10")
+        (result,) = RenderScheduler(timeout=0.5).run(self.render_jobs(tmp_path, 1))
+
+        assert result.timed_out
+        assert not result.ok
+        assert result.seconds < 5
+
+
+BACKEND_HELP = (
+    "--backend arg  3D rendering backend to use: 'CGAL' (old/slow) [default] "
+    "or 'Manifold' (new/fast)"
+)
+
+
+class TestOpenscadEngine:
+    """Tests for OpenSCAD engine selection."""
+
+    def test_release_renders_with_cgal(self):
+        """Test that auto falls back to CGAL where Manifold is not offered."""
+        features = OpenscadFeatures("2021.01", "--enable arg  enable features")
+
+        assert features.resolve(OpenscadEngine.AUTO) == OpenscadEngine.CGAL
+        assert features.flags(OpenscadEngine.CGAL) == []
+        with pytest.raises(ValueError):
+            features.resolve(OpenscadEngine.MANIFOLD)
+
+    def test_manifold_flags(self):
+        """Test the flags selecting Manifold in both snapshot generations."""
+        backend = OpenscadFeatures("2024.12.06", BACKEND_HELP)
+        experimental = OpenscadFeatures(
+            "2023.11.21", "--enable arg  features: manifold | lazy-union"
+        )
+
+        assert backend.resolve(OpenscadEngine.AUTO) == OpenscadEngine.MANIFOLD
+        assert backend.flags(OpenscadEngine.MANIFOLD) == ["--backend=manifold"]
+        assert backend.flags(OpenscadEngine.CGAL) == ["--backend=cgal"]
+        assert experimental.flags(OpenscadEngine.MANIFOLD) == ["--enable=manifold"]
+
+    def test_renders_record_engine(self, tmp_path, fake_openscad, monkeypatch, capsys):
+        """Test that auto renders with Manifold and build.json records it."""
+        monkeypatch.setenv("FAKE_OPENSCAD_HELP", BACKEND_HELP)
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(openscad_flags=["--enable=lazy-union"])
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+
+        calls = fake_openscad.read_text().splitlines()
+        assert len(calls) == 8
+        assert all(
+            call.startswith("--backend=manifold --enable=lazy-union -o")
+            for call in calls
+        )
+        manifest = json.loads((tmp_path / "out" / "build.json").read_text())
+        renderer = "openscad 2021.01 manifold"
+        assert manifest["artifacts"]["v000.stl"]["renderer"] == renderer
+        assert f"{renderer}: 8 renders" in capsys.readouterr().out
+
+    def test_engine_change_rebuilds(self, tmp_path, fake_openscad, monkeypatch):
+        """Test that switching engines rebuilds the holders."""
+        monkeypatch.setenv("FAKE_OPENSCAD_HELP", BACKEND_HELP)
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions()
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+        options.openscad_engine = OpenscadEngine.MANIFOLD
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+        options.openscad_engine = OpenscadEngine.CGAL
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+
+        calls = fake_openscad.read_text().splitlines()
+        assert len(calls) == 16
+        assert all(call.startswith("--backend=cgal") for call in calls[8:])
+
+
+def assert_closed(mesh):
+    """Assert that every directed edge of mesh has exactly one opposite."""
+    _, faces = mesh
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    directed = {tuple(e) for e in edges.tolist()}
+    assert len(directed) == len(edges)
+    assert all((b, a) in directed for a, b in directed)
+
+
+def signed_volume(mesh) -> float:
+    vertices, faces = mesh
+    a, b, c = (vertices[faces[:, i]] for i in range(3))
+    return float(np.sum(np.einsum("ij,ij->i", a, np.cross(b, c))) / 6)
+
+
+class TestNativeBackend:
+    """Tests for the native mesh backend."""
+
+    def test_revolved_mesh_is_closed_and_outward(self):
+        """Test that a revolved profile is a closed, outward oriented solid."""
+        mesh = revolved_mesh([(2.0, -1.0), (2.0, 3.0), (1.0, 5.0)], 32)
+
+        assert_closed(mesh)
+        # Area of the 32-gon with unit circumradius
+        area = 0.5 * 32 * np.sin(2 * np.pi / 32)
+        prism = area * 2**2 * 4
+        frustum = area * 2 / 3 * (2**2 + 2 * 1 + 1**2)
+        assert signed_volume(mesh) == pytest.approx(prism + frustum)
+
+    def test_binary_stl_round_trip(self, tmp_path):
+        """Test that save_binary_stl writes triangles stl_reader reads back."""
+        mesh = revolved_mesh([(1.0, 0.0), (1.0, 2.0)], 12)
+        path = tmp_path / "mesh.stl"
+        save_binary_stl(str(path), mesh)
+
+        vertices, indices = stl_reader.read(str(path))
+
+        assert path.stat().st_size == 84 + 50 * len(mesh[1])
+        np.testing.assert_allclose(
+            np.sort(vertices[indices].reshape(-1, 3), axis=0),
+            np.sort(mesh[0][mesh[1]].reshape(-1, 3), axis=0),
+            atol=1e-5,
+        )
+
+    def test_holder_sits_on_cutoff_plane(self):
+        """Test that a built holder is closed and its base is the cutoff plane."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions()
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        openscad_args = OpenscadArgs(polyhedron, options)
+        builder = TubularHolderBuilder(options, fn=16)
+        vecs = openscad_args.vertex_figures[0]
+        offsets = openscad_args.offsets[0]
+
+        mesh = builder.build(vecs, offsets)
+
+        assert_closed(mesh)
+        assert signed_volume(mesh) > 0
+        assert mesh[0][:, 2].min() == pytest.approx(
+            builder.cutoff_height(vecs, offsets)
+        )
+
+    def test_per_tag_renders_without_openscad(self, tmp_path, fake_openscad):
+        """Test that the native backend renders every class holder in-process."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(
+            render_mode=RenderMode.PER_TAG, backend=RenderBackend.NATIVE
+        )
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+
+        call_openscad(polyhedron, options, True, str(tmp_path))
+
+        assert not fake_openscad.exists()
+        assert (tmp_path / "t000.stl").read_bytes()[:5] != b"solid"
+
+    def test_rejects_conical_holders(self, tmp_path):
+        """Test that the native backend refuses holder types it cannot build."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(
+            vertex_type=VertexType.CONICAL, backend=RenderBackend.NATIVE
+        )
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+
+        with pytest.raises(ValueError):
+            call_openscad(polyhedron, options, True, str(tmp_path))
+
+
+class TestAssemblyPreview:
+    """Tests for AssemblyPreview class."""
+
+    @staticmethod
+    def preview(name):
+        solid = parse_visual_polyhedra_file(DATA_DIR / name)
+        options = GlobalOptions()
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        return polyhedron, AssemblyPreview(polyhedron, options)
+
+    @staticmethod
+    def axes(preview, first, count):
+        """Bottom and top centers of count cylinders from cylinder first."""
+        vertices, _ = preview.mesh
+        per_cylinder = 2 * PREVIEW_FN + 2
+        centers = vertices.reshape(-1, per_cylinder, 3)[first : first + count]
+        return centers[:, -2], centers[:, -1]
+
+    def test_rods_span_edges(self):
+        """Test that rods run between the scaled vertices of each edge."""
+        polyhedron, preview = self.preview("Cube.txt")
+        scale = 200 / np.linalg.norm(polyhedron.vertices[0])
+        start, end = polyhedron.edges.endpoints.T
+
+        bottoms, tops = self.axes(preview, 0, len(start))
+
+        np.testing.assert_allclose(bottoms, scale * polyhedron.vertices[start])
+        np.testing.assert_allclose(tops, scale * polyhedron.vertices[end])
+
+    def test_tubes_point_along_edges(self):
+        """Test that every placed tube points at its neighbor, gimbal lock too."""
+        polyhedron, preview = self.preview("DeltoidalIcositetrahedron.txt")
+        vertices = polyhedron.vertices
+        expected = np.array(
+            [
+                vertices[n] - vertices[vf.vertex_index]
+                for vf in polyhedron.vertex_figures
+                for n in vf.neighbors
+            ]
+        )
+
+        bottoms, tops = self.axes(preview, len(polyhedron.edges), len(expected))
+
+        axes = tops - bottoms
+        np.testing.assert_allclose(
+            axes / np.linalg.norm(axes, axis=1)[:, None],
+            expected / np.linalg.norm(expected, axis=1)[:, None],
+            atol=1e-9,
+        )
+
+    def test_ply_is_colored_by_tag(self, tmp_path):
+        """Test the binary PLY layout and its rod and tag colors."""
+        polyhedron, preview = self.preview("Cube.txt")
+        path = tmp_path / "cube.ply"
+
+        preview.save(str(path))
+
+        data = path.read_bytes()
+        header, body = data.split(b"end_header\n")
+        vertices, faces = preview.mesh
+        assert f"element vertex {len(vertices)}".encode() in header
+        assert len(body) == 15 * len(vertices) + 13 * len(faces)
+        colors = np.frombuffer(body[: 15 * len(vertices)], dtype=np.uint8).reshape(
+            -1, 15
+        )[:, 12:]
+        assert colors[0].tolist() == [211, 211, 211]
+        assert colors[-1].tolist() == [255, 0, 0]
+
+    def test_unknown_format_rejected(self, tmp_path):
+        """Test that only STL and PLY previews are written."""
+        _, preview = self.preview("Cube.txt")
+
+        with pytest.raises(ValueError):
+            preview.save(str(tmp_path / "cube.gltf"))
+
+
+class TestFlatScad:
+    """Tests for flat SCAD codegen of vertex holders."""
+
+    @staticmethod
+    def openscad_args(name, **kwargs):
+        solid = parse_visual_polyhedra_file(DATA_DIR / name)
+        options = GlobalOptions(
+            object_type=ObjectType.VERTEX_HOLDER,
+            scad_codegen=ScadCodegen.FLAT,
+            **kwargs,
+        )
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        return OpenscadArgs(polyhedron, options)
+
+    def test_placements_match_holder_builder(self):
+        """Test that vectorized placements match the per-tube builder math."""
+        args = self.openscad_args(
+            "TruncatedIcosahedron.txt", offset_type=OffsetType.PER_HALF_EDGE
+        )
+        builder = TubularHolderBuilder(args.options)
+        options = args.options
+        for index in range(len(args.vertex_figures)):
+            vecs = np.asarray(args.vertex_figures[index])
+            offsets = np.asarray(args.offsets[index])
+            placements = TubePlacements(vecs, offsets, options)
+
+            cutoff = builder.cutoff_height(vecs, offsets)
+            assert placements.cutoff == pytest.approx(cutoff)
+            for i, (v, offset) in enumerate(zip(vecs, offsets)):
+                top = builder.lowest_point(v, offset + options.tube_depth)
+                drop = (
+                    -options.outer_tube_radius
+                    - top[2]
+                    + cutoff
+                    + (offset + options.tube_depth) * v[2]
+                )
+                assert placements.support_tops[i] == pytest.approx([0, 0, drop])
+
+    def test_holder_has_no_loops_or_functions(self):
+        """Test that a flat holder is only transforms, primitives and CSG."""
+        args = self.openscad_args("Cube.txt")
+
+        source = flat_holder_scad(args, 0)
+
+        for keyword in ["for", "let", "function", "module", "include", "use"]:
+            assert f"{keyword} " not in source and f"{keyword}(" not in source
+        assert source.count("linear_extrude") == 2 * 3
+        assert source.count("hull()") == sum(
+            TubePlacements(
+                args.vertex_figures[0], args.offsets[0], args.options
+            ).supported
+        )
+
+    def test_labeled_holder_imports_class_holder(self):
+        """Test that a flat labeled holder cuts labels into the imported class holder."""
+        args = self.openscad_args("Cube.txt", label_vertices=True)
+        args.options.object_type = ObjectType.LABELED_HOLDER
+        extra = [("TAG_FILE", '"/out/class0.stl"'), ("ALIGNMENT", "[[1,0],[0,1]]")]
+
+        source = flat_holder_scad(args, 2, extra)
+
+        assert 'multmatrix([[1,0],[0,1]]) import("/out/class0.stl");' in source
+        assert "cylinder(d1=" not in source
+        assert source.count('text("2"') == 3
+
+    def test_render_job_writes_flat_file(self, tmp_path):
+        """Test that flat codegen renders a generated file instead of interface.scad."""
+        args = self.openscad_args("Cube.txt")
+        job = RenderJob(args, 4, str(tmp_path / "v004.stl"))
+
+        command = job.command(str(tmp_path))
+
+        assert command == [
+            "openscad",
+            "-o",
+            str(tmp_path / "v004.stl"),
+            str(tmp_path / "v004.stl.scad"),
+        ]
+        assert "interface.scad" not in (tmp_path / "v004.stl.scad").read_text()
+
+    def test_conical_holders_rejected(self):
+        """Test that flat codegen refuses conical holders."""
+        args = self.openscad_args("Cube.txt", vertex_type=VertexType.CONICAL)
+
+        with pytest.raises(ValueError):
+            flat_holder_scad(args, 0)
+
+    def test_label_dir_imports_labels(self):
+        """Test that a flat holder imports cached labels instead of text()."""
+        args = self.openscad_args("Cube.txt", label_vertices=True)
+
+        source = flat_holder_scad(args, 2, [("LABEL_DIR", '"/cache/labels/abc"')])
+
+        assert "text(" not in source
+        assert 'import("/cache/labels/abc/2.stl");' in source
+        assert source.count("import(") == 2 * len(args.vertex_figure_edges[2])
+
+
+class TestLabelCache:
+    """Tests for LabelCache class."""
+
+    @staticmethod
+    def render_jobs(tmp_path) -> list[RenderJob]:
+        return TestRenderScheduler.render_jobs(tmp_path, 8)
+
+    def test_labels_rendered_once(self, tmp_path, fake_openscad):
+        """Test that each distinct label is rendered once and then reused."""
+        jobs = self.render_jobs(tmp_path)
+        texts = {str(job.vertex_index) for job in jobs} | {
+            str(e) for edges in jobs[0].openscad_args.vertex_figure_edges for e in edges
+        }
+        cache = LabelCache(str(tmp_path / "cache"), GlobalOptions())
+
+        results = cache.attach(RenderScheduler(jobs=2), jobs)
+
+        assert all(result.ok for result in results)
+        assert cache.rendered == len(texts)
+        assert sorted(os.listdir(cache.directory)) == sorted(f"{t}.stl" for t in texts)
+        label_dir = f'"{os.path.abspath(cache.directory)}"'
+        assert all(job.extra == [("LABEL_DIR", label_dir)] for job in jobs)
+
+        again = LabelCache(str(tmp_path / "cache"), GlobalOptions())
+        assert again.attach(RenderScheduler(), self.render_jobs(tmp_path)) == []
+        assert again.reused == len(texts)
+        assert len(fake_openscad.read_text().splitlines()) == len(texts)
+
+    def test_holders_reuse_labels_across_runs(self, tmp_path, fake_openscad):
+        """Test that a second run renders the holders but no labels."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(label_cache=True, cache_dir=str(tmp_path / "cache"))
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+
+        call_openscad(polyhedron, options, True, str(tmp_path / "first"))
+        options.tubular_supports = False
+        call_openscad(polyhedron, options, True, str(tmp_path / "second"))
+
+        calls = fake_openscad.read_text().splitlines()
+        labels = [call for call in calls if "label-" in call]
+        assert len(labels) == 12
+        assert len(calls) == len(labels) + 2 * 8
+
+    def test_key_depends_on_label_options(self, tmp_path):
+        """Test that label options change the cache directory."""
+        root = str(tmp_path)
+
+        default = LabelCache(root, GlobalOptions()).directory
+
+        assert LabelCache(root, GlobalOptions(wall_thickness=2)).directory != default
+        assert LabelCache(root, GlobalOptions(rods_per_cut=5)).directory == default
+
+    def test_failure_falls_back_to_text(self, tmp_path, fake_openscad, monkeypatch):
+        """Test that jobs keep text() labels if a label fails to render."""
+        monkeypatch.setenv("FAKE_OPENSCAD_FAILURES", "1")
+        jobs = self.render_jobs(tmp_path)
+        cache = LabelCache(str(tmp_path / "cache"), GlobalOptions())
+
+        results = cache.attach(RenderScheduler(), jobs)
+
+        assert sum(not result.ok for result in results) == 1
+        assert all(job.extra == [] for job in jobs)
+        assert not any(
+            name.endswith(".tmp.stl") for name in os.listdir(cache.directory)
+        )
+
+
+class TestTessellation:
+    """Tests for the $fn policy and draft renders."""
+
+    def test_fn_meets_chordal_error(self):
+        """Test that holder_fn picks the fewest segments within the error."""
+        for error in [0.001, 0.01, 0.05]:
+            options = GlobalOptions(chordal_error=error)
+            radius = options.outer_tube_radius
+            fn = holder_fn(options)
+
+            assert radius * (1 - np.cos(np.pi / fn)) <= error
+            assert radius * (1 - np.cos(np.pi / (fn - 1))) > error
+        assert holder_fn(GlobalOptions()) == 60
+        assert holder_fn(GlobalOptions(chordal_error=10)) == 8
+
+    def test_fn_reaches_openscad(self):
+        """Test that the policy sets FN for interface.scad and flat codegen."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(
+            object_type=ObjectType.VERTEX_HOLDER, chordal_error=0.05
+        )
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        args = OpenscadArgs(polyhedron, options)
+        fn = holder_fn(options)
+
+        assert f"-DFN={fn}" in args.to_openscad_args()
+        assert f"$fn = {fn};" in flat_holder_scad(args, 0)
+
+    def generate(self, tmp_path, **options):
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        options = GlobalOptions(draft=True, payload_files=False, **options)
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        call_openscad(polyhedron, options, True, str(tmp_path / "out"))
+
+    def test_draft_renders_coarse_then_final(self, tmp_path, fake_openscad):
+        """Test that --draft renders every holder coarsely, then finely."""
+        self.generate(tmp_path)
+
+        calls = fake_openscad.read_text().splitlines()
+        assert len(calls) == 16
+        assert all("-DFN=8 " in call and "/draft/" in call for call in calls[:8])
+        assert all("-DFN=60 " in call for call in calls[8:])
+        assert (tmp_path / "out" / "draft" / "v007.stl").exists()
+        assert (tmp_path / "out" / "v007.stl").exists()
+
+        self.generate(tmp_path)
+        assert len(fake_openscad.read_text().splitlines()) == 16
+
+    def test_draft_failure_skips_final(self, tmp_path, fake_openscad, monkeypatch):
+        """Test that a failed draft render skips the final pass."""
+        monkeypatch.setenv("FAKE_OPENSCAD_FAILURES", "1")
+        self.generate(tmp_path)
+
+        assert len(fake_openscad.read_text().splitlines()) == 8
+        assert not (tmp_path / "out" / "v000.stl").exists()
+
 
 class TestOpenscadArgs:
     """Tests for OpenscadArgs class."""
@@ -497,6 +1766,37 @@ class TestOpenscadArgs:
 
         assert "-DLABEL_VERTICES=true" in scad_args
 
+    def test_to_payload_holds_one_vertex(self):
+        """Test that a payload sets only the data of one holder."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "TruncatedIcosahedron.txt")
+        options = GlobalOptions(offset_type=OffsetType.PER_HALF_EDGE)
+        polyhedron = Polyhedron(solid.name, np.array(solid.vertices), solid.faces, options)
+        args = OpenscadArgs(polyhedron, options)
+
+        payload = args.to_payload(5, "/abs/scad/interface.scad").splitlines()
+
+        assert payload[0] == "include </abs/scad/interface.scad>"
+        assert "PAYLOAD = true;" in payload
+        assert "INDEX = 5;" in payload
+        assert "BY_TAG = false;" in payload
+        assert "BY_TAG = true;" not in payload
+        assert not any(line.startswith("vertices =") for line in payload)
+        figure = next(line for line in payload if line.startswith("payload_figure"))
+        assert figure.count("],[") == len(polyhedron.vertex_figures[5].std) - 1
+
+    def test_payload_size_independent_of_mesh(self):
+        """Test that payload size does not grow with the number of vertices."""
+        sizes = []
+        for name in ["Cube.txt", "TruncatedCube.txt"]:
+            solid = parse_visual_polyhedra_file(DATA_DIR / name)
+            options = GlobalOptions()
+            polyhedron = Polyhedron(solid.name, np.array(solid.vertices), solid.faces, options)
+            args = OpenscadArgs(polyhedron, options)
+            sizes.append(len(args.to_payload(0, "interface.scad")))
+
+        # Both solids have degree 3 vertices
+        assert abs(sizes[0] - sizes[1]) < 200
+
     def test_polyhedron_offset_array_global(self):
         """Test offset array generation with global offset type."""
         vertices = np.array([
@@ -532,6 +1832,29 @@ class TestOpenscadArgs:
         assert len(offsets) == len(polyhedron.vertex_figures)
 
 
+class TestLazyImports:
+    """Tests that slow modules are only imported by the stages that use them."""
+
+    def test_dry_run_obj_preview(self, tmp_path):
+        """Test that a dry-run OBJ preview imports none of the slow modules."""
+        path = tmp_path / "cube.obj"
+        parse_visual_polyhedra_file(DATA_DIR / "Cube.txt").to_obj(str(path))
+        code = (
+            "import runpy, sys\n"
+            f"sys.argv = ['vertexprint.py', '--file', {str(path)!r}, '--dry-run']\n"
+            "runpy.run_path('scripts/vertexprint.py', run_name='__main__')\n"
+            "slow = ['matplotlib', 'pymeshlab', 'stl_reader', 'cairo']\n"
+            "print([name for name in slow if name in sys.modules])\n"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines()[-1] == "[]"
+
+
 class TestParseStl:
     """Tests for parse_stl function."""
 
@@ -599,5 +1922,153 @@ class TestParseStl:
             os.unlink(f.name)
 
 
+OBJ_WITH_REFERENCES = """# quad with texture coordinates and normals
+o quad
+v 0 0 0
+v 1 0 0 1.0
+vt 0 0
+vn 0 0 1
+v 0 1 0
+f 1/1/1 2/1/1 3/1/1
+v 1 1 0
+f -3//1 -1//1 -2//1
+f\t1 2 4 3
+"""
+
+
+class TestParseObj:
+    """Tests for read_obj and parse_obj functions."""
+
+    def test_face_references_and_negative_indices(self, tmp_path):
+        """Test that v/vt/vn tokens and negative indices resolve to vertices."""
+        path = tmp_path / "quad.obj"
+        path.write_text(OBJ_WITH_REFERENCES)
+
+        mesh = read_obj(str(path))
+
+        np.testing.assert_array_equal(
+            mesh.vertices, [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]]
+        )
+        assert mesh.faces() == [[0, 1, 2], [1, 3, 2], [0, 1, 3, 2]]
+
+    @pytest.mark.parametrize("memory_map", [False, True])
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+    def test_chunking_does_not_change_result(self, tmp_path, memory_map, chunk_size):
+        """Test that chunk boundaries and memory mapping give the same mesh."""
+        path = tmp_path / "quad.obj"
+        path.write_text(OBJ_WITH_REFERENCES)
+
+        mesh = read_obj(str(path), chunk_size=chunk_size, memory_map=memory_map)
+
+        assert len(mesh) == 3
+        assert mesh.faces() == [[0, 1, 2], [1, 3, 2], [0, 1, 3, 2]]
+        assert mesh.vertices.shape == (4, 3)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+    def test_indented_lines(self, tmp_path, chunk_size):
+        """Test that v and f lines with leading blanks are read, as strip() did."""
+        path = tmp_path / "quad.obj"
+        lines = OBJ_WITH_REFERENCES.splitlines()
+        indents = ["  ", "\t", " \t"]
+        path.write_text(
+            "\n".join(indents[i % 3] + line for i, line in enumerate(lines))
+            + "\n   \n\t"
+        )
+
+        mesh = read_obj(str(path), chunk_size=chunk_size)
+
+        np.testing.assert_array_equal(
+            mesh.vertices, [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]]
+        )
+        assert mesh.faces() == [[0, 1, 2], [1, 3, 2], [0, 1, 3, 2]]
+
+    def test_parse_obj_is_quiet(self, tmp_path, capsys):
+        """Test that parse_obj builds a Polyhedron without printing faces."""
+        path = tmp_path / "quad.obj"
+        path.write_text(OBJ_WITH_REFERENCES)
+
+        polyhedron = parse_obj(str(path), GlobalOptions())
+
+        assert polyhedron.name == "quad"
+        assert len(polyhedron.vertices) == 4
+        assert capsys.readouterr().out == ""
+
+    def test_no_vertices(self, tmp_path):
+        """Test that an OBJ file without vertices is rejected."""
+        path = tmp_path / "empty.obj"
+        path.write_text("# nothing here\n")
+
+        with pytest.raises(ValueError):
+            parse_obj(str(path), GlobalOptions())
+
+
+class TestCompiledMesh:
+    """Tests for save_compiled and load_compiled."""
+
+    @pytest.mark.parametrize(
+        "offset_type", [OffsetType.PER_SOLID, OffsetType.PER_HALF_EDGE]
+    )
+    def test_round_trip(self, tmp_path, offset_type):
+        """Test that a loaded mesh produces the same OpenSCAD arguments."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "TruncatedCuboctahedron.txt")
+        options = GlobalOptions(offset_type=offset_type)
+        polyhedron = Polyhedron(
+            solid.name, np.array(solid.vertices), solid.faces, options
+        )
+        save_compiled(polyhedron, str(tmp_path / "solid.npz"))
+
+        loaded = load_compiled(str(tmp_path / "solid.npz"))
+
+        assert loaded.name == polyhedron.name
+        assert loaded.edges == polyhedron.edges
+        assert loaded.solid_offset == polyhedron.solid_offset
+        assert [vf.edges for vf in loaded.vertex_figures] == [
+            vf.edges for vf in polyhedron.vertex_figures
+        ]
+        assert (
+            OpenscadArgs(loaded, loaded.options).to_openscad_args()
+            == OpenscadArgs(polyhedron, options).to_openscad_args()
+        )
+        assert [len(c.members) for c in loaded.holder_classes()] == [
+            len(c.members) for c in polyhedron.holder_classes()
+        ]
+
+    def test_arrays_are_memory_mapped(self, tmp_path):
+        """Test that per-half-edge arrays are read lazily from the archive."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        polyhedron = Polyhedron(
+            "cube", np.array(solid.vertices), solid.faces, GlobalOptions()
+        )
+        save_compiled(polyhedron, str(tmp_path / "cube.npz"))
+
+        loaded = load_compiled(str(tmp_path / "cube.npz"))
+
+        assert isinstance(loaded.vertices.base, np.memmap)
+        assert isinstance(loaded.vertex_figures[0].std.base.base, np.memmap)
+
+    def test_conflicting_options(self, tmp_path):
+        """Test that options the compiled state depends on cannot be changed."""
+        solid = parse_visual_polyhedra_file(DATA_DIR / "Cube.txt")
+        polyhedron = Polyhedron(
+            "cube", np.array(solid.vertices), solid.faces, GlobalOptions()
+        )
+        save_compiled(polyhedron, str(tmp_path / "cube.npz"))
+
+        loaded = load_compiled(
+            str(tmp_path / "cube.npz"), {"radius": 200, "label_vertices": False}
+        )
+        assert loaded.options.label_vertices is False
+        with pytest.raises(ValueError, match="radius"):
+            load_compiled(str(tmp_path / "cube.npz"), {"radius": 100})
+
+    def test_version_mismatch(self, tmp_path):
+        """Test that archives of another format version are rejected."""
+        path = tmp_path / "old.npz"
+        np.savez(path, version=np.array(0))
+
+        with pytest.raises(ValueError, match="version 0"):
+            load_compiled(str(path))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,19 +1,33 @@
+from collections.abc import Mapping
 from enum import Enum
-from typing import Any, Optional, Union
+from typing import Any, Callable, Hashable, Optional, Union
 
 import argparse
+import asyncio
+import contextlib
+import glob
+import hashlib
+import itertools
+import json
+import mmap
 import os
+import resource
+import shutil
+import struct
 import subprocess
+import sys
+import tempfile
 import copy
+import functools
 import time
-from concurrent.futures import ProcessPoolExecutor
-from functools import partial
+import tracemalloc
+import zipfile
 
 import numpy as np
-import pymeshlab
-import stl_reader
-import matplotlib.pyplot as plt
-import cairo
+
+# matplotlib, pymeshlab, stl_reader and cairo take seconds to import, so they
+# are imported by the stages that use them: histograms and preview colors,
+# isotropic remeshing and the native backend, STL parsing and SVGs
 
 
 class VertexType(Enum):
@@ -32,9 +46,32 @@ class ObjectType(Enum):
     VERTEX_HOLDER = "vertex_holder"
     SOLID = "solid"
     ALL_VERTEX_HOLDERS = "all_vertex_holders"
+    LABELED_HOLDER = "labeled_holder"
+
+
+class RenderMode(Enum):
+    PER_VERTEX = "per_vertex"
+    PER_TAG = "per_tag"
+
+
+class RenderBackend(Enum):
+    OPENSCAD = "openscad"
+    NATIVE = "native"
+
+
+class ScadCodegen(Enum):
+    INTERFACE = "interface"
+    FLAT = "flat"
+
+
+class OpenscadEngine(Enum):
+    AUTO = "auto"
+    CGAL = "cgal"
+    MANIFOLD = "manifold"
 
 
 class GlobalOptions:
+
     def __init__(
         self,
         edge_diameter: float = 3.0,
@@ -56,6 +93,21 @@ class GlobalOptions:
         label_vertices: bool = True,
         tubular_supports: bool = True,
         dry_run: bool = False,
+        render_mode: RenderMode = RenderMode.PER_VERTEX,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = 1 << 30,
+        payload_files: bool = True,
+        jobs: Optional[int] = None,
+        render_timeout: Optional[float] = None,
+        render_retries: int = 0,
+        backend: RenderBackend = RenderBackend.OPENSCAD,
+        force: bool = False,
+        scad_codegen: ScadCodegen = ScadCodegen.INTERFACE,
+        label_cache: bool = False,
+        openscad_engine: OpenscadEngine = OpenscadEngine.AUTO,
+        openscad_flags: Optional[list[str]] = None,
+        chordal_error: Optional[float] = None,
+        draft: bool = False,
     ) -> None:
         self.edge_diameter = edge_diameter
         self.diameter_tolerance_fit = diameter_tolerance_fit
@@ -76,44 +128,287 @@ class GlobalOptions:
         self.label_vertices = label_vertices
         self.tubular_supports = tubular_supports
         self.dry_run = dry_run
+        self.render_mode = render_mode
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.payload_files = payload_files
+        self.jobs = jobs
+        self.render_timeout = render_timeout
+        self.render_retries = render_retries
+        self.backend = backend
+        self.force = force
+        self.scad_codegen = scad_codegen
+        self.label_cache = label_cache
+        self.openscad_engine = openscad_engine
+        self.openscad_flags = openscad_flags or []
+        self.chordal_error = chordal_error
+        self.draft = draft
 
         self.tube_depth = rod_inset + wall_thickness
         self.outer_tube_radius = edge_diameter / 2 + wall_thickness
 
 
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Profiling                                                                 │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+# Wall time, CPU time and memory of one run of a pipeline stage. path joins
+# the names of the enclosing stages and this one with "/". cpu is this
+# process's CPU time, child_cpu that of child processes (OpenSCAD renders)
+# reaped during the stage. peak_traced is the tracemalloc peak in bytes and
+# max_rss the process's peak resident set size at the end of the stage. Fields
+# that were not measured are None.
+class StageRecord:
+    def __init__(
+        self,
+        path: str,
+        wall: float,
+        cpu: Optional[float] = None,
+        child_cpu: Optional[float] = None,
+        peak_traced: Optional[int] = None,
+        max_rss: Optional[int] = None,
+        detail: Optional[str] = None,
+    ) -> None:
+        self.path: str = path
+        self.wall: float = wall
+        self.cpu: Optional[float] = cpu
+        self.child_cpu: Optional[float] = child_cpu
+        self.peak_traced: Optional[int] = peak_traced
+        self.max_rss: Optional[int] = max_rss
+        self.detail: Optional[str] = detail
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    @property
+    def depth(self) -> int:
+        return self.path.count("/")
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "stage": self.path,
+            "detail": self.detail,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "child_cpu": self.child_cpu,
+            "peak_traced": self.peak_traced,
+            "max_rss": self.max_rss,
+        }
+
+
+# A stage hook is called with the stage name when a stage starts and returns
+# a context manager that is exited when the stage ends. A sink is called with
+# the StageRecord of every finished stage.
+StageHook = Callable[[str], contextlib.AbstractContextManager]
+StageSink = Callable[[StageRecord], None]
+
+
+# Records StageRecords for the stages of the pipeline, which run inside
+# PROFILER.stage(name). Does nothing until start() is called.
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.records: list[Optional[StageRecord]] = []
+        self.hooks: list[tuple[StageHook, Optional[set[str]]]] = []
+        self.sinks: list[StageSink] = []
+        # Paths and tracemalloc peaks of the stages running now, outermost
+        # first
+        self.paths: list[str] = []
+        self.peaks: list[int] = []
+
+    def start(self, trace_memory: bool = False) -> None:
+        self.enabled = True
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # Run hook around the stages named in stages, or around every stage
+    def add_hook(self, hook: StageHook, stages: Optional[list[str]] = None) -> None:
+        self.hooks.append((hook, set(stages) if stages is not None else None))
+
+    def add_sink(self, sink: StageSink) -> None:
+        self.sinks.append(sink)
+
+    @contextlib.contextmanager
+    def stage(self, name: str, detail: Optional[str] = None):
+        if not self.enabled:
+            yield
+            return
+        path = "/".join(self.paths[-1:] + [name])
+        index = len(self.records)
+        self.records.append(None)
+        with contextlib.ExitStack() as hooks:
+            for hook, stages in self.hooks:
+                if stages is None or name in stages:
+                    hooks.enter_context(hook(name))
+            self.fold_peak()
+            self.paths.append(path)
+            self.peaks.append(0)
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                yield
+            finally:
+                wall = time.perf_counter() - wall
+                cpu = time.process_time() - cpu
+                children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+                child_cpu = (children_after.ru_utime + children_after.ru_stime) - (
+                    children.ru_utime + children.ru_stime
+                )
+                self.fold_peak()
+                self.paths.pop()
+                peak = self.peaks.pop()
+                if self.peaks:
+                    self.peaks[-1] = max(self.peaks[-1], peak)
+                max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                record = StageRecord(
+                    path,
+                    wall,
+                    cpu,
+                    child_cpu,
+                    peak if tracemalloc.is_tracing() else None,
+                    max_rss * RSS_UNIT,
+                    detail,
+                )
+                self.records[index] = record
+                for sink in self.sinks:
+                    sink(record)
+
+    # Move the tracemalloc peak since the last reset into the running stage
+    def fold_peak(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    # Record a stage measured elsewhere, such as an OpenSCAD render, as a
+    # child of the running stage
+    def add(self, name: str, wall: float, detail: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        record = StageRecord("/".join(self.paths[-1:] + [name]), wall, detail=detail)
+        self.records.append(record)
+        for sink in self.sinks:
+            sink(record)
+
+    def finished(self) -> list[StageRecord]:
+        return [record for record in self.records if record is not None]
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"stages": [r.to_json() for r in self.finished()]}, f, indent=1)
+
+    # One row per stage path, in order of first run. Repeated stages are
+    # summed, except memory, which is the maximum.
+    def report(self) -> str:
+        rows: dict[str, list[Any]] = {}
+        for record in self.finished():
+            row = rows.setdefault(record.path, [record, 0, 0.0, None, None, None, None])
+            row[1] += 1
+            row[2] += record.wall
+            for i, value in enumerate((record.cpu, record.child_cpu), start=3):
+                if value is not None:
+                    row[i] = (row[i] or 0.0) + value
+            for i, value in enumerate((record.peak_traced, record.max_rss), start=5):
+                if value is not None:
+                    row[i] = max(row[i] or 0, value)
+
+        def number(value, scale=1.0, digits=3) -> str:
+            return "-" if value is None else f"{value / scale:.{digits}f}"
+
+        lines = [
+            f"{'stage':<36} {'runs':>6} {'wall s':>9} {'cpu s':>9} "
+            f"{'child s':>9} {'peak MB':>9} {'rss MB':>9}"
+        ]
+        for record, runs, wall, cpu, child_cpu, peak, rss in rows.values():
+            name = "  " * record.depth + record.name
+            lines.append(
+                f"{name:<36} {runs:>6} {number(wall):>9} {number(cpu):>9} "
+                f"{number(child_cpu):>9} {number(peak, 1e6, 1):>9} "
+                f"{number(rss, 1e6, 1):>9}"
+            )
+        return "\n".join(lines)
+
+
+PROFILER = Profiler()
+
+
+# Stage hook that runs cProfile around stages, accumulating the runs of each
+# stage into directory/<stage>.prof. Stages nested in another profiled stage
+# are not profiled separately, as only one profiler can be active.
+class CProfileHook:
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        self.profiles: dict[str, Any] = {}
+
+    @contextlib.contextmanager
+    def __call__(self, stage: str):
+        import cProfile
+
+        profile = self.profiles.setdefault(stage, cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, f"{stage}.prof"))
+
+
 # ┌───────────────────────────────────────────────────────────────────────────┐
 # │ Geometry                                                                  │
 # └───────────────────────────────────────────────────────────────────────────┘
 
 
 class VertexFigure:
+
     def __init__(
         self,
         vertex: np.ndarray,
         vertex_index: int,
         vecs: np.ndarray,
-        neighbors: list[int],
+        neighbors: Union[list[int], np.ndarray],
         tag: int,
         options: GlobalOptions,
+        half_edge_offset: Optional[np.ndarray] = None,
+        std: Optional[np.ndarray] = None,
+        euler: Optional[list[float]] = None,
     ) -> None:
         self.vertex: np.ndarray = vertex
         self.vertex_index: int = vertex_index
         self.vecs: np.ndarray = vecs
-        self.neighbors: list[int] = neighbors
+        self.neighbors: Union[list[int], np.ndarray] = neighbors
         self.std: np.ndarray = vecs
         self.euler: list[float] = [0.0, 0.0, 0.0]
         self.options: GlobalOptions = options
 
-        self.half_edge_offset = self.compute_offsets()
+        # Geometry precomputed by a VertexFigureEngine is taken as is
+        if half_edge_offset is None:
+            half_edge_offset = self.compute_offsets()
+        self.half_edge_offset = half_edge_offset
         self.vertex_offset = self.largest_offset()
 
-        plane_normal = self.plane_normal()
-        normal = self.normal()
-        if normal is not None and plane_normal is not None:
-            direction = 1 if np.dot(plane_normal, normal) > 0 else -1
-            rotated, euler = self.reorient_to(direction * plane_normal)
-            self.std = rotated
+        if std is not None and euler is not None:
+            self.std = std
             self.euler = euler
+        else:
+            plane_normal = self.plane_normal()
+            normal = self.normal()
+            if normal is not None and plane_normal is not None:
+                direction = 1 if np.dot(plane_normal, normal) > 0 else -1
+                rotated, euler = self.reorient_to(direction * plane_normal)
+                self.std = rotated
+                self.euler = euler
 
         self.tag = tag
 
@@ -159,10 +454,10 @@ class VertexFigure:
         # Handle gimbal lock cases
         elif R[2, 0] < 0:
             # y = 90 degrees
-            return [float(np.atan2(-R[1, 2], R[1, 1])), 90.0, 0.0]
+            return [float(np.atan2(-R[1, 2], R[1, 1])), np.pi / 2, 0.0]
         else:
             # y = -90 degrees
-            return [float(np.atan2(-R[1, 2], R[1, 1])), -90.0, 0.0]
+            return [float(np.atan2(-R[1, 2], R[1, 1])), -np.pi / 2, 0.0]
 
     # Orient normal to target, then apply this rotation to all vectors in the
     # figure
@@ -181,7 +476,7 @@ class VertexFigure:
                 return (self.vecs, [0.0, 0.0, 0.0])
             else:
                 flipped = np.array([np.array([v[0], -v[1], -v[2]]) for v in self.vecs])
-                return (flipped, [180.0, 0.0, 0.0])
+                return (flipped, [np.pi, 0.0, 0.0])
         u = axis / len_axis
         c = dot_val
         s = len_axis
@@ -242,6 +537,600 @@ class VertexFigure:
         return float(max(self.half_edge_offset))
 
 
+# Compressed-sparse-row vertex adjacency. The neighbors of vertex i are
+# neighbors[offsets[i]:offsets[i + 1]], sorted ascending, so the slot an edge
+# occupies in a vertex holder can be found by binary search.
+class VertexAdjacency:
+    def __init__(self, offsets: np.ndarray, neighbors: np.ndarray) -> None:
+        self.offsets: np.ndarray = offsets
+        self.neighbors: np.ndarray = neighbors
+
+    @classmethod
+    def from_edges(cls, num_vertices: int, edges) -> "VertexAdjacency":
+        if not isinstance(edges, np.ndarray):
+            edges = list(edges)
+        pairs = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        sources = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        targets = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        order = np.lexsort((targets, sources))
+        counts = np.bincount(sources, minlength=num_vertices)
+        offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(offsets, targets[order])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def degree(self, vertex: int) -> int:
+        return int(self.offsets[vertex + 1] - self.offsets[vertex])
+
+    def neighbors_of(self, vertex: int) -> np.ndarray:
+        return self.neighbors[self.offsets[vertex] : self.offsets[vertex + 1]]
+
+    # Index of neighbor in the neighbor list of vertex
+    def slot(self, vertex: int, neighbor: int) -> int:
+        row = self.neighbors_of(vertex)
+        ix = int(np.searchsorted(row, neighbor))
+        if ix >= len(row) or row[ix] != neighbor:
+            raise KeyError(f"({vertex}, {neighbor}) is not an edge")
+        return ix
+
+    # Positions in neighbors of the half-edges sources[i] -> targets[i]
+    def positions(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        base = max(len(self), 1)
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+        return np.searchsorted(rows * base + self.neighbors, sources * base + targets)
+
+
+# The corners of a face list flattened: the vertex of each corner, the next
+# corner of its face (the last corner's is the first) and the face it is in
+def face_corners(faces) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    sizes = np.fromiter(map(len, faces), dtype=np.int64, count=len(faces))
+    corners = np.fromiter(
+        itertools.chain.from_iterable(faces), dtype=np.int64, count=int(sizes.sum())
+    )
+    ends = np.cumsum(sizes)
+    successors = np.arange(1, len(corners) + 1)
+    successors[ends[sizes > 0] - 1] = (ends - sizes)[sizes > 0]
+    return corners, successors, np.repeat(np.arange(len(faces)), sizes)
+
+
+EDGE_DTYPE = np.dtype(
+    [
+        ("endpoints", np.int64, (2,)),
+        ("length", np.float64),
+        ("offset_length", np.float64),
+        ("name", np.int64),
+    ]
+)
+
+
+# The edges of a polyhedron as one structured array of EDGE_DTYPE, a row per
+# edge (v1, v2) with v1 < v2, sorted by endpoints. Edges are named by rank of
+# offset length and order holds the rows in name order. Reads like the dict
+# (v1, v2) -> {"length", "offset_length", "name"} it replaced.
+class EdgeTable(Mapping):
+    def __init__(self, table: np.ndarray, num_vertices: int) -> None:
+        self.table: np.ndarray = table
+        self.num_vertices: int = num_vertices
+        # Row i encodes edge (v1, v2) as v1 * num_vertices + v2, ascending
+        self.codes: np.ndarray = self.encode(
+            table["endpoints"][:, 0], table["endpoints"][:, 1]
+        )
+        self.order: np.ndarray = np.argsort(table["name"], kind="stable")
+
+    @classmethod
+    def from_faces(cls, faces, num_vertices: int) -> "EdgeTable":
+        corners, successors, _ = face_corners(faces)
+        a, b = corners, corners[successors]
+        valid = (a >= 0) & (a < num_vertices) & (b >= 0) & (b < num_vertices)
+        a, b = a[valid], b[valid]
+
+        base = max(num_vertices, 1)
+        codes = np.unique(np.minimum(a, b) * base + np.maximum(a, b))
+        table = np.zeros(len(codes), dtype=EDGE_DTYPE)
+        table["endpoints"][:, 0] = codes // base
+        table["endpoints"][:, 1] = codes % base
+        table["name"] = np.arange(len(codes))
+        return cls(table, num_vertices)
+
+    @property
+    def endpoints(self) -> np.ndarray:
+        return self.table["endpoints"]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self.table["length"]
+
+    @property
+    def offset_lengths(self) -> np.ndarray:
+        return self.table["offset_length"]
+
+    @property
+    def names(self) -> np.ndarray:
+        return self.table["name"]
+
+    def encode(self, v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+        return np.asarray(v1, dtype=np.int64) * max(self.num_vertices, 1) + v2
+
+    # Store lengths and offset lengths and name edges by offset length. Ties
+    # keep endpoint order.
+    def set_lengths(self, lengths: np.ndarray, offset_lengths: np.ndarray) -> None:
+        self.table["length"] = lengths
+        self.table["offset_length"] = offset_lengths
+        self.order = np.argsort(offset_lengths, kind="stable")
+        self.table["name"][self.order] = np.arange(len(self.table))
+
+    # Rows of the edges (v1[i], v2[i]), in either orientation
+    def index(self, v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+        codes = self.encode(np.minimum(v1, v2), np.maximum(v1, v2))
+        return np.searchsorted(self.codes, codes)
+
+    # Rows in name order, i.e. by ascending offset length
+    def by_offset_length(self) -> np.ndarray:
+        return self.table[self.order]
+
+    def __getitem__(self, edge: tuple[int, int]) -> dict[str, Any]:
+        v1, v2 = edge
+        code = int(self.encode(v1, v2))
+        ix = int(np.searchsorted(self.codes, code))
+        if ix >= len(self.codes) or self.codes[ix] != code or v1 > v2:
+            raise KeyError(edge)
+        row = self.table[ix]
+        return {
+            "length": float(row["length"]),
+            "offset_length": float(row["offset_length"]),
+            "name": int(row["name"]),
+        }
+
+    def __iter__(self):
+        return iter(map(tuple, self.endpoints.tolist()))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+# Half-edges of the faces of a polyhedron, one per face corner whose edge has
+# both vertices in range. Half-edge h runs from origin[h] to target[h] along
+# face[h] and is followed by next[h] in its face. twin[h] is the opposite
+# half-edge and -1 on a boundary; -1 in next and prev marks corners dropped
+# for being out of range. slot[h] is the position of target[h] among the
+# neighbors of origin[h] in the adjacency, i.e. the holder slot the edge uses,
+# and edge[h] its row in the edge table.
+class HalfEdgeMesh:
+    def __init__(
+        self,
+        origin: np.ndarray,
+        target: np.ndarray,
+        next: np.ndarray,
+        twin: np.ndarray,
+        face: np.ndarray,
+        slot: np.ndarray,
+        edge: np.ndarray,
+        edge_positions: np.ndarray,
+        num_vertices: int,
+    ) -> None:
+        self.origin: np.ndarray = origin
+        self.target: np.ndarray = target
+        self.next: np.ndarray = next
+        self.twin: np.ndarray = twin
+        self.face: np.ndarray = face
+        self.slot: np.ndarray = slot
+        self.edge: np.ndarray = edge
+        # Positions in the adjacency of each edge table row (v1, v2): of v2
+        # among the neighbors of v1 and of v1 among those of v2
+        self.edge_positions: np.ndarray = edge_positions
+
+        self.prev: np.ndarray = np.full(len(origin), -1, dtype=np.int64)
+        linked = np.flatnonzero(next >= 0)
+        self.prev[next[linked]] = linked
+        self.out_degree: np.ndarray = np.bincount(origin, minlength=num_vertices)
+        # A half-edge leaving each vertex, or -1. Boundary vertices start from
+        # the half-edge after the boundary, so fan() walks the whole fan.
+        self.outgoing: np.ndarray = np.full(num_vertices, -1, dtype=np.int64)
+        self.outgoing[origin] = np.arange(len(origin))
+        opens = (self.prev < 0) | (twin[self.prev] < 0)
+        self.outgoing[origin[opens]] = np.flatnonzero(opens)
+        # Half-edge of each (origin, target) pair, built by the first find()
+        self.lookup: Optional[dict[tuple[int, int], int]] = None
+
+    @classmethod
+    def from_faces(
+        cls, faces, adjacency: VertexAdjacency, edges: EdgeTable
+    ) -> "HalfEdgeMesh":
+        num_vertices = len(adjacency)
+        corners, successors, faces_of = face_corners(faces)
+        a, b = corners, corners[successors]
+        valid = (a >= 0) & (a < num_vertices) & (b >= 0) & (b < num_vertices)
+        ids = np.full(len(corners), -1, dtype=np.int64)
+        ids[valid] = np.arange(np.count_nonzero(valid))
+        origin, target = a[valid], b[valid]
+
+        # The twin of a -> b is the half-edge b -> a
+        base = max(num_vertices, 1)
+        codes = origin * base + target
+        order = np.argsort(codes, kind="stable")
+        reverse = target * base + origin
+        ix = np.searchsorted(codes[order], reverse)
+        found = ix < len(order)
+        found[found] = codes[order[ix[found]]] == reverse[found]
+        twin = np.full(len(origin), -1, dtype=np.int64)
+        twin[found] = order[ix[found]]
+
+        v1, v2 = edges.endpoints.T
+        return cls(
+            origin,
+            target,
+            ids[successors[valid]],
+            twin,
+            faces_of[valid],
+            adjacency.positions(origin, target) - adjacency.offsets[origin],
+            edges.index(origin, target),
+            np.stack(
+                [adjacency.positions(v1, v2), adjacency.positions(v2, v1)], axis=1
+            ),
+            num_vertices,
+        )
+
+    def __len__(self) -> int:
+        return len(self.origin)
+
+    # The half-edge origin -> target, or -1 if no face has it. O(1).
+    def find(self, origin: int, target: int) -> int:
+        if self.lookup is None:
+            pairs = zip(self.origin.tolist(), self.target.tolist())
+            self.lookup = {pair: h for h, pair in enumerate(pairs)}
+        return self.lookup.get((origin, target), -1)
+
+    # Slots of the edge origin - target in the adjacency rows of origin and of
+    # target, through the half-edge and its twin. -1 where a boundary edge
+    # lacks that half-edge. O(1).
+    def slots(self, origin: int, target: int) -> tuple[int, int]:
+        h = self.find(origin, target)
+        twin = int(self.twin[h]) if h >= 0 else self.find(target, origin)
+        return (
+            int(self.slot[h]) if h >= 0 else -1,
+            int(self.slot[twin]) if twin >= 0 else -1,
+        )
+
+    # The half-edges leaving vertex in cyclic order around it. O(degree).
+    def fan(self, vertex: int) -> list[int]:
+        start = int(self.outgoing[vertex])
+        if start < 0:
+            return []
+        fan = [start]
+        h = start
+        for _ in range(int(self.out_degree[vertex]) - 1):
+            twin = int(self.twin[h])
+            if twin < 0:
+                break
+            h = int(self.next[twin])
+            if h < 0 or h == start:
+                break
+            fan.append(h)
+        return fan
+
+    # The neighbors of vertex in cyclic order around it, consistent with the
+    # orientation of its faces
+    def neighbor_cycle(self, vertex: int) -> list[int]:
+        fan = self.fan(vertex)
+        if not fan:
+            return []
+        neighbors = self.target[fan].tolist()
+        before = int(self.prev[fan[0]])
+        if before >= 0 and self.twin[before] < 0:
+            neighbors.insert(0, int(self.origin[before]))
+        return neighbors
+
+
+SIGNATURE_PRECISION = 100000
+
+
+# Rotation-invariant signatures of a stack of equal-degree vertex figures,
+# shape (n, degree, 3). Each row holds the sorted Gram matrix entries (upper
+# triangle) followed by the sorted absolute triple products over i < j < k,
+# rounded to SIGNATURE_PRECISION. The triple-product tensor is antisymmetric,
+# so these determine the full sorted tensor and vice versa.
+def vertex_figure_signatures(vecs: np.ndarray) -> np.ndarray:
+    degree = vecs.shape[1]
+    gram = np.einsum("kid,kjd->kij", vecs, vecs)
+    rows, cols = np.triu_indices(degree)
+    dots = gram[:, rows, cols]
+
+    triples = np.array(list(itertools.combinations(range(degree), 3)), dtype=np.intp)
+    triples = triples.reshape(-1, 3)
+    crosses = np.cross(vecs[:, triples[:, 0]], vecs[:, triples[:, 1]])
+    products = np.abs(np.einsum("kmd,kmd->km", crosses, vecs[:, triples[:, 2]]))
+
+    dots = np.rint(dots * SIGNATURE_PRECISION).astype(np.int64)
+    products = np.rint(products * SIGNATURE_PRECISION).astype(np.int64)
+    return np.concatenate([np.sort(dots, axis=1), np.sort(products, axis=1)], axis=1)
+
+
+# Signature hashes map one row of vertex_figure_signatures to a dict key.
+# Vertices with equal keys share a tag.
+def signature_bytes(signature: np.ndarray) -> Hashable:
+    return signature.tobytes()
+
+
+def signature_blake2b(signature: np.ndarray) -> Hashable:
+    return hashlib.blake2b(signature.tobytes(), digest_size=16).digest()
+
+
+# Computes the geometry of every vertex figure of a mesh at once. Vertices are
+# bucketed by degree so each bucket is a dense (n, degree, 3) stack; per-half-
+# edge results are stored flat in the same order as VertexAdjacency.neighbors,
+# and per-vertex results in arrays indexed by vertex. The values match what
+# VertexFigure computes for a single vertex.
+class VertexFigureEngine:
+    def __init__(
+        self,
+        vertices: np.ndarray,
+        adjacency: VertexAdjacency,
+        options: GlobalOptions,
+    ) -> None:
+        self.options: GlobalOptions = options
+        self.adjacency: VertexAdjacency = adjacency
+
+        num_vertices = len(adjacency)
+        num_half_edges = len(adjacency.neighbors)
+        dtype = np.result_type(vertices.dtype, np.float32)
+
+        # Per half edge
+        self.vecs = np.zeros((num_half_edges, 3), dtype=dtype)
+        self.std = np.zeros((num_half_edges, 3), dtype=dtype)
+        self.half_edge_offset = np.zeros(num_half_edges)
+
+        # Per vertex. Rows of normal and plane_normal are NaN where
+        # VertexFigure would return None.
+        self.vertex_offset = np.full(num_vertices, np.nan)
+        self.normal = np.full((num_vertices, 3), np.nan)
+        self.plane_normal = np.full((num_vertices, 3), np.nan)
+        self.rotation = np.tile(np.eye(3), (num_vertices, 1, 1))
+        self.euler = np.zeros((num_vertices, 3))
+
+        degrees = np.diff(adjacency.offsets)
+        for degree in np.unique(degrees):
+            if degree == 0:
+                continue
+            indices = np.flatnonzero(degrees == degree)
+            slots = adjacency.offsets[indices][:, np.newaxis] + np.arange(degree)
+            vecs = vertices[adjacency.neighbors[slots]] - vertices[indices][:, np.newaxis]
+            norms = np.linalg.norm(vecs, axis=2)
+            vecs = vecs / np.where(norms > 0, norms, 1)[:, :, np.newaxis]
+
+            offsets = self.compute_offsets(vecs)
+            normal = self.normals(vecs)
+            plane_normal = self.plane_normals(vecs, offsets)
+            rotation, euler = self.reorient(normal, plane_normal)
+
+            self.vecs[slots] = vecs
+            self.std[slots] = np.einsum("kij,kdj->kdi", rotation, vecs)
+            self.half_edge_offset[slots] = offsets
+            self.vertex_offset[indices] = offsets.max(axis=1)
+            self.normal[indices] = normal
+            self.plane_normal[indices] = plane_normal
+            self.rotation[indices] = rotation
+            self.euler[indices] = euler
+
+    # Signature key of every vertex. Buckets are processed in chunks to bound
+    # the size of the intermediate arrays on high-valence meshes.
+    def signatures(
+        self,
+        signature_hash: Callable[[np.ndarray], Hashable] = signature_bytes,
+        chunk_size: int = 4096,
+    ) -> list[Hashable]:
+        keys: list[Hashable] = [signature_hash(np.zeros(0, dtype=np.int64))] * len(
+            self.adjacency
+        )
+        degrees = np.diff(self.adjacency.offsets)
+        for degree in np.unique(degrees):
+            if degree == 0:
+                continue
+            indices = np.flatnonzero(degrees == degree)
+            for start in range(0, len(indices), chunk_size):
+                chunk = indices[start : start + chunk_size]
+                slots = self.adjacency.offsets[chunk][:, np.newaxis] + np.arange(degree)
+                signatures = vertex_figure_signatures(self.vecs[slots])
+                for i, signature in zip(chunk, signatures):
+                    keys[i] = signature_hash(signature)
+        return keys
+
+    def figure_slice(self, vertex: int) -> slice:
+        offsets = self.adjacency.offsets
+        return slice(int(offsets[vertex]), int(offsets[vertex + 1]))
+
+    # For each vector, the cosine-closest other vector in its figure, then
+    # the axis offset between the two
+    def compute_offsets(self, vecs: np.ndarray) -> np.ndarray:
+        degree = vecs.shape[1]
+        norms = np.linalg.norm(vecs, axis=2)
+        scores = np.einsum("kid,kjd->kij", vecs, vecs) / norms[:, np.newaxis, :]
+        scores[:, np.arange(degree), np.arange(degree)] = -1000
+        closest_ix = np.argmax(scores, axis=2)
+        closest = np.take_along_axis(vecs, closest_ix[:, :, np.newaxis], axis=1)
+
+        c = np.einsum("kid,kid->ki", vecs, closest)
+        s = np.linalg.norm(np.cross(vecs, closest), axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            l_side = (
+                self.options.outer_tube_radius * c + self.options.edge_diameter / 2
+            ) / s
+            l_base = (self.options.edge_diameter / 2 * (1 + c)) / s
+        return np.where(
+            s < 1e-9, np.where(c > 0, 1e9, 0.0), np.maximum(l_side, l_base)
+        )
+
+    def normals(self, vecs: np.ndarray) -> np.ndarray:
+        n = np.sum(vecs, axis=1)
+        norm = np.linalg.norm(n, axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(norm > 1e-10, n / norm, np.nan)
+
+    def plane_normals(self, vecs: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        if vecs.shape[1] < 3:
+            return np.full((len(vecs), 3), np.nan)
+        if self.options.offset_type == OffsetType.PER_HALF_EDGE:
+            vecs = vecs * (offsets + self.options.rod_inset)[:, :, np.newaxis]
+        centered = vecs - np.mean(vecs, axis=1, keepdims=True)
+        _, _, vh = np.linalg.svd(centered)
+        normal = vh[:, 2]
+        return -normal / np.linalg.norm(normal, axis=1, keepdims=True)
+
+    # Rotation matrices taking the oriented plane normal of each figure to +z,
+    # with their euler angles; see VertexFigure.reorient_to
+    def reorient(
+        self, normal: np.ndarray, plane_normal: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        n = len(normal)
+        rotation = np.tile(np.eye(3), (n, 1, 1))
+        euler = np.zeros((n, 3))
+
+        oriented = ~np.isnan(normal[:, 0]) & ~np.isnan(plane_normal[:, 0])
+        direction = np.where(np.einsum("ki,ki->k", plane_normal, normal) > 0, 1, -1)
+        target = direction[:, np.newaxis] * plane_normal
+        nn = np.linalg.norm(target, axis=1)
+        oriented &= ~(nn < 1e-9)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u_mean = target / nn[:, np.newaxis]
+        # cross(u_mean, [0, 0, 1]) and dot(u_mean, [0, 0, 1])
+        axis = np.stack(
+            [u_mean[:, 1], -u_mean[:, 0], np.zeros(n)], axis=1
+        )
+        len_axis = np.linalg.norm(axis, axis=1)
+        dot_val = u_mean[:, 2]
+
+        degenerate = len_axis < 1e-6
+        flipped = oriented & degenerate & ~(dot_val > 0)
+        rotation[flipped] = np.diag([1.0, -1.0, -1.0])
+        euler[flipped] = [np.pi, 0.0, 0.0]
+
+        general = oriented & ~degenerate
+        u = axis[general] / len_axis[general][:, np.newaxis]
+        c = dot_val[general]
+        s = len_axis[general]
+        C = 1 - c
+        R = np.empty((len(u), 3, 3))
+        R[:, 0, 0] = c + u[:, 0] * u[:, 0] * C
+        R[:, 0, 1] = u[:, 0] * u[:, 1] * C - u[:, 2] * s
+        R[:, 0, 2] = u[:, 0] * u[:, 2] * C + u[:, 1] * s
+        R[:, 1, 0] = u[:, 1] * u[:, 0] * C + u[:, 2] * s
+        R[:, 1, 1] = c + u[:, 1] * u[:, 1] * C
+        R[:, 1, 2] = u[:, 1] * u[:, 2] * C - u[:, 0] * s
+        R[:, 2, 0] = u[:, 2] * u[:, 0] * C - u[:, 1] * s
+        R[:, 2, 1] = u[:, 2] * u[:, 1] * C + u[:, 0] * s
+        R[:, 2, 2] = c + u[:, 2] * u[:, 2] * C
+        rotation[general] = R
+        euler[general] = self.matrix_to_rotation(np.transpose(R, (0, 2, 1)))
+        return rotation, euler
+
+    def matrix_to_rotation(self, R: np.ndarray) -> np.ndarray:
+        sy = np.sqrt(R[:, 0, 0] ** 2 + R[:, 1, 0] ** 2)
+        singular = sy < 1e-6
+        # Gimbal lock cases: y = 90 degrees if R[2, 0] < 0, else -90. Angles
+        # are in radians, which interface.scad converts for rotate()
+        return np.where(
+            singular[:, np.newaxis],
+            np.stack(
+                [
+                    np.atan2(-R[:, 1, 2], R[:, 1, 1]),
+                    np.where(R[:, 2, 0] < 0, np.pi / 2, -np.pi / 2),
+                    np.zeros(len(R)),
+                ],
+                axis=1,
+            ),
+            np.stack(
+                [
+                    np.atan2(R[:, 2, 1], R[:, 2, 2]),
+                    np.atan2(-R[:, 2, 0], sy),
+                    np.atan2(R[:, 1, 0], R[:, 0, 0]),
+                ],
+                axis=1,
+            ),
+        )
+
+
+# Find an orthogonal matrix Q and a slot permutation perm with
+# Q @ source[perm[i]] == target[i] and source_offsets[perm[i]] ==
+# target_offsets[i] for every slot. Q must fix +z, so that the cutoff plane of
+# the holder is preserved; it is a rotation about z, or a reflection through a
+# vertical plane if the figures are mirror images. Returns None if the figures
+# cannot be aligned.
+def align_vertex_figures(
+    source: np.ndarray,
+    target: np.ndarray,
+    source_offsets: np.ndarray,
+    target_offsets: np.ndarray,
+    tolerance: float = 1e-4,
+    offset_tolerance: float = 1e-3,
+) -> Optional[tuple[np.ndarray, np.ndarray]]:
+    if source.shape != target.shape:
+        return None
+    source_offsets = np.asarray(source_offsets, dtype=float)
+    target_offsets = np.asarray(target_offsets, dtype=float)
+
+    # Anchor on the target vector furthest from the z axis, so its azimuth is
+    # well defined
+    radii = np.linalg.norm(target[:, :2], axis=1)
+    anchor = int(np.argmax(radii))
+    candidates = np.flatnonzero(
+        (np.abs(source[:, 2] - target[anchor, 2]) < tolerance)
+        & (np.abs(np.linalg.norm(source[:, :2], axis=1) - radii[anchor]) < tolerance)
+        & (np.abs(source_offsets - target_offsets[anchor]) < offset_tolerance)
+    )
+
+    target_angle = np.atan2(target[anchor, 1], target[anchor, 0])
+    transforms = []
+    for j in candidates:
+        source_angle = np.atan2(source[j, 1], source[j, 0])
+        theta = target_angle - source_angle
+        c, s = np.cos(theta), np.sin(theta)
+        transforms.append(np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]]))
+        phi = target_angle + source_angle
+        c, s = np.cos(phi), np.sin(phi)
+        transforms.append(np.array([[c, s, 0.0], [s, -c, 0.0], [0.0, 0.0, 1.0]]))
+    if radii[anchor] < tolerance:
+        transforms = [np.eye(3)]
+
+    for Q in transforms:
+        moved = source @ Q.T
+        distances = np.linalg.norm(target[:, np.newaxis] - moved[np.newaxis], axis=2)
+        perm = np.argmin(distances, axis=1)
+        if (
+            len(np.unique(perm)) == len(perm)
+            and np.all(distances[np.arange(len(perm)), perm] < tolerance)
+            and np.all(np.abs(source_offsets[perm] - target_offsets) < offset_tolerance)
+        ):
+            return Q, perm
+    return None
+
+
+# Vertices whose holders are congruent, rendered once as the holder of
+# representative. A tag holds one class unless some of its vertex figures
+# cannot be aligned, since signatures are compared after rounding.
+class HolderClass:
+    def __init__(self, tag: int, subindex: int, representative: int) -> None:
+        self.tag: int = tag
+        self.subindex: int = subindex
+        self.representative: int = representative
+        self.members: list[int] = []
+        self.alignments: dict[int, np.ndarray] = {}
+
+    @property
+    def filename(self) -> str:
+        if self.subindex == 0:
+            return f"t{self.tag:03}.stl"
+        return f"t{self.tag:03}-{self.subindex}.stl"
+
+    def add(self, vertex_index: int, alignment: np.ndarray) -> None:
+        self.members.append(vertex_index)
+        self.alignments[vertex_index] = alignment
+
+    def mirrored(self, vertex_index: int) -> bool:
+        return bool(np.linalg.det(self.alignments[vertex_index]) < 0)
+
+
 class Polyhedron:
     def __init__(
         self,
@@ -249,21 +1138,32 @@ class Polyhedron:
         vertices: np.ndarray,
         faces: list[list[str]],
         options: GlobalOptions,
+        signature_hash: Callable[[np.ndarray], Hashable] = signature_bytes,
     ) -> None:
         self.name: str = name
         self.faces: list[list[str]] = faces
         self.vertices: np.ndarray = vertices
         self.options: GlobalOptions = options
+        self.signature_hash: Callable[[np.ndarray], Hashable] = signature_hash
 
-        self.edges: dict[tuple[int, int], Any] = self.make_edgelist()
-        self.vertex_figures = self.annotate_vertex_figures()
+        with PROFILER.stage("edge_table"):
+            self.edges: EdgeTable = EdgeTable.from_faces(self.faces, len(self.vertices))
+        with PROFILER.stage("adjacency"):
+            self.adjacency: VertexAdjacency = VertexAdjacency.from_edges(
+                len(self.vertices), self.edges.endpoints
+            )
+            self.half_edges: HalfEdgeMesh = HalfEdgeMesh.from_faces(
+                self.faces, self.adjacency, self.edges
+            )
+        with PROFILER.stage("annotate_vertex_figures"):
+            self.vertex_figures = self.annotate_vertex_figures()
         self.solid_offset = self.largest_offset()
-        self.compute_edge_lengths()
-        for vf in self.vertex_figures:
-            vf.annotate_edge_names(self.edges)
+        with PROFILER.stage("compute_edge_lengths"):
+            self.compute_edge_lengths()
+            self.annotate_edge_names()
 
     def average_edge_length(self) -> float:
-        return np.sum([e["length"] for e in self.edges.values()]) / len(self.edges)
+        return np.sum(self.edges.lengths) / len(self.edges)
 
     def largest_offset(self) -> float:
         if len(self.vertex_figures) == 0:
@@ -272,9 +1172,8 @@ class Polyhedron:
         return max(offsets)
 
     def print_offset_edge_lengths(self):
-        sorted_edges = sorted(self.edges.items(), key=lambda x: x[1]["offset_length"])
-        for edge, data in sorted_edges:
-            print(f"{data['name']}, {data['offset_length']:.6f}")
+        for row in self.edges.by_offset_length():
+            print(f"{row['name']}, {row['offset_length']:.6f}")
 
     def offset_for_edge(self, v1, v2):
         vf1 = self.vertex_figures[v1]
@@ -288,8 +1187,12 @@ class Polyhedron:
                     vf2.vertex_offset,
                 )
             case OffsetType.PER_HALF_EDGE:
-                v1_neighbor = next(ix for ix, n in enumerate(vf1.neighbors) if n == v2)
-                v2_neighbor = next(ix for ix, n in enumerate(vf2.neighbors) if n == v1)
+                v1_neighbor, v2_neighbor = self.half_edges.slots(v1, v2)
+                # Boundary edges lack a half-edge; search the adjacency instead
+                if v1_neighbor < 0:
+                    v1_neighbor = self.adjacency.slot(v1, v2)
+                if v2_neighbor < 0:
+                    v2_neighbor = self.adjacency.slot(v2, v1)
                 return (
                     vf1.half_edge_offset[v1_neighbor],
                     vf2.half_edge_offset[v2_neighbor],
@@ -297,114 +1200,146 @@ class Polyhedron:
             case OffsetType.PER_SOLID | _:
                 return (self.solid_offset, self.solid_offset)
 
+    # Offsets at both ends of every edge, in edge table order
+    def edge_offsets(self) -> tuple[np.ndarray, np.ndarray]:
+        v1, v2 = self.edges.endpoints.T
+        match self.options.offset_type:
+            case OffsetType.GLOBAL:
+                offset = np.full(len(v1), float(self.options.global_offset))
+                return (offset, offset)
+            case OffsetType.PER_VERTEX:
+                vertex_offsets = np.array(
+                    [vf.vertex_offset for vf in self.vertex_figures], dtype=float
+                )
+                return (vertex_offsets[v1], vertex_offsets[v2])
+            case OffsetType.PER_HALF_EDGE:
+                half_edge_offsets = np.concatenate(
+                    [np.empty(0)]
+                    + [np.asarray(vf.half_edge_offset) for vf in self.vertex_figures]
+                )
+                positions = self.half_edges.edge_positions
+                return (
+                    half_edge_offsets[positions[:, 0]],
+                    half_edge_offsets[positions[:, 1]],
+                )
+            case OffsetType.PER_SOLID | _:
+                offset = np.full(len(v1), float(self.solid_offset))
+                return (offset, offset)
+
     def compute_edge_lengths(self):
-        edge_lengths = []
-        max_dist = max([np.linalg.norm(v) for v in self.vertices])
-        for v1, v2 in self.edges:
-            v1_offset, v2_offset = self.offset_for_edge(v1, v2)
-            v1_arr = self.vertices[v1]
-            v2_arr = self.vertices[v2]
-            length = np.linalg.norm(v2_arr - v1_arr)
-            scale_factor = self.options.radius / max_dist
-            offset_length = scale_factor * length - v1_offset - v2_offset
-            edge_lengths.append(((v1, v2), length, offset_length))
-
-        sorted_edges = sorted(edge_lengths, key=lambda x: x[2])
-        for i, (edge, length, offset_length) in enumerate(sorted_edges):
-            self.edges[edge] = {
-                "length": length,
-                "offset_length": offset_length,
-                "name": i,
-            }
-
-    # Convert facelist into edgelist
-    def make_edgelist(self) -> dict[tuple[int, int], Any]:
-        edges = set()
-        for face in self.faces:
-            for v1, v2 in zip(face, face[1:] + [face[0]]):
-                v1_int = int(v1)
-                v2_int = int(v2)
-                if v1_int < len(self.vertices) and v2_int < len(self.vertices):
-                    edges.add((v1_int, v2_int) if v1_int < v2_int else (v2_int, v1_int))
-        return {e: {} for e in edges}
-
-    def vertex_figure_signature(self, vecs) -> tuple[int, ...]:
-        precision = 100000
-        n = len(vecs)
-        dots = sorted(
-            [
-                round(np.dot(vecs[i], vecs[j]) * precision)
-                for i in range(n)
-                for j in range(i, n)
-            ]
-        )
-        triples = sorted(
-            [
-                round(np.dot(np.cross(vecs[i], vecs[j]), vecs[k]) * precision)
-                for i in range(n)
-                for j in range(n)
-                for k in range(n)
-            ]
-        )
-        return tuple(dots + triples)
+        v1, v2 = self.edges.endpoints.T
+        max_dist = np.max(np.linalg.norm(self.vertices, axis=1))
+        lengths = np.linalg.norm(self.vertices[v2] - self.vertices[v1], axis=1)
+        v1_offset, v2_offset = self.edge_offsets()
+        scale_factor = self.options.radius / max_dist
+        self.edges.set_lengths(lengths, scale_factor * lengths - v1_offset - v2_offset)
+
+    # Name the edges of each vertex figure, in neighbor order
+    def annotate_edge_names(self):
+        positions = self.half_edges.edge_positions
+        names = np.empty(len(self.adjacency.neighbors), dtype=np.int64)
+        names[positions[:, 0]] = self.edges.names
+        names[positions[:, 1]] = self.edges.names
+        names = names.tolist()
+        offsets = self.adjacency.offsets.tolist()
+        for i, vf in enumerate(self.vertex_figures):
+            vf.edges = names[offsets[i] : offsets[i + 1]]
+
+    def vertex_figure_signature(self, vecs) -> Hashable:
+        signature = vertex_figure_signatures(np.asarray(vecs)[np.newaxis])[0]
+        return self.signature_hash(signature)
 
     def annotate_vertex_figures(self) -> list[VertexFigure]:
         vertices_arr = self.vertices
 
+        engine = VertexFigureEngine(vertices_arr, self.adjacency, self.options)
+        with PROFILER.stage("signatures"):
+            signatures = engine.signatures(self.signature_hash)
+
         tags = {}
         tag = 0
         vertex_figures = []
         for i, vertex in enumerate(vertices_arr):
-            neighbors = [
-                e[1] if e[0] == i else e[0] for e in self.edges.keys() if i in e
-            ]
-            vecs = [(vertices_arr[n] - vertex) for n in neighbors]
-            vecs = [
-                v / (np.linalg.norm(v) if np.linalg.norm(v) > 0 else 1) for v in vecs
-            ]
-            signature = self.vertex_figure_signature(vecs)
+            neighbors = self.adjacency.neighbors_of(i)
+            figure = engine.figure_slice(i)
+            vecs = engine.vecs[figure]
+            signature = signatures[i]
             if signature not in tags:
                 tags[signature] = tag
                 tag += 1
 
+            # Isolated vertices fall back to VertexFigure's own computation
+            precomputed = len(neighbors) > 0
             vertex_figures.append(
                 VertexFigure(
                     vertex,
                     i,
-                    np.array(vecs),
+                    vecs,
                     neighbors,
                     tags[signature],
                     self.options,
+                    half_edge_offset=engine.half_edge_offset[figure]
+                    if precomputed
+                    else None,
+                    std=engine.std[figure] if precomputed else None,
+                    euler=engine.euler[i].tolist() if precomputed else None,
                 )
             )
 
         return vertex_figures
 
+    # Group vertices into classes of congruent holders, in vertex order
+    def holder_classes(self) -> list[HolderClass]:
+        offsets = OpenscadArgs(self, self.options).offsets
+        classes: list[HolderClass] = []
+        by_tag: dict[int, list[HolderClass]] = {}
+        for vf in self.vertex_figures:
+            i = vf.vertex_index
+            for holder_class in by_tag.get(vf.tag, []):
+                rep = holder_class.representative
+                aligned = align_vertex_figures(
+                    self.vertex_figures[rep].std, vf.std, offsets[rep], offsets[i]
+                )
+                if aligned is not None:
+                    holder_class.add(i, aligned[0])
+                    break
+            else:
+                siblings = by_tag.setdefault(vf.tag, [])
+                holder_class = HolderClass(vf.tag, len(siblings), i)
+                holder_class.add(i, np.eye(3))
+                siblings.append(holder_class)
+                classes.append(holder_class)
+        return classes
+
     def isotropize(self):
-        ms = pymeshlab.MeshSet()
+        import pymeshlab
 
-        ms.add_mesh(pymeshlab.Mesh(self.vertices, self.faces))
+        with PROFILER.stage("isotropize"):
+            ms = pymeshlab.MeshSet()
 
-        average_edge_length = self.average_edge_length()
+            ms.add_mesh(pymeshlab.Mesh(self.vertices, self.faces))
 
-        ms.apply_filter(
-            "meshing_isotropic_explicit_remeshing",
-            iterations=8,
-            targetlen=pymeshlab.PureValue(average_edge_length),
-            featuredeg=15,
-            adaptive=False,
-        )
+            average_edge_length = self.average_edge_length()
 
-        mesh = ms.current_mesh()
+            ms.apply_filter(
+                "meshing_isotropic_explicit_remeshing",
+                iterations=8,
+                targetlen=pymeshlab.PureValue(average_edge_length),
+                featuredeg=15,
+                adaptive=False,
+            )
 
-        # Reinitialize with new mesh data
-        Polyhedron.__init__(
-            self,
-            name=self.name,
-            vertices=mesh.vertex_matrix(),
-            faces=mesh.face_matrix().tolist(),
-            options=self.options,
-        )
+            mesh = ms.current_mesh()
+
+            # Reinitialize with new mesh data
+            Polyhedron.__init__(
+                self,
+                name=self.name,
+                vertices=mesh.vertex_matrix(),
+                faces=mesh.face_matrix().tolist(),
+                options=self.options,
+                signature_hash=self.signature_hash,
+            )
 
 
 class OpenscadArgs:
@@ -422,10 +1357,11 @@ class OpenscadArgs:
         self.tags = tags
         self.vertex_figure_edges = vertex_figure_edges
         self.offsets = self.polyhedron_offset_array(polyhedron)
+        self.mesh_assignment_cache: Optional[list[tuple[str, str]]] = None
 
     def polyhedron_options_array(self, polyhedron: Polyhedron):
         vertices = polyhedron.vertices
-        edges = polyhedron.edges.keys()
+        edges = polyhedron.edges.endpoints.tolist()
         vertex_figures = []
         eulers = []
         tags = []
@@ -457,31 +1393,46 @@ class OpenscadArgs:
                 value = polyhedron.solid_offset
                 return [[value] * len(vf.vecs) for vf in polyhedron.vertex_figures]
 
-    def to_openscad_args(self) -> list[str]:
-        args = []
-        args.append(f"-DEDGE_DIAMETER={self.options.edge_diameter}")
-        args.append(f"-DDIAMETER_TOLERANCE_FIT={self.options.diameter_tolerance_fit}")
-        args.append(f"-DDIAMETER_TAPER_FIT={self.options.diameter_taper_fit}")
-        args.append(f"-DWALL_THICKNESS={self.options.wall_thickness}")
-        args.append(f"-DRADIUS={self.options.radius}")
-        args.append(f"-DROD_INSET={self.options.rod_inset}")
-        args.append(f"-DGLOBAL_OFFSET={self.options.global_offset}")
-        args.append(
-            f"-DMIN_PRINTER_OVERHANG_ANGLE={self.options.min_printer_overhang_angle}"
-        )
-        args.append(f'-DVERTEX_TYPE="{self.options.vertex_type.value}"')
-        args.append(f'-DOFFSET_TYPE="{self.options.offset_type.value}"')
-        args.append(f'-DOBJECT="{self.options.object_type.value}"')
-        args.append(f"-DBY_TAG={'true' if self.options.by_tag else 'false'}")
-        args.append(f"-DINDEX={self.options.index}")
+    # Scalar settings, as (name, OpenSCAD literal) pairs
+    def option_assignments(self) -> list[tuple[str, str]]:
+        assignments = []
+        assignments.append(("EDGE_DIAMETER", f"{self.options.edge_diameter}"))
+        assignments.append(
+            ("DIAMETER_TOLERANCE_FIT", f"{self.options.diameter_tolerance_fit}")
+        )
+        assignments.append(("DIAMETER_TAPER_FIT", f"{self.options.diameter_taper_fit}"))
+        assignments.append(("WALL_THICKNESS", f"{self.options.wall_thickness}"))
+        assignments.append(("RADIUS", f"{self.options.radius}"))
+        assignments.append(("ROD_INSET", f"{self.options.rod_inset}"))
+        assignments.append(("GLOBAL_OFFSET", f"{self.options.global_offset}"))
+        assignments.append(
+            (
+                "MIN_PRINTER_OVERHANG_ANGLE",
+                f"{self.options.min_printer_overhang_angle}",
+            )
+        )
+        assignments.append(("VERTEX_TYPE", f'"{self.options.vertex_type.value}"'))
+        assignments.append(("OFFSET_TYPE", f'"{self.options.offset_type.value}"'))
+        assignments.append(("OBJECT", f'"{self.options.object_type.value}"'))
+        assignments.append(("BY_TAG", "true" if self.options.by_tag else "false"))
+        assignments.append(("INDEX", f"{self.options.index}"))
         colors_str = "[" + ",".join(f'"{c}"' for c in self.options.colors) + "]"
-        args.append(f"-DCOLORS={colors_str}")
-        args.append(
-            f"-DLABEL_VERTICES={'true' if self.options.label_vertices else 'false'}"
+        assignments.append(("COLORS", colors_str))
+        assignments.append(
+            ("LABEL_VERTICES", "true" if self.options.label_vertices else "false")
         )
-        args.append(
-            f"-DTUBULAR_SUPPORTS={'true' if self.options.tubular_supports else 'false'}"
+        assignments.append(
+            ("TUBULAR_SUPPORTS", "true" if self.options.tubular_supports else "false")
         )
+        assignments.append(("FN", f"{holder_fn(self.options)}"))
+        return assignments
+
+    # The whole mesh, as (name, OpenSCAD literal) pairs. Built once, since
+    # every holder rendered with -D flags repeats it.
+    def mesh_assignments(self) -> list[tuple[str, str]]:
+        if self.mesh_assignment_cache is not None:
+            return self.mesh_assignment_cache
+        assignments = []
         vertices_str = (
             "["
             + ",".join(
@@ -489,46 +1440,1574 @@ class OpenscadArgs:
             )
             + "]"
         )
-        args.append(f"-Dvertices={vertices_str}")
+        assignments.append(("vertices", vertices_str))
         edges_str = (
             "[" + ",".join(f"[{start},{end}]" for start, end in self.edges) + "]"
         )
-        args.append(f"-Dedges={edges_str}")
+        assignments.append(("edges", edges_str))
         vertex_figures_str = (
             "["
-            + ",".join(
-                f"[{','.join(str(v) for v in vf.tolist())}]"
-                for vf in self.vertex_figures
-            )
+            + ",".join(self.vertex_figure_str(vf) for vf in self.vertex_figures)
             + "]"
         )
-        args.append(f"-Dvertex_figures={vertex_figures_str}")
+        assignments.append(("vertex_figures", vertex_figures_str))
         eulers_str = (
             "[" + ",".join(f"[{e[0]},{e[1]},{e[2]}]" for e in self.eulers) + "]"
         )
-        args.append(f"-Deulers={eulers_str}")
+        assignments.append(("eulers", eulers_str))
         tags_str = "[" + ",".join(str(t) for t in self.tags) + "]"
-        args.append(f"-Dtags={tags_str}")
-        offsets_str = (
+        assignments.append(("tags", tags_str))
+        offsets_str = "[" + ",".join(self.offset_str(o) for o in self.offsets) + "]"
+        assignments.append(("offsets", offsets_str))
+        vertex_figure_edges_str = (
             "["
-            + ",".join(
-                "[" + ",".join(str(v) for v in o.tolist()) + "]"
-                if isinstance(o, np.ndarray)
-                else "[" + ",".join(str(v) for v in o) + "]"
-                for o in self.offsets
-            )
+            + ",".join(self.edge_list_str(vf) for vf in self.vertex_figure_edges)
             + "]"
         )
-        args.append(f"-Doffsets={offsets_str}")
-        vertex_figure_edges_str = (
-            "["
-            + ",".join(
-                f"[{','.join(str(e) for e in vf)}]" for vf in self.vertex_figure_edges
+        assignments.append(("vertex_figure_edges", vertex_figure_edges_str))
+        self.mesh_assignment_cache = assignments
+        return assignments
+
+    # Select the holder of vertex index
+    def holder_assignments(self, index: int) -> list[tuple[str, str]]:
+        return [("BY_TAG", "false"), ("INDEX", f"{index}")]
+
+    # Only the holder of vertex index, as (name, OpenSCAD literal) pairs; see
+    # PAYLOAD in interface.scad
+    def payload_assignments(self, index: int) -> list[tuple[str, str]]:
+        return self.holder_assignments(index) + [
+            ("PAYLOAD", "true"),
+            ("payload_figure", self.vertex_figure_str(self.vertex_figures[index])),
+            ("payload_offsets", self.offset_str(self.offsets[index])),
+            ("payload_edges", self.edge_list_str(self.vertex_figure_edges[index])),
+        ]
+
+    @staticmethod
+    def vertex_figure_str(vertex_figure: np.ndarray) -> str:
+        return f"[{','.join(str(v) for v in vertex_figure.tolist())}]"
+
+    @staticmethod
+    def offset_str(offsets: Union[np.ndarray, list[float]]) -> str:
+        if isinstance(offsets, np.ndarray):
+            offsets = offsets.tolist()
+        return "[" + ",".join(str(v) for v in offsets) + "]"
+
+    @staticmethod
+    def edge_list_str(edge_list: list[int]) -> str:
+        return f"[{','.join(str(e) for e in edge_list)}]"
+
+    # Option assignments, minus those replaced by overrides
+    def overridden_option_assignments(
+        self, overrides: list[tuple[str, str]]
+    ) -> list[tuple[str, str]]:
+        names = {name for name, _ in overrides}
+        return [
+            (name, value)
+            for name, value in self.option_assignments()
+            if name not in names
+        ]
+
+    def to_openscad_args(
+        self, overrides: Optional[list[tuple[str, str]]] = None
+    ) -> list[str]:
+        overrides = overrides or []
+        assignments = (
+            self.overridden_option_assignments(overrides)
+            + self.mesh_assignments()
+            + overrides
+        )
+        return [f"-D{name}={value}" for name, value in assignments]
+
+    # A file that includes interface.scad and then sets only the data of the
+    # holder of vertex index. Later assignments win in OpenSCAD, just as with
+    # -D flags.
+    def to_payload(
+        self,
+        index: int,
+        interface_path: str,
+        extra: Optional[list[tuple[str, str]]] = None,
+    ) -> str:
+        overrides = self.payload_assignments(index) + (extra or [])
+        assignments = self.overridden_option_assignments(overrides) + overrides
+        lines = [f"include <{interface_path}>"]
+        lines += [f"{name} = {value};" for name, value in assignments]
+        return "\n".join(lines) + "\n"
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Compiled meshes                                                           │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# Bumped whenever the arrays written by save_compiled change meaning
+COMPILED_FORMAT_VERSION = 3
+
+# GlobalOptions fields the derived state of a Polyhedron depends on. They are
+# fixed when a mesh is compiled.
+COMPILED_OPTION_FIELDS = (
+    "edge_diameter",
+    "wall_thickness",
+    "radius",
+    "rod_inset",
+    "global_offset",
+    "offset_type",
+)
+
+
+# Save a polyhedron and everything derived from it as an uncompressed .npz
+# archive, so load_compiled can memory-map it instead of recomputing.
+# Per-half-edge arrays are stored in the CSR order of polyhedron.adjacency.
+def save_compiled(polyhedron: Polyhedron, path: str) -> None:
+    compiled_options = option_fields(polyhedron.options, COMPILED_OPTION_FIELDS)
+
+    faces = [np.asarray(face, dtype=np.int64) for face in polyhedron.faces]
+    face_offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+    np.cumsum([len(face) for face in faces], out=face_offsets[1:])
+    face_indices = np.concatenate(faces or [np.empty(0, dtype=np.int64)])
+
+    figures = polyhedron.vertex_figures
+
+    def half_edge_array(attribute: str, shape: tuple[int, ...]) -> np.ndarray:
+        parts = [np.asarray(getattr(vf, attribute), dtype=float) for vf in figures]
+        return np.concatenate([part.reshape(-1, *shape) for part in parts])
+
+    np.savez(
+        path,
+        version=np.array(COMPILED_FORMAT_VERSION),
+        name=np.array(polyhedron.name),
+        options=np.array(json.dumps(compiled_options)),
+        vertices=np.asarray(polyhedron.vertices, dtype=float),
+        face_offsets=face_offsets,
+        face_indices=face_indices,
+        adjacency_offsets=polyhedron.adjacency.offsets,
+        adjacency_neighbors=polyhedron.adjacency.neighbors,
+        edge_table=polyhedron.edges.table,
+        half_edge_names=np.array(
+            [name for vf in figures for name in vf.edges], dtype=np.int64
+        ),
+        tags=np.array([vf.tag for vf in figures], dtype=np.int64),
+        vecs=half_edge_array("vecs", (3,)),
+        std=half_edge_array("std", (3,)),
+        eulers=np.array([vf.euler for vf in figures], dtype=float).reshape(-1, 3),
+        half_edge_offsets=half_edge_array("half_edge_offset", ()),
+        vertex_offsets=np.array([vf.vertex_offset for vf in figures], dtype=float),
+        solid_offset=np.array(polyhedron.solid_offset, dtype=float),
+    )
+
+
+# Read the arrays of an .npz archive. Members stored without compression, as
+# np.savez writes them, are memory-mapped; others are read into memory. Mapped
+# arrays are returned as plain ndarray views, which slice much faster than
+# np.memmap.
+def load_npz(path: str) -> dict[str, np.ndarray]:
+    header_readers = {
+        (1, 0): np.lib.format.read_array_header_1_0,
+        (2, 0): np.lib.format.read_array_header_2_0,
+    }
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename.removesuffix(".npy")
+            # The member's data follows its 30-byte local file header, file
+            # name and extra field
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            header = None
+            if info.compress_type == zipfile.ZIP_STORED and version in header_readers:
+                header = header_readers[version](f)
+            if header is None or header[2].hasobject or 0 in header[0]:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            shape, fortran_order, dtype = header
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=f.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            ).view(np.ndarray)
+    return arrays
+
+
+# Load a polyhedron written by save_compiled without recomputing its edges,
+# offsets or vertex figures. The options the derived state depends on are
+# taken from the archive; options given explicitly that disagree with them
+# raise ValueError.
+def load_compiled(path: str, overrides: Optional[dict[str, Any]] = None) -> Polyhedron:
+    arrays = load_npz(path)
+    version = arrays["version"].item()
+    if version != COMPILED_FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has compiled format version {version}, expected "
+            f"{COMPILED_FORMAT_VERSION}. Compile the mesh again"
+        )
+
+    options_dict = dict(overrides or {})
+    compiled_options = json.loads(arrays["options"].item())
+    compiled_options["offset_type"] = OffsetType(compiled_options["offset_type"])
+    for field, value in compiled_options.items():
+        if options_dict.get(field, value) != value:
+            raise ValueError(
+                f"{path} was compiled with {field}={value!r}, not "
+                f"{options_dict[field]!r}. Compile the mesh again"
             )
-            + "]"
+    options_dict.update(compiled_options)
+    options = GlobalOptions(**options_dict)
+
+    face_offsets = arrays["face_offsets"]
+    face_indices = np.asarray(arrays["face_indices"]).tolist()
+    faces = [
+        face_indices[start:end]
+        for start, end in zip(face_offsets[:-1].tolist(), face_offsets[1:].tolist())
+    ]
+
+    polyhedron = Polyhedron.__new__(Polyhedron)
+    polyhedron.name = arrays["name"].item()
+    polyhedron.faces = faces
+    polyhedron.vertices = arrays["vertices"]
+    polyhedron.options = options
+    polyhedron.signature_hash = signature_bytes
+    polyhedron.adjacency = VertexAdjacency(
+        arrays["adjacency_offsets"], arrays["adjacency_neighbors"]
+    )
+    polyhedron.edges = EdgeTable(arrays["edge_table"], len(polyhedron.vertices))
+    polyhedron.half_edges = HalfEdgeMesh.from_faces(
+        faces, polyhedron.adjacency, polyhedron.edges
+    )
+    polyhedron.solid_offset = arrays["solid_offset"].item()
+
+    offsets = polyhedron.adjacency.offsets.tolist()
+    half_edge_names = arrays["half_edge_names"].tolist()
+    tags = arrays["tags"].tolist()
+    eulers = arrays["eulers"].tolist()
+    polyhedron.vertex_figures = []
+    for i, vertex in enumerate(polyhedron.vertices):
+        figure = slice(offsets[i], offsets[i + 1])
+        vf = VertexFigure(
+            vertex,
+            i,
+            arrays["vecs"][figure],
+            polyhedron.adjacency.neighbors[figure],
+            tags[i],
+            options,
+            half_edge_offset=arrays["half_edge_offsets"][figure],
+            std=arrays["std"][figure],
+            euler=eulers[i],
+        )
+        vf.vertex_offset = float(arrays["vertex_offsets"][i])
+        vf.edges = half_edge_names[figure]
+        polyhedron.vertex_figures.append(vf)
+    return polyhedron
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Render cache                                                              │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# GlobalOptions fields that change the geometry of a rendered vertex holder.
+# Offsets are hashed directly, so the offset options are not listed.
+HOLDER_GEOMETRY_FIELDS = (
+    "edge_diameter",
+    "diameter_tolerance_fit",
+    "diameter_taper_fit",
+    "wall_thickness",
+    "radius",
+    "rod_inset",
+    "min_printer_overhang_angle",
+    "vertex_type",
+    "label_vertices",
+    "tubular_supports",
+    "backend",
+    "scad_codegen",
+    "openscad_engine",
+    "openscad_flags",
+    "chordal_error",
+)
+
+
+# Key of the holder OpenSCAD renders for vertex index with these arguments.
+# kind distinguishes the holder variants in interface.scad.
+def holder_key(
+    openscad_args: "OpenscadArgs", index: int, kind: str, scad_digest: str
+) -> str:
+    options = openscad_args.options
+    # Adding 0.0 turns -0.0 into 0.0 so both hash the same
+    payload = {
+        "kind": kind,
+        "scad": scad_digest,
+        "options": option_fields(options, HOLDER_GEOMETRY_FIELDS),
+        "std": (np.round(openscad_args.vertex_figures[index], 6) + 0.0).tolist(),
+        "offsets": (
+            np.round(np.asarray(openscad_args.offsets[index], dtype=float), 6) + 0.0
+        ).tolist(),
+        "edges": (
+            [int(e) for e in openscad_args.vertex_figure_edges[index]]
+            if options.label_vertices
+            else None
+        ),
+        "index": index if options.label_vertices else None,
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def option_fields(options: GlobalOptions, fields: tuple[str, ...]) -> dict[str, Any]:
+    values = {}
+    for field in fields:
+        value = getattr(options, field)
+        values[field] = value.value if isinstance(value, Enum) else value
+    return values
+
+
+# Content-addressed store of rendered vertex holder STLs, shared between runs
+# and meshes. Entries are keyed by everything the holder's geometry depends on
+# and evicted least-recently-used first once the cache exceeds max_bytes.
+class RenderCache:
+    def __init__(
+        self, directory: str, max_bytes: int, scad_dir: str = "scad"
+    ) -> None:
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.scad_digest: str = self.digest_scad(scad_dir)
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evicted: int = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def digest_scad(scad_dir: str) -> str:
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(f"{scad_dir}/*.scad")):
+            digest.update(os.path.basename(path).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def key(self, openscad_args: "OpenscadArgs", index: int, kind: str) -> str:
+        return holder_key(openscad_args, index, kind, self.scad_digest)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.stl")
+
+    # Link or copy a cached render to destination. Returns False on a miss.
+    def fetch(self, key: str, destination: str) -> bool:
+        path = self.path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return False
+        self.hits += 1
+        # Mark as recently used
+        os.utime(path)
+        if os.path.lexists(destination):
+            os.remove(destination)
+        try:
+            os.link(path, destination)
+        except OSError:
+            shutil.copyfile(path, destination)
+        return True
+
+    # renderer names the program that rendered source. It is kept next to
+    # the entry, so that outputs restored from the cache record who rendered
+    # them.
+    def store(self, key: str, source: str, renderer: Optional[str] = None) -> None:
+        if not os.path.exists(source):
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if renderer is not None:
+            temporary = f"{self.renderer_path(key)}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                f.write(renderer)
+            os.replace(temporary, self.renderer_path(key))
+        temporary = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, path)
+
+    def renderer_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.renderer")
+
+    # Renderer stored with an entry, or None if it was stored without one
+    def renderer(self, key: str) -> Optional[str]:
+        try:
+            with open(self.renderer_path(key)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def size(self) -> int:
+        return sum(os.path.getsize(p) for p in self.entries())
+
+    def entries(self) -> list[str]:
+        return glob.glob(os.path.join(self.directory, "*", "*.stl"))
+
+    def evict(self) -> None:
+        entries = [(os.stat(p), p) for p in self.entries()]
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in sorted(entries, key=lambda x: x[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            renderer_path = f"{path[:-4]}.renderer"
+            if os.path.exists(renderer_path):
+                os.remove(renderer_path)
+            total -= stat.st_size
+            self.evicted += 1
+
+    def summary(self) -> str:
+        return (
+            f"render cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.evicted} evicted, {self.size() / 1e6:.1f} MB in {self.directory}"
+        )
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Incremental outputs                                                       │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+BUILD_MANIFEST_NAME = "build.json"
+BUILD_MANIFEST_VERSION = 1
+
+# GlobalOptions fields the laser cut SVGs depend on besides the edge lengths
+SVG_FIELDS = ("edge_diameter", "rod_stock_length", "rods_per_cut")
+
+
+# Hash of a mesh's vertices and faces, the input every output depends on
+def mesh_digest(polyhedron: Polyhedron) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(polyhedron.vertices, dtype=float).tobytes())
+    digest.update(json.dumps(polyhedron.faces).encode())
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+# Records in output_dir/build.json each artifact generated there, the
+# fingerprint of the inputs it was built from and the content hash of each of
+# its files. An artifact is rebuilt only when its fingerprint changes or its
+# files were changed or removed since.
+class BuildManifest:
+    def __init__(
+        self, output_dir: str, force: bool = False, scad_dir: str = "scad"
+    ) -> None:
+        self.output_dir: str = output_dir
+        self.scad_digest: str = RenderCache.digest_scad(scad_dir)
+        self.path: str = os.path.join(output_dir, BUILD_MANIFEST_NAME)
+        self.artifacts: dict[str, dict[str, Any]] = {}
+        self.built: int = 0
+        self.skipped: int = 0
+        if os.path.exists(self.path) and not force:
+            with open(self.path) as f:
+                manifest = json.load(f)
+            if manifest.get("version") == BUILD_MANIFEST_VERSION:
+                self.artifacts = manifest["artifacts"]
+
+    @staticmethod
+    def fingerprint(*inputs) -> str:
+        encoded = json.dumps(inputs, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def up_to_date(self, name: str, fingerprint: str) -> bool:
+        entry = self.artifacts.get(name)
+        if entry is None or entry["inputs"] != fingerprint:
+            return False
+        for file, digest in entry["files"].items():
+            path = os.path.join(self.output_dir, file)
+            if not os.path.exists(path) or file_digest(path) != digest:
+                return False
+        return True
+
+    # Remove the files of an artifact that is about to be rebuilt, so none
+    # are left behind if it now has fewer files
+    def clear(self, name: str) -> None:
+        entry = self.artifacts.pop(name, None)
+        if entry is None:
+            return
+        for file in entry["files"]:
+            path = os.path.join(self.output_dir, file)
+            if os.path.exists(path):
+                os.remove(path)
+
+    # renderer names the program that produced a rendered artifact, and
+    # cached marks artifacts restored from the render cache instead
+    def record(
+        self,
+        name: str,
+        fingerprint: str,
+        paths: list[str],
+        renderer: Optional[str] = None,
+        cached: bool = False,
+    ) -> None:
+        files = {
+            os.path.relpath(path, self.output_dir): file_digest(path) for path in paths
+        }
+        self.artifacts[name] = {"inputs": fingerprint, "files": files}
+        if renderer is not None:
+            self.artifacts[name]["renderer"] = renderer
+        if cached:
+            self.artifacts[name]["cached"] = True
+        self.built += 1
+
+    # Call produce(), which returns the paths it wrote, unless the artifact is
+    # up to date
+    def build(
+        self, name: str, fingerprint: str, produce: Callable[[], list[str]]
+    ) -> None:
+        if self.up_to_date(name, fingerprint):
+            self.skipped += 1
+            return
+        self.clear(name)
+        with PROFILER.stage(name):
+            paths = produce()
+        self.record(name, fingerprint, paths)
+
+    # Fingerprint of a holder render: its render cache key, its extra
+    # assignments and the contents of the files it reads
+    def job_fingerprint(self, job: "RenderJob", kind: str) -> str:
+        return self.fingerprint(
+            holder_key(job.openscad_args, job.vertex_index, kind, self.scad_digest),
+            job.extra,
+            [file_digest(p) if os.path.exists(p) else None for p in job.reads],
+        )
+
+    def save(self) -> None:
+        manifest = {"version": BUILD_MANIFEST_VERSION, "artifacts": self.artifacts}
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+
+    def summary(self) -> str:
+        return f"outputs: {self.built} rebuilt, {self.skipped} up to date"
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Flat SCAD                                                                 │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# $fn of holder renders without a chordal error, as interface.scad defaults it
+HOLDER_FN = 60
+MIN_FN = 8
+
+# Chordal error in mm of the coarse first pass of --draft
+DRAFT_CHORDAL_ERROR = 0.25
+
+
+# $fn of holder renders: the fewest segments that keep the outer tube circle
+# within options.chordal_error mm of the true circle. A polygon of n segments
+# strays r * (1 - cos(pi / n)) from a circle of radius r.
+def holder_fn(options: GlobalOptions) -> int:
+    if options.chordal_error is None:
+        return HOLDER_FN
+    radius = options.outer_tube_radius
+    if options.chordal_error >= radius:
+        return MIN_FN
+    fn = int(np.ceil(np.pi / np.arccos(1 - options.chordal_error / radius)))
+    return max(fn, MIN_FN)
+
+
+# lowest_line_on_cylinder from vertex_holders.scad for every row of vecs at
+# once: the lowest point of the circle of radius at lengths along each vector
+def lowest_points(vecs: np.ndarray, lengths: np.ndarray, radius: float) -> np.ndarray:
+    uv = vecs / np.linalg.norm(vecs, axis=1)[:, np.newaxis]
+    proj = np.array([0.0, 0.0, -1.0]) + uv[:, 2:3] * uv
+    norms = np.linalg.norm(proj, axis=1)
+    flat = norms < 1e-9
+    directions = np.where(
+        flat[:, np.newaxis],
+        [1.0, 0.0, 0.0],
+        proj / np.where(flat, 1.0, norms)[:, np.newaxis],
+    )
+    return uv * lengths[:, np.newaxis] + radius * directions
+
+
+# Transforms of the tubes of a tubular vertex holder and of their supports,
+# and the height of the flat bottom cut, as tubular_vertex_holder computes
+# them. Angles are in degrees.
+class TubePlacements:
+    def __init__(
+        self,
+        vecs: np.ndarray,
+        offsets: Union[np.ndarray, list[float]],
+        options: GlobalOptions,
+    ) -> None:
+        vecs = np.asarray(vecs, dtype=float)
+        offsets = np.asarray(offsets, dtype=float)
+        radius = options.outer_tube_radius
+        tops = offsets + options.tube_depth
+
+        self.vecs: np.ndarray = vecs
+        self.offsets: np.ndarray = offsets
+        self.positions: np.ndarray = offsets[:, np.newaxis] * vecs
+        self.eulers: np.ndarray = np.degrees(
+            np.stack(
+                [
+                    np.zeros(len(vecs)),
+                    np.arctan2(np.hypot(vecs[:, 0], vecs[:, 1]), vecs[:, 2]),
+                    np.arctan2(vecs[:, 1], vecs[:, 0]),
+                ],
+                axis=1,
+            )
+        )
+
+        lowest_bottom = lowest_points(vecs, offsets, radius)
+        lowest_top = lowest_points(vecs, tops, radius)
+        self.cutoff: float = float(
+            min(lowest_bottom[:, 2].min(), lowest_top[:, 2].min())
+        )
+
+        self.supported: np.ndarray = (
+            self.eulers[:, 1] > options.min_printer_overhang_angle
+        ) & options.tubular_supports
+        base_inset = np.abs(lowest_top[:, 2] - self.cutoff) / np.tan(
+            np.radians(options.min_printer_overhang_angle)
+        )
+        clamped_base_position = np.minimum(
+            np.maximum(tops - base_inset, 0.0),
+            np.hypot(lowest_top[:, 0], lowest_top[:, 1]),
+        )
+        tube_top_to_cutoff_plane = (
+            -radius - lowest_top[:, 2] + self.cutoff + tops * vecs[:, 2]
+        )
+        # Translations of the two slivers each support hull spans down to the
+        # cutoff plane
+        self.support_tops: np.ndarray = np.zeros((len(vecs), 3))
+        self.support_tops[:, 2] = tube_top_to_cutoff_plane
+        self.support_bases: np.ndarray = self.support_tops + clamped_base_position[
+            :, np.newaxis
+        ] * (vecs * [1.0, 1.0, 0.0])
+
+
+def scad_number(value: float) -> str:
+    return repr(float(value))
+
+
+def scad_vector(values) -> str:
+    return "[" + ", ".join(scad_number(v) for v in values) + "]"
+
+
+# tube_label from vertex_holders.scad: text engraved into the outer wall of a
+# tube, in the tube's local frame
+def label_scad(text: str, options: GlobalOptions) -> str:
+    radius = scad_number(options.outer_tube_radius)
+    height = scad_number(options.radius)
+    base = scad_vector([0, 0, options.tube_depth - options.wall_thickness])
+    return (
+        f"intersection() {{ translate({base}) rotate([0, 90, 0]) "
+        f'linear_extrude(20) text("{text}", valign="center", size={radius}); '
+        f"difference() {{ cylinder(r={radius}, h={height}, center=true); "
+        f"cylinder(r={scad_number(options.outer_tube_radius - 0.5)}, "
+        f"h={height}, center=true); }} }}"
+    )
+
+
+# OpenSCAD source of the holder of vertex index with every loop, function
+# and module of vertex_holders.scad evaluated: literal transforms and
+# primitives, one block per tube. extra carries TAG_FILE and ALIGNMENT for
+# labeled holders, as in labeled_holder_job.
+def flat_holder_scad(
+    openscad_args: "OpenscadArgs",
+    index: int,
+    extra: Optional[list[tuple[str, str]]] = None,
+) -> str:
+    options = openscad_args.options
+    if options.vertex_type != VertexType.TUBULAR:
+        raise ValueError("Flat SCAD codegen only builds tubular vertex holders")
+    placements = TubePlacements(
+        openscad_args.vertex_figures[index], openscad_args.offsets[index], options
+    )
+    edge_names = openscad_args.vertex_figure_edges[index]
+
+    radius = options.outer_tube_radius
+    depth = options.tube_depth
+    wall = options.wall_thickness
+    bore = options.edge_diameter + options.diameter_tolerance_fit
+    sliver = f"cube({scad_vector([0.1, radius, 0.1])}, center=true);"
+    # A SCAD string literal, set by LabelCache.attach
+    label_dir = dict(extra or []).get("LABEL_DIR")
+
+    def frame(i: int, position: np.ndarray) -> str:
+        return (
+            f"translate({scad_vector(position)}) "
+            f"rotate({scad_vector(placements.eulers[i])})"
+        )
+
+    def tube(offset: float) -> str:
+        return (
+            f"union() {{ cylinder(r={scad_number(radius)}, h={scad_number(depth)}); "
+            f"translate([0, 0, {scad_number(-offset)}]) "
+            f"cylinder(r={scad_number(radius)}, h={scad_number(wall + offset)}); }}"
+        )
+
+    # tube_labels: the edge name on one side, the vertex index on the other.
+    # Label solids are imported from LABEL_DIR if it is given
+    def labels(i: int) -> list[str]:
+        return [
+            f"    rotate([0, 0, {angle}]) "
+            + (
+                label_scad(str(text), options)
+                if label_dir is None
+                else f'import("{label_dir[1:-1]}/{text}.stl");'
+            )
+            for angle, text in ((90, edge_names[i]), (270, index))
+        ]
+
+    lines = [f"// Vertex holder {index}, generated by vertexprint.py"]
+    lines.append(f"$fn = {holder_fn(options)};")
+    if options.object_type == ObjectType.LABELED_HOLDER:
+        assignments = dict(extra or [])
+        lines.append("difference() {")
+        lines.append(
+            f"  multmatrix({assignments['ALIGNMENT']}) "
+            f"import({assignments['TAG_FILE']});"
+        )
+        for i, position in enumerate(placements.positions):
+            lines.append(f"  {frame(i, position)} union() {{")
+            lines += labels(i)
+            lines.append("  }")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    lines.append("difference() {")
+    lines.append("  union() {")
+    for i, (position, offset) in enumerate(
+        zip(placements.positions, placements.offsets.tolist())
+    ):
+        if placements.supported[i]:
+            lines.append("    hull() {")
+            lines.append(f"      {frame(i, placements.support_bases[i])} {sliver}")
+            lines.append(f"      {frame(i, placements.support_tops[i])} {sliver}")
+            lines.append(
+                f"      {frame(i, position)} difference() {{ {tube(offset)} "
+                f"translate({scad_vector([-50 + bore / 2, 0, 0])}) "
+                f"cube([100, 100, 100], center=true); }}"
+            )
+            lines.append("    }")
+        if options.label_vertices:
+            lines.append(f"    {frame(i, position)} difference() {{")
+            lines.append(f"      {tube(offset)}")
+            lines += ["  " + label for label in labels(i)]
+            lines.append("    }")
+        else:
+            lines.append(f"    {frame(i, position)} {tube(offset)}")
+    lines.append("  }")
+    for i, position in enumerate(placements.positions):
+        lines.append(
+            f"  {frame(i, position)} union() {{ "
+            f"cylinder(d1={scad_number(bore - options.diameter_taper_fit)}, "
+            f"d2={scad_number(bore)}, h={scad_number(depth)}); "
+            f"cylinder(d={scad_number(bore)}, h={scad_number(options.radius)}); }}"
+        )
+    lines.append(
+        f"  translate({scad_vector([0, 0, -50 + placements.cutoff])}) "
+        "cube([100, 100, 100], center=true);"
+    )
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Label cache                                                               │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# OpenSCAD render of one label solid, run by RenderScheduler like a RenderJob.
+# OpenSCAD writes to a temporary .stl that LabelCache moves into place.
+class LabelJob:
+    def __init__(self, text: str, path: str, options: GlobalOptions) -> None:
+        self.text: str = text
+        self.path: str = path
+        self.output: str = f"{path[:-4]}.{os.getpid()}.tmp.stl"
+        self.options: GlobalOptions = options
+
+    def command(self, payload_dir: str) -> list[str]:
+        source = os.path.join(payload_dir, f"label-{self.text}.scad")
+        with open(source, "w") as f:
+            f.write(
+                f"$fn = {holder_fn(self.options)};\n"
+                f"{label_scad(self.text, self.options)}\n"
+            )
+        return ["openscad", "-o", self.output, source]
+
+
+# Label solids rendered once and imported by every holder that engraves the
+# same string, in this run and later ones. Solids are stored as <text>.stl in
+# a directory named after the hash of the label SCAD, which holds every option
+# the solid depends on, and of the OpenSCAD engine options.
+class LabelCache:
+    def __init__(self, root: str, options: GlobalOptions) -> None:
+        template = f"$fn = {holder_fn(options)};\n{label_scad('{}', options)}\n"
+        engine = option_fields(options, ("openscad_engine", "openscad_flags"))
+        digest = hashlib.sha256(
+            (template + json.dumps(engine, sort_keys=True)).encode()
+        ).hexdigest()[:16]
+        self.directory: str = os.path.join(root, "labels", digest)
+        self.options: GlobalOptions = options
+        self.rendered: int = 0
+        self.reused: int = 0
+
+    def path(self, text: str) -> str:
+        return os.path.join(self.directory, f"{text}.stl")
+
+    # Render the labels of render_jobs that are not cached yet and point the
+    # jobs at the cache. If any label fails to render, the jobs build their
+    # labels with text() instead. Returns the label renders.
+    def attach(
+        self,
+        scheduler: "RenderScheduler",
+        render_jobs: list["RenderJob"],
+    ) -> list["RenderResult"]:
+        texts = set()
+        for job in render_jobs:
+            args = job.openscad_args
+            texts.add(str(job.vertex_index))
+            texts.update(str(e) for e in args.vertex_figure_edges[job.vertex_index])
+        os.makedirs(self.directory, exist_ok=True)
+        missing = sorted(text for text in texts if not os.path.exists(self.path(text)))
+        self.reused += len(texts) - len(missing)
+
+        with PROFILER.stage("labels"):
+            results = scheduler.run(
+                [LabelJob(text, self.path(text), self.options) for text in missing]
+            )
+        for result in results:
+            if result.ok:
+                os.replace(result.job.output, result.job.path)
+                result.job.output = result.job.path
+                self.rendered += 1
+            elif os.path.exists(result.job.output):
+                os.remove(result.job.output)
+        if all(result.ok for result in results):
+            assignment = ("LABEL_DIR", f'"{os.path.abspath(self.directory)}"')
+            for job in render_jobs:
+                job.extra.append(assignment)
+        return results
+
+    def summary(self) -> str:
+        return f"labels: {self.rendered} rendered, {self.reused} cached"
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ OpenSCAD engines                                                          │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# What an openscad executable supports, from its --version and --help output.
+# Releases up to 2021.01 render with CGAL only. Development snapshots offer
+# Manifold, first as the experimental feature --enable=manifold and later
+# through --backend. version is None if openscad could not be run.
+class OpenscadFeatures:
+    def __init__(self, version: Optional[str], help_text: str) -> None:
+        self.version: Optional[str] = version
+        self.backend_flag: bool = "--backend" in help_text
+        self.manifold: bool = "manifold" in help_text.lower()
+
+    # The engine that renders for engine. auto picks Manifold where supported
+    def resolve(self, engine: OpenscadEngine) -> OpenscadEngine:
+        if engine == OpenscadEngine.AUTO:
+            return OpenscadEngine.MANIFOLD if self.manifold else OpenscadEngine.CGAL
+        if engine == OpenscadEngine.MANIFOLD and self.version and not self.manifold:
+            raise ValueError(
+                f"openscad {self.version} does not support the Manifold engine"
+            )
+        return engine
+
+    # Command line flags selecting a resolved engine. CGAL is selected
+    # explicitly where --backend exists, so outputs do not change if the
+    # default does.
+    def flags(self, engine: OpenscadEngine) -> list[str]:
+        if engine == OpenscadEngine.MANIFOLD:
+            if self.backend_flag or self.version is None:
+                return ["--backend=manifold"]
+            return ["--enable=manifold"]
+        return ["--backend=cgal"] if self.backend_flag else []
+
+    def describe(self, engine: OpenscadEngine) -> str:
+        return f"openscad {self.version or '(not found)'} {engine.value}"
+
+
+@functools.lru_cache
+def probe_openscad(executable: str, mtime: float) -> OpenscadFeatures:
+    outputs = []
+    for flag in ["--version", "--help"]:
+        try:
+            process = subprocess.run(
+                [executable, flag], capture_output=True, text=True, timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return OpenscadFeatures(None, "")
+        outputs.append(process.stdout + process.stderr)
+    version = outputs[0].split()[-1] if outputs[0].split() else "unknown"
+    return OpenscadFeatures(version, outputs[1])
+
+
+# Features of the openscad on PATH, probed once per executable and
+# modification time
+def openscad_features() -> OpenscadFeatures:
+    executable = shutil.which("openscad")
+    if executable is None:
+        return OpenscadFeatures(None, "")
+    return probe_openscad(executable, os.path.getmtime(executable))
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Rendering                                                                 │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# One OpenSCAD render of the holder of vertex_index. Jobs share one
+# OpenscadArgs per option set and build their command line only at launch.
+class RenderJob:
+
+    def __init__(
+        self,
+        openscad_args: OpenscadArgs,
+        vertex_index: int,
+        output: str,
+        extra: Optional[list[tuple[str, str]]] = None,
+        reads: Optional[list[str]] = None,
+    ) -> None:
+        self.openscad_args: OpenscadArgs = openscad_args
+        self.vertex_index: int = vertex_index
+        self.output: str = output
+        self.extra: list[tuple[str, str]] = extra or []
+        # Files the render reads besides the SCAD sources
+        self.reads: list[str] = reads or []
+
+    # With flat codegen, the holder is written out as literal SCAD. With
+    # payload files, only this holder's data is written to a generated file
+    # that includes interface.scad; otherwise the whole mesh is passed with -D
+    # flags.
+    def command(self, payload_dir: str) -> list[str]:
+        payload_path = os.path.join(
+            payload_dir, f"{os.path.basename(self.output)}.scad"
+        )
+        if self.openscad_args.options.scad_codegen == ScadCodegen.FLAT:
+            with open(payload_path, "w") as f:
+                f.write(
+                    flat_holder_scad(self.openscad_args, self.vertex_index, self.extra)
+                )
+            return ["openscad", "-o", self.output, payload_path]
+        if not self.openscad_args.options.payload_files:
+            overrides = (
+                self.openscad_args.holder_assignments(self.vertex_index) + self.extra
+            )
+            return (
+                ["openscad"]
+                + self.openscad_args.to_openscad_args(overrides)
+                + ["-o", self.output, "scad/interface.scad"]
+            )
+        with open(payload_path, "w") as f:
+            f.write(
+                self.openscad_args.to_payload(
+                    self.vertex_index,
+                    os.path.abspath("scad/interface.scad"),
+                    self.extra,
+                )
+            )
+        return ["openscad", "-o", self.output, payload_path]
+
+
+class RenderResult:
+    def __init__(
+        self,
+        job: RenderJob,
+        returncode: Optional[int],
+        attempts: int,
+        seconds: float,
+        stderr: str = "",
+        timed_out: bool = False,
+    ) -> None:
+        self.job: RenderJob = job
+        self.returncode: Optional[int] = returncode
+        self.attempts: int = attempts
+        self.seconds: float = seconds
+        self.stderr: str = stderr
+        self.timed_out: bool = timed_out
+        # Set by the scheduler that ran the job
+        self.renderer: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return (
+            not self.timed_out
+            and self.returncode == 0
+            and os.path.exists(self.job.output)
+        )
+
+    def reason(self) -> str:
+        if self.timed_out:
+            return f"timed out after {self.seconds:.1f} seconds"
+        if self.returncode is None:
+            return "could not start openscad"
+        if self.returncode != 0:
+            return f"exit code {self.returncode}"
+        return "no output written"
+
+
+# Runs OpenSCAD renders as child processes of an asyncio event loop, at most
+# `jobs` at a time. Failed or timed out renders are retried up to `retries`
+# times. On cancellation (e.g. Ctrl-C) all running children are killed. flags
+# are passed to every openscad, and renderer names it in results and build.json.
+class RenderScheduler:
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        flags: Optional[list[str]] = None,
+        renderer: str = "openscad",
+    ) -> None:
+        self.jobs: int = jobs or os.cpu_count() or 1
+        self.timeout: Optional[float] = timeout
+        self.retries: int = retries
+        self.flags: list[str] = flags or []
+        self.renderer: str = renderer
+
+    def run(self, render_jobs: list[RenderJob]) -> list[RenderResult]:
+        if not render_jobs:
+            return []
+        with tempfile.TemporaryDirectory(prefix="vertexprint-") as payload_dir:
+            results = asyncio.run(self.run_all(render_jobs, payload_dir))
+        for result in results:
+            result.renderer = self.renderer
+            PROFILER.add(
+                "render_job", result.seconds, os.path.basename(result.job.output)
+            )
+        return results
+
+    async def run_all(
+        self, render_jobs: list[RenderJob], payload_dir: str
+    ) -> list[RenderResult]:
+        semaphore = asyncio.Semaphore(self.jobs)
+        tasks = [
+            asyncio.create_task(self.run_one(job, semaphore, payload_dir))
+            for job in render_jobs
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def run_one(
+        self, job: RenderJob, semaphore: asyncio.Semaphore, payload_dir: str
+    ) -> RenderResult:
+        async with semaphore:
+            command = job.command(payload_dir)
+            command = command[:1] + self.flags + command[1:]
+            for attempt in range(1, self.retries + 2):
+                result = await self.launch(job, command, attempt)
+                if result.ok or result.returncode is None:
+                    break
+            return result
+
+    async def launch(
+        self, job: RenderJob, command: list[str], attempt: int
+    ) -> RenderResult:
+        start = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            return RenderResult(job, None, attempt, 0.0, str(e))
+
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            await self.kill(process)
+            return RenderResult(
+                job,
+                process.returncode,
+                attempt,
+                time.perf_counter() - start,
+                timed_out=True,
+            )
+        except asyncio.CancelledError:
+            await self.kill(process)
+            raise
+        return RenderResult(
+            job,
+            process.returncode,
+            attempt,
+            time.perf_counter() - start,
+            stderr.decode(errors="replace"),
+        )
+
+    @staticmethod
+    async def kill(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+def print_render_summary(results: list[RenderResult]):
+    failed = [r for r in results if not r.ok]
+    render_time = sum(r.seconds for r in results)
+    print(
+        f"{len(results)} renders, {len(failed)} failed, "
+        f"{render_time:.2f} seconds of render time"
+    )
+    for renderer in sorted({r.renderer for r in results}):
+        group = [r for r in results if r.renderer == renderer]
+        seconds = sum(r.seconds for r in group)
+        print(
+            f"  {renderer or 'unknown'}: {len(group)} renders, "
+            f"{seconds:.2f} seconds, {seconds / len(group):.3f} seconds per render"
+        )
+    for result in failed:
+        print(
+            f"  {result.job.output}: {result.reason()} "
+            f"({result.attempts} attempt{'s' if result.attempts > 1 else ''})"
+        )
+        for line in result.stderr.strip().splitlines()[-5:]:
+            print(f"    {line}")
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Native mesh backend                                                       │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+# A triangle mesh as (vertices, faces) arrays
+TriangleMesh = tuple[np.ndarray, np.ndarray]
+
+# Outward facing triangles of a box, with corner i at bit offsets (x, y, z) =
+# (i & 1, i >> 1 & 1, i >> 2 & 1)
+BOX_FACES = np.array(
+    [
+        [0, 2, 3],
+        [0, 3, 1],
+        [4, 5, 7],
+        [4, 7, 6],
+        [0, 1, 5],
+        [0, 5, 4],
+        [2, 6, 7],
+        [2, 7, 3],
+        [0, 4, 6],
+        [0, 6, 2],
+        [1, 3, 7],
+        [1, 7, 5],
+    ]
+)
+
+
+# Rotation matrix of OpenSCAD's rotate(direction_to_euler(v)), which takes the
+# z axis onto v
+def direction_to_matrix(v: np.ndarray) -> np.ndarray:
+    theta = np.arctan2(np.linalg.norm(v[:2]), v[2])
+    phi = np.arctan2(v[1], v[0])
+    cp, sp = np.cos(phi), np.sin(phi)
+    ct, st = np.cos(theta), np.sin(theta)
+    rz = np.array([[cp, -sp, 0.0], [sp, cp, 0.0], [0.0, 0.0, 1.0]])
+    ry = np.array([[ct, 0.0, st], [0.0, 1.0, 0.0], [-st, 0.0, ct]])
+    return rz @ ry
+
+
+# Closed solid of revolution about the z axis. profile lists (radius, z) pairs
+# from bottom to top; circles are polygons with fn vertices, as with $fn.
+def revolved_mesh(profile: list[tuple[float, float]], fn: int) -> TriangleMesh:
+    angles = 2 * np.pi * np.arange(fn) / fn
+    rings = [
+        np.stack([r * np.cos(angles), r * np.sin(angles), np.full(fn, z)], axis=1)
+        for r, z in profile
+    ]
+    bottom = len(profile) * fn
+    vertices = np.concatenate(
+        rings + [[[0.0, 0.0, profile[0][1]], [0.0, 0.0, profile[-1][1]]]]
+    )
+
+    j = np.arange(fn)
+    k = (j + 1) % fn
+    faces = []
+    for ring in range(len(profile) - 1):
+        lower, upper = ring * fn, (ring + 1) * fn
+        faces.append(np.stack([lower + j, lower + k, upper + k], axis=1))
+        faces.append(np.stack([lower + j, upper + k, upper + j], axis=1))
+    top = (len(profile) - 1) * fn
+    faces.append(np.stack([np.full(fn, bottom), k, j], axis=1))
+    faces.append(np.stack([np.full(fn, bottom + 1), top + j, top + k], axis=1))
+    return vertices, np.concatenate(faces)
+
+
+# Box of the given size centered at center, like cube(size, center=true)
+def box_mesh(center: np.ndarray, size: np.ndarray) -> TriangleMesh:
+    bits = (np.arange(8)[:, np.newaxis] >> np.arange(3)) & 1
+    return center + (bits - 0.5) * size, BOX_FACES
+
+
+def transformed_mesh(
+    mesh: TriangleMesh, matrix: np.ndarray, translation: np.ndarray
+) -> TriangleMesh:
+    vertices, faces = mesh
+    return vertices @ matrix.T + translation, faces
+
+
+# Disjoint union of meshes, which may intersect each other
+def concatenated_mesh(meshes: list[TriangleMesh]) -> TriangleMesh:
+    offsets = np.cumsum([0] + [len(vertices) for vertices, _ in meshes[:-1]])
+    return (
+        np.concatenate([vertices for vertices, _ in meshes]),
+        np.concatenate([faces + offset for (_, faces), offset in zip(meshes, offsets)]),
+    )
+
+
+def convex_hull_mesh(points: np.ndarray) -> TriangleMesh:
+    import pymeshlab
+
+    ms = pymeshlab.MeshSet()
+    ms.add_mesh(pymeshlab.Mesh(vertex_matrix=points))
+    ms.generate_convex_hull()
+    mesh = ms.current_mesh()
+    return mesh.vertex_matrix(), mesh.face_matrix()
+
+
+# operation is "union", "difference" or "intersection"
+def mesh_boolean(
+    operation: str, first: TriangleMesh, second: TriangleMesh
+) -> TriangleMesh:
+    import pymeshlab
+
+    ms = pymeshlab.MeshSet()
+    ms.add_mesh(pymeshlab.Mesh(*first))
+    ms.add_mesh(pymeshlab.Mesh(*second))
+    getattr(ms, f"generate_boolean_{operation}")(first_mesh=0, second_mesh=1)
+    mesh = ms.current_mesh()
+    return mesh.vertex_matrix(), mesh.face_matrix()
+
+
+def save_binary_stl(path: str, mesh: TriangleMesh) -> None:
+    vertices, faces = mesh
+    triangles = vertices[faces].astype(np.float32)
+    normals = np.cross(
+        triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+    )
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = normals / np.where(lengths > 0, lengths, 1)
+
+    records = np.zeros(
+        len(faces),
+        dtype=[("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")],
+    )
+    records["normal"] = normals
+    records["vertices"] = triangles
+    with open(path, "wb") as f:
+        f.write(b"vertexprint native backend".ljust(80, b"\0"))
+        f.write(np.uint32(len(faces)).tobytes())
+        f.write(records.tobytes())
+
+
+# Builds tubular_vertex_holder from vertex_holders.scad without OpenSCAD:
+# tubes, bores, supports and the flat cutoff plane. Labels are not
+# engraved.
+class TubularHolderBuilder:
+    def __init__(self, options: GlobalOptions, fn: int = 60) -> None:
+        self.options: GlobalOptions = options
+        self.fn: int = fn
+        self.bore_radius: float = (
+            options.edge_diameter + options.diameter_tolerance_fit
+        ) / 2
+
+    # lowest_line_on_cylinder from vertex_holders.scad
+    def lowest_point(self, v: np.ndarray, length: float) -> np.ndarray:
+        uv = v / np.linalg.norm(v)
+        down = np.array([0.0, 0.0, -1.0])
+        proj = down - (down @ uv) * uv
+        radius = self.options.outer_tube_radius
+        if np.linalg.norm(proj) < 1e-9:
+            return uv * length + [radius, 0.0, 0.0]
+        return uv * length + radius * proj / np.linalg.norm(proj)
+
+    def cutoff_height(self, vecs: np.ndarray, offsets: np.ndarray) -> float:
+        return min(
+            self.lowest_point(v, length)[2]
+            for v, offset in zip(vecs, offsets)
+            for length in (offset, offset + self.options.tube_depth)
+        )
+
+    # Both cylinders of a tube share its axis and radius, so the tube is one
+    # cylinder spanning them
+    def tube_span(self, offset: float) -> tuple[float, float]:
+        return (
+            min(-offset, 0.0),
+            max(self.options.tube_depth, self.options.wall_thickness),
+        )
+
+    def tube(self, v: np.ndarray, offset: float) -> TriangleMesh:
+        radius = self.options.outer_tube_radius
+        z0, z1 = self.tube_span(offset)
+        mesh = revolved_mesh([(radius, z0), (radius, z1)], self.fn)
+        return transformed_mesh(mesh, direction_to_matrix(v), offset * v)
+
+    # The straight bore from the tube base outwards. vertex_holders.scad also
+    # cuts a bore tapered by diameter_taper_fit, but it is narrower than the
+    # straight one over its whole length, so it does not change the holder
+    def bore(self, v: np.ndarray, offset: float) -> TriangleMesh:
+        length = max(self.options.radius, self.options.tube_depth)
+        mesh = revolved_mesh(
+            [(self.bore_radius, 0.0), (self.bore_radius, length)], self.fn
+        )
+        return transformed_mesh(mesh, direction_to_matrix(v), offset * v)
+
+    # Hull of the outer half of the tube and two slivers on the cutoff plane
+    def support(self, v: np.ndarray, offset: float, cutoff: float) -> TriangleMesh:
+        options = self.options
+        radius = options.outer_tube_radius
+        rotation = direction_to_matrix(v)
+        top = offset + options.tube_depth
+        lowest_top_point = self.lowest_point(v, top)
+
+        base_inset = abs(lowest_top_point[2] - cutoff) / np.tan(
+            np.radians(options.min_printer_overhang_angle)
+        )
+        clamped_base_position = min(
+            max(top - base_inset, 0.0), np.linalg.norm(lowest_top_point[:2])
+        )
+        tube_top_to_cutoff_plane = -radius - lowest_top_point[2] + cutoff + top * v[2]
+
+        sliver, _ = box_mesh(np.zeros(3), np.array([0.1, radius, 0.1]))
+        sliver = sliver @ rotation.T + [0.0, 0.0, tube_top_to_cutoff_plane]
+        base = sliver + clamped_base_position * np.array([v[0], v[1], 0.0])
+
+        angles = 2 * np.pi * np.arange(self.fn) / self.fn
+        ring = radius * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        cut = self.bore_radius
+        chord = np.sqrt(max(radius**2 - cut**2, 0.0))
+        ring = np.concatenate([ring[ring[:, 0] > cut], [[cut, chord], [cut, -chord]]])
+        tube = np.concatenate(
+            [
+                np.column_stack([ring, np.full(len(ring), z)])
+                for z in self.tube_span(offset)
+            ]
         )
-        args.append(f"-Dvertex_figure_edges={vertex_figure_edges_str}")
-        return args
+        tube = tube @ rotation.T + offset * v
+
+        return convex_hull_mesh(np.concatenate([base, sliver, tube]))
+
+    def build(self, vecs: np.ndarray, offsets: np.ndarray) -> TriangleMesh:
+        vecs = np.asarray(vecs, dtype=float)
+        offsets = np.asarray(offsets, dtype=float)
+        cutoff = self.cutoff_height(vecs, offsets)
+        min_angle = np.radians(self.options.min_printer_overhang_angle)
+
+        parts = []
+        for v, offset in zip(vecs, offsets):
+            parts.append(self.tube(v, offset))
+            theta = np.arctan2(np.linalg.norm(v[:2]), v[2])
+            if theta > min_angle and self.options.tubular_supports:
+                parts.append(self.support(v, offset, cutoff))
+        holes = [self.bore(v, offset) for v, offset in zip(vecs, offsets)]
+        holes.append(box_mesh(np.array([0.0, 0.0, cutoff - 50]), np.full(3, 100.0)))
+
+        # Booleans resolve intersections within each operand too, so every
+        # part and every hole is merged in a single operation
+        solid = mesh_boolean("union", parts[0], concatenated_mesh(parts[1:]))
+        return mesh_boolean("difference", solid, concatenated_mesh(holes))
+
+
+# Renders jobs in this process with TubularHolderBuilder. Label jobs are not
+# supported.
+class NativeRenderer:
+    def __init__(self, options: GlobalOptions, fn: int = 60) -> None:
+        self.builder: TubularHolderBuilder = TubularHolderBuilder(options, fn)
+        self.renderer: str = "native"
+
+    def run(self, render_jobs: list[RenderJob]) -> list[RenderResult]:
+        results = []
+        for job in render_jobs:
+            with PROFILER.stage("render_job", os.path.basename(job.output)):
+                results.append(self.render(job))
+            results[-1].renderer = self.renderer
+        return results
+
+    def render(self, job: RenderJob) -> RenderResult:
+        start = time.perf_counter()
+        index = job.vertex_index
+        try:
+            mesh = self.builder.build(
+                job.openscad_args.vertex_figures[index],
+                job.openscad_args.offsets[index],
+            )
+            save_binary_stl(job.output, mesh)
+        except Exception as e:
+            return RenderResult(job, 1, 1, time.perf_counter() - start, repr(e))
+        return RenderResult(job, 0, 1, time.perf_counter() - start)
+
+
+# ┌───────────────────────────────────────────────────────────────────────────┐
+# │ Assembly preview                                                          │
+# └───────────────────────────────────────────────────────────────────────────┘
+
+
+PREVIEW_FN = 16
+PREVIEW_FORMATS = (".stl", ".ply")
+ROD_COLOR = "lightgray"
+
+
+# Matrix of OpenSCAD's rotate(angles * 180 / PI) for every row of angles:
+# about x, then y, then z
+def rotation_matrices(angles: np.ndarray) -> np.ndarray:
+    cx, cy, cz = np.cos(angles).T
+    sx, sy, sz = np.sin(angles).T
+    return np.stack(
+        [
+            cz * cy,
+            cz * sy * sx - sz * cx,
+            cz * sy * cx + sz * sx,
+            sz * cy,
+            sz * sy * sx + cz * cx,
+            sz * sy * cx - cz * sx,
+            -sy,
+            cy * sx,
+            cy * cx,
+        ],
+        axis=-1,
+    ).reshape(-1, 3, 3)
+
+
+# direction_to_matrix for every row of directions
+def direction_matrices(directions: np.ndarray) -> np.ndarray:
+    theta = np.arctan2(np.linalg.norm(directions[:, :2], axis=1), directions[:, 2])
+    phi = np.arctan2(directions[:, 1], directions[:, 0])
+    return rotation_matrices(np.stack([np.zeros(len(directions)), theta, phi], axis=1))
+
+
+# One copy of mesh per row of matrices and translations, as a single mesh
+def instanced_mesh(
+    mesh: TriangleMesh, matrices: np.ndarray, translations: np.ndarray
+) -> TriangleMesh:
+    vertices, faces = mesh
+    placed = np.einsum("nij,vj->nvi", matrices, vertices) + translations[:, None]
+    starts = len(vertices) * np.arange(len(matrices))
+    return placed.reshape(-1, 3), (faces + starts[:, None, None]).reshape(-1, 3)
+
+
+# The assembly solid() in interface.scad shows, built directly from the
+# Polyhedron: a cylinder per rod and the tubes of every holder, placed with
+# its vertex figure's euler angles. Parts overlap instead of being unioned,
+# and bores, supports and labels are left out. Holders are colored by tag
+# like in OpenSCAD; colors are only written to PLY files.
+class AssemblyPreview:
+    def __init__(
+        self, polyhedron: Polyhedron, options: GlobalOptions, fn: int = PREVIEW_FN
+    ) -> None:
+        vertices = np.asarray(polyhedron.vertices, dtype=float)
+        scale = options.radius / np.max(np.linalg.norm(vertices, axis=1))
+        positions = scale * vertices
+        cylinder = revolved_mesh([(1.0, 0.0), (1.0, 1.0)], fn)
+
+        start, end = positions[polyhedron.edges.endpoints.T]
+        lengths = np.linalg.norm(end - start, axis=1)
+        radius = options.edge_diameter / 2
+        rods = instanced_mesh(
+            cylinder,
+            direction_matrices(end - start)
+            * np.stack([np.full(len(lengths), radius)] * 2 + [lengths], axis=1)[
+                :, None
+            ],
+            start,
+        )
+
+        args = OpenscadArgs(polyhedron, options)
+        owners = np.repeat(
+            np.arange(len(vertices)), [len(vf) for vf in args.vertex_figures]
+        )
+        directions = np.concatenate([np.asarray(vf) for vf in args.vertex_figures])
+        offsets = np.concatenate([np.asarray(o, dtype=float) for o in args.offsets])
+        # tube_span of TubularHolderBuilder
+        bottoms = np.minimum(-offsets, 0.0)
+        top = max(options.tube_depth, options.wall_thickness)
+        eulers = rotation_matrices(np.asarray(args.eulers, dtype=float))[owners]
+        tube_radius = options.outer_tube_radius
+        tubes = instanced_mesh(
+            cylinder,
+            eulers
+            @ direction_matrices(directions)
+            * np.stack(
+                [np.full(len(offsets), tube_radius)] * 2 + [top - bottoms], axis=1
+            )[:, None],
+            np.einsum("nij,nj->ni", eulers, (offsets + bottoms)[:, None] * directions)
+            + positions[owners],
+        )
+
+        self.mesh: TriangleMesh = concatenated_mesh([rods, tubes])
+        # Index into colors of each vertex of mesh: tag modulo the holder
+        # colors, and the last color for rods
+        self.colors: list[str] = options.colors + [ROD_COLOR]
+        per_cylinder = len(cylinder[0])
+        self.color_indices: np.ndarray = np.concatenate(
+            [
+                np.full(len(lengths) * per_cylinder, len(options.colors)),
+                np.repeat(
+                    np.asarray(args.tags)[owners] % len(options.colors), per_cylinder
+                ),
+            ]
+        )
+
+    def vertex_colors(self) -> np.ndarray:
+        from matplotlib.colors import to_rgb
+
+        palette = np.round(255 * np.array([to_rgb(c) for c in self.colors]))
+        return palette.astype(np.uint8)[self.color_indices]
+
+    def save(self, path: str) -> None:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".stl":
+            save_binary_stl(path, self.mesh)
+        elif extension == ".ply":
+            save_binary_ply(path, self.mesh, self.vertex_colors())
+        else:
+            raise ValueError(
+                f"Unsupported preview format: {extension}. "
+                f"Use {' or '.join(PREVIEW_FORMATS)}"
+            )
+
+
+def save_binary_ply(path: str, mesh: TriangleMesh, colors: np.ndarray) -> None:
+    vertices, faces = mesh
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        f"element vertex {len(vertices)}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        "property uchar red\n"
+        "property uchar green\n"
+        "property uchar blue\n"
+        f"element face {len(faces)}\n"
+        "property list uchar int vertex_indices\n"
+        "end_header\n"
+    )
+    vertex_records = np.zeros(
+        len(vertices), dtype=[("position", "<f4", (3,)), ("color", "u1", (3,))]
+    )
+    vertex_records["position"] = vertices
+    vertex_records["color"] = colors
+    face_records = np.zeros(
+        len(faces), dtype=[("count", "u1"), ("indices", "<i4", (3,))]
+    )
+    face_records["count"] = 3
+    face_records["indices"] = faces
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        f.write(vertex_records.tobytes())
+        f.write(face_records.tobytes())
 
 
 # ┌───────────────────────────────────────────────────────────────────────────┐
@@ -538,6 +3017,8 @@ class OpenscadArgs:
 
 # Parse STL files into Polyhedron objects
 def parse_stl(filepath: str, options: GlobalOptions) -> Polyhedron:
+    import stl_reader
+
     vertices_arr, indices = stl_reader.read(filepath)
 
     return Polyhedron(
@@ -548,47 +3029,190 @@ def parse_stl(filepath: str, options: GlobalOptions) -> Polyhedron:
     )
 
 
-# Parse OBJ files into Polyhedron objects
-def parse_obj(filepath: str, options: GlobalOptions) -> Polyhedron:
-    """Parse an OBJ file and return a Polyhedron object."""
-    vertices = []
-    faces = []
+# Files at least this large are memory-mapped by read_obj
+OBJ_MMAP_THRESHOLD = 1 << 28
 
-    with open(filepath, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
 
-            parts = line.split()
-            if not parts:
-                continue
+# Vertices and ragged faces of an OBJ file. Face i has the 0-based vertex
+# indices face_indices[face_offsets[i]:face_offsets[i + 1]].
+class ObjMesh:
+    def __init__(
+        self, vertices: np.ndarray, face_offsets: np.ndarray, face_indices: np.ndarray
+    ) -> None:
+        self.vertices: np.ndarray = vertices
+        self.face_offsets: np.ndarray = face_offsets
+        self.face_indices: np.ndarray = face_indices
+
+    def __len__(self) -> int:
+        return len(self.face_offsets) - 1
+
+    def faces(self) -> list[list[int]]:
+        indices = self.face_indices.tolist()
+        bounds = self.face_offsets.tolist()
+        return [indices[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+# Yield chunks of about chunk_size bytes that end on line boundaries. With
+# memory_map, chunks are zero-copy views of the mapped file.
+def obj_chunks(f, chunk_size: int, memory_map: bool):
+    if memory_map:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        # Unmapped once the last view is garbage collected
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        start = 0
+        while start < size:
+            end = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end == -1 else end + 1
+            yield view[start:end]
+            start = end
+        return
+
+    rest = b""
+    while chunk := f.read(chunk_size):
+        chunk = rest + chunk
+        end = chunk.rfind(b"\n") + 1
+        rest = chunk[end:]
+        if end:
+            yield chunk[:end]
+    if rest:
+        yield rest
+
+
+# The lines of data selected by mask, with their keywords blanked out, and
+# the number of whitespace separated fields on each. indents is the offset of
+# each line's keyword from the line start.
+def obj_fields(
+    data: np.ndarray,
+    line_starts: np.ndarray,
+    line_lengths: np.ndarray,
+    indents: np.ndarray,
+    mask,
+) -> tuple[np.ndarray, np.ndarray]:
+    text = data[np.repeat(mask, line_lengths)]
+    starts = np.concatenate([[0], np.cumsum(line_lengths[mask])[:-1]])
+    if not len(text):
+        return text, np.empty(0, dtype=np.int64)
+    text[starts + indents[mask]] = ord(" ")
+
+    # Drop the texture and normal references of v/vt/vn tokens: every byte
+    # from a token's first slash up to the next whitespace
+    space = text <= ord(" ")
+    slash = text == ord("/")
+    if slash.any():
+        slashes = np.cumsum(slash, dtype=np.int32)
+        before_token = np.maximum.accumulate(np.where(space, slashes, 0))
+        text[(slashes > before_token) & ~space] = ord(" ")
+
+    token_start = ~space
+    token_start[1:] &= space[:-1]
+    tokens = np.flatnonzero(token_start)
+    return text, np.diff(np.searchsorted(tokens, starts), append=len(tokens))
+
+
+# Bytes that may indent an OBJ line
+OBJ_BLANKS = np.frombuffer(b" \t\r", dtype=np.uint8)
+
+
+# Parse the v and f lines of one chunk. Lines are classified and gathered
+# with numpy, and numbers are parsed by np.fromstring.
+def parse_obj_chunk(
+    chunk, vertex_count: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    line_starts = np.concatenate([[0], np.flatnonzero(data[:-1] == ord("\n")) + 1])
+    line_lengths = np.diff(line_starts, append=len(data))
+
+    # Lines may be indented, so each is classified by its first byte that is
+    # not a blank. The newline ending a line counts as not blank, so blank
+    # lines find it and are not mistaken for the next line. Only indented
+    # lines are searched, since most files have none.
+    keywords = line_starts.copy()
+    indented = np.flatnonzero(np.isin(data[line_starts], OBJ_BLANKS))
+    if len(indented):
+        not_blank = np.append(np.flatnonzero(~np.isin(data, OBJ_BLANKS)), len(data))
+        keywords[indented] = not_blank[
+            np.searchsorted(not_blank, line_starts[indented])
+        ]
+    indents = keywords - line_starts
+    padded = np.append(data, np.uint8(ord("\n")))
+    second = padded[np.minimum(keywords + 1, len(data))]
+    separated = (indents + 1 < line_lengths) & (
+        (second == ord(" ")) | (second == ord("\t"))
+    )
+    is_vertex = (padded[keywords] == ord("v")) & separated
+    is_face = (padded[keywords] == ord("f")) & separated
+
+    text, counts = obj_fields(data, line_starts, line_lengths, indents, is_vertex)
+    values = np.fromstring(text.tobytes(), sep=" ")
+    if len(values) != counts.sum() or np.any(counts < 3):
+        raise ValueError("Malformed OBJ vertex line")
+    if np.all(counts == 3):
+        vertices = values.reshape(-1, 3)
+    else:
+        first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        vertices = values[first[:, np.newaxis] + np.arange(3)]
+
+    text, sizes = obj_fields(data, line_starts, line_lengths, indents, is_face)
+    indices = np.fromstring(text.tobytes(), dtype=np.int64, sep=" ")
+    if len(indices) != sizes.sum():
+        raise ValueError("Malformed OBJ face line")
+
+    # Positive indices are 1-based; negative ones count back from the last
+    # vertex defined before their line
+    vertices_before = vertex_count + np.cumsum(is_vertex)[is_face]
+    base = np.repeat(vertices_before, sizes)
+    indices = np.where(indices < 0, indices + base, indices - 1)
+    return vertices, sizes, indices
+
+
+# Read an OBJ file in bulk chunks. Files of at least OBJ_MMAP_THRESHOLD bytes
+# are memory-mapped unless memory_map says otherwise.
+def read_obj(
+    filepath: str, chunk_size: int = 1 << 24, memory_map: Optional[bool] = None
+) -> ObjMesh:
+    if memory_map is None:
+        memory_map = os.path.getsize(filepath) >= OBJ_MMAP_THRESHOLD
+    vertex_parts, size_parts, index_parts = [], [], []
+    vertex_count = 0
+    with open(filepath, "rb") as f:
+        for chunk in obj_chunks(f, chunk_size, memory_map):
+            vertices, sizes, indices = parse_obj_chunk(chunk, vertex_count)
+            vertex_count += len(vertices)
+            vertex_parts.append(vertices)
+            size_parts.append(sizes)
+            index_parts.append(indices)
+
+    vertices = np.concatenate(vertex_parts or [np.empty((0, 3))])
+    sizes = np.concatenate(size_parts or [np.empty(0, dtype=np.int64)])
+    face_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+    face_indices = np.concatenate(index_parts or [np.empty(0, dtype=np.int64)])
+    return ObjMesh(vertices, face_offsets, face_indices)
 
-            if parts[0] == "v":
-                vertex = [float(x) for x in parts[1:4]]
-                vertices.append(vertex)
-            elif parts[0] == "f":
-                # OBJ uses 1-based indexing, we convert to 0-based
-                face = []
-                for vert_def in parts[1:]:
-                    indices = vert_def.split("/")[0]
-                    face.append(int(indices) - 1)
-                faces.append(face)
-                print(face)
-    if not vertices:
+
+# Parse OBJ files into Polyhedron objects
+def parse_obj(
+    filepath: str, options: GlobalOptions, memory_map: Optional[bool] = None
+) -> Polyhedron:
+    """Parse an OBJ file and return a Polyhedron object."""
+    mesh = read_obj(filepath, memory_map=memory_map)
+    if not len(mesh.vertices):
         raise ValueError(f"No vertices found in OBJ file: {filepath}")
 
     return Polyhedron(
         name=os.path.basename(filepath).replace(".obj", ""),
-        vertices=np.array(vertices, dtype=float),
-        faces=faces,
+        vertices=mesh.vertices,
+        faces=mesh.faces(),
         options=options,
     )
 
 
 def save_histogram(polyhedron: Polyhedron, output_dir: str):
-    offset_lengths = [data["offset_length"] for data in polyhedron.edges.values()]
-    offset_lengths.sort()
+    import matplotlib.pyplot as plt
+
+    offset_lengths = polyhedron.edges.by_offset_length()["offset_length"]
 
     plt.figure(figsize=(24, 12))
     plt.bar(range(len(polyhedron.edges)), offset_lengths, edgecolor="black")
@@ -599,20 +3223,88 @@ def save_histogram(polyhedron: Polyhedron, output_dir: str):
     plt.tight_layout()
     plt.savefig(f"{output_dir}/histogram.png")
     plt.close()
+    return [f"{output_dir}/histogram.png"]
+
+
+def save_lengths(polyhedron: Polyhedron, output_dir: str):
+    path = f"{output_dir}/lengths.csv"
+    edges = polyhedron.edges.by_offset_length()
+    with open(path, "w") as f:
+        for name, offset_length in zip(
+            edges["name"].tolist(), edges["offset_length"].tolist()
+        ):
+            f.write(f"{name},{offset_length:.6f}\n")
+    return [path]
+
+
+def save_vertices(polyhedron: Polyhedron, output_dir: str):
+    path = f"{output_dir}/vertices.csv"
+    with open(path, "w") as f:
+        for vf in polyhedron.vertex_figures:
+            index = vf.vertex_index
+            degree = len(vf.neighbors)
+            edge_names = ",".join(str(e) for e in vf.edges)
+            f.write(f"{index},{degree},{edge_names}\n")
+    return [path]
+
+
+def vertex_holder_job(openscad_args, output_dir, vertex_index) -> RenderJob:
+    return RenderJob(
+        openscad_args, vertex_index, f"{output_dir}/v{vertex_index:03}.stl"
+    )
 
 
-def call_openscad_for_vertex(polyhedron, options, output_dir, vertex_index):
-    vertex_options = copy.deepcopy(options)
-    vertex_options.object_type = ObjectType.VERTEX_HOLDER
-    vertex_options.index = vertex_index
-    openscad_args = OpenscadArgs(polyhedron, vertex_options)
-    command = (
-        ["openscad"]
-        + openscad_args.to_openscad_args()
-        + ["-o", f"{output_dir}/v{vertex_index:03}.stl", "scad/interface.scad"]
+# Render the unlabeled holder of a class of congruent vertices. openscad_args
+# must have labels disabled.
+def class_holder_job(openscad_args, output_dir, holder_class) -> RenderJob:
+    return RenderJob(
+        openscad_args,
+        holder_class.representative,
+        f"{output_dir}/{holder_class.filename}",
+    )
+
+
+# Cut the labels of one vertex into the holder rendered for its class.
+# openscad_args must have object type LABELED_HOLDER.
+def labeled_holder_job(
+    openscad_args, output_dir, holder_class, vertex_index
+) -> RenderJob:
+    alignment = np.eye(4)
+    alignment[:3, :3] = holder_class.alignments[vertex_index]
+    alignment_str = (
+        "[" + ",".join(f"[{','.join(str(v) for v in row)}]" for row in alignment) + "]"
+    )
+    tag_file = os.path.abspath(f"{output_dir}/{holder_class.filename}")
+    return RenderJob(
+        openscad_args,
+        vertex_index,
+        f"{output_dir}/v{vertex_index:03}.stl",
+        [("TAG_FILE", f'"{tag_file}"'), ("ALIGNMENT", alignment_str)],
+        [tag_file],
     )
-    if not options.dry_run:
-        subprocess.run(command)
+
+
+# Record which class file holds the geometry of each vertex. Mirrored vertices
+# need a mirrored copy of the class file.
+def save_manifest(classes: list[HolderClass], output_dir: str):
+    rows = []
+    for holder_class in classes:
+        for vertex_index in holder_class.members:
+            rows.append(
+                (
+                    vertex_index,
+                    holder_class.tag,
+                    holder_class.filename,
+                    len(holder_class.members),
+                    holder_class.mirrored(vertex_index),
+                )
+            )
+    path = f"{output_dir}/manifest.csv"
+    with open(path, "w") as f:
+        f.write("vertex,tag,file,count,mirrored\n")
+        for vertex_index, tag, filename, count, mirrored in sorted(rows):
+            f.write(f"{vertex_index},{tag},{filename},{count},{str(mirrored).lower()}\n")
+    return [path]
 
 
 # Chunk a list into parts of size n (last part has size len(lst) % n)
@@ -622,30 +3314,34 @@ def chunks(lst, n):
 
 
 def save_svg(polyhedron: Polyhedron, output_dir: str):
-    edges = sorted(polyhedron.edges.items(), key=lambda x: x[1]["offset_length"])
+    import cairo
+
+    offset_lengths = polyhedron.edges.by_offset_length()["offset_length"].tolist()
     diameter = polyhedron.options.edge_diameter
     height = polyhedron.options.rod_stock_length
 
     rods_per_cut = (
-        len(edges)
+        len(offset_lengths)
         if polyhedron.options.rods_per_cut == 0
         else polyhedron.options.rods_per_cut
     )
 
-    for i, edges_chunk in enumerate(chunks(edges, rods_per_cut)):
-        width = diameter * len(edges_chunk)
+    paths = []
+    for i, lengths_chunk in enumerate(chunks(offset_lengths, rods_per_cut)):
+        width = diameter * len(lengths_chunk)
         scaled_diameter = diameter / width
-        surface = cairo.SVGSurface(f"{output_dir}/lasercut{i:03}.svg", width, height)
+        paths.append(f"{output_dir}/lasercut{i:03}.svg")
+        surface = cairo.SVGSurface(paths[-1], width, height)
         surface.set_document_unit(cairo.SVGUnit.MM)
         context = cairo.Context(surface)
         context.scale(width, height)
 
-        scaled_zero_height = 1 - edges_chunk[0][1]["offset_length"] / height
+        scaled_zero_height = 1 - lengths_chunk[0] / height
         context.move_to(0, scaled_zero_height)
         context.line_to(scaled_diameter, scaled_zero_height)
 
-        for i, (edge, data) in enumerate(edges_chunk[1:], start=1):
-            scaled_height = 1 - data["offset_length"] / height
+        for i, offset_length in enumerate(lengths_chunk[1:], start=1):
+            scaled_height = 1 - offset_length / height
             context.line_to(scaled_diameter * i, scaled_height)
             context.line_to(scaled_diameter * (i + 1), scaled_height)
         context.line_to(1, 1)
@@ -653,6 +3349,152 @@ def save_svg(polyhedron: Polyhedron, output_dir: str):
         context.fill_preserve()
         surface.finish()
         surface.flush()
+    return paths
+
+
+# Run render jobs, skipping those whose output is up to date in the build
+# manifest or already in the render cache. Successful new renders are stored
+# in the cache and recorded in the build manifest. With labels, the labels of
+# the jobs that do run are rendered into the label cache first; their renders
+# are returned too.
+def render_all(
+    scheduler: Union[RenderScheduler, NativeRenderer],
+    render_jobs: list[RenderJob],
+    cache: Optional[RenderCache] = None,
+    kind: str = "vertex_holder",
+    outputs: Optional[BuildManifest] = None,
+    labels: Optional[LabelCache] = None,
+) -> list[RenderResult]:
+    with PROFILER.stage("render", kind):
+        fingerprints = {}
+        if outputs is not None:
+            stale = []
+            for job in render_jobs:
+                name = os.path.relpath(job.output, outputs.output_dir)
+                fingerprints[name] = outputs.job_fingerprint(job, kind)
+                if outputs.up_to_date(name, fingerprints[name]):
+                    outputs.skipped += 1
+                else:
+                    outputs.clear(name)
+                    stale.append(job)
+            render_jobs = stale
+
+        # Outputs restored from the cache are hard links to its entries, and
+        # renderers write their output in place, so remove the old output
+        # first rather than overwrite an entry through the link
+        for job in render_jobs:
+            if os.path.lexists(job.output):
+                os.remove(job.output)
+
+        # Renderers of the outputs restored from the cache, None where unknown
+        fetched = {}
+        label_results = []
+        if cache is None:
+            if labels is not None and render_jobs:
+                label_results = labels.attach(scheduler, render_jobs)
+            results = scheduler.run(render_jobs)
+        else:
+            keys = [
+                cache.key(job.openscad_args, job.vertex_index, kind)
+                for job in render_jobs
+            ]
+            pending = []
+            for job, key in zip(render_jobs, keys):
+                if cache.fetch(key, job.output):
+                    fetched[job.output] = cache.renderer(key)
+                else:
+                    pending.append((job, key))
+            if labels is not None and pending:
+                label_results = labels.attach(scheduler, [job for job, _ in pending])
+            results = scheduler.run([job for job, _ in pending])
+            for (job, key), result in zip(pending, results):
+                if result.ok:
+                    cache.store(key, job.output, scheduler.renderer)
+
+        if outputs is not None:
+            failed = {result.job.output for result in results if not result.ok}
+            for job in render_jobs:
+                if job.output not in failed and os.path.exists(job.output):
+                    name = os.path.relpath(job.output, outputs.output_dir)
+                    cached = job.output in fetched
+                    outputs.record(
+                        name,
+                        fingerprints[name],
+                        [job.output],
+                        fetched[job.output] if cached else scheduler.renderer,
+                        cached,
+                    )
+    return label_results + results
+
+
+# Renderer of the holders for options: in-process with the native backend,
+# otherwise OpenSCAD with the engine options.openscad_engine resolved to
+def holder_renderer(options: GlobalOptions) -> Union[RenderScheduler, NativeRenderer]:
+    if options.backend == RenderBackend.NATIVE:
+        return NativeRenderer(options, holder_fn(options))
+    features = openscad_features()
+    return RenderScheduler(
+        options.jobs,
+        options.render_timeout,
+        options.render_retries,
+        features.flags(options.openscad_engine) + options.openscad_flags,
+        features.describe(options.openscad_engine),
+    )
+
+
+# Render the holders of polyhedron into holder_dir: one per vertex, or, given
+# the congruence classes of per_tag render mode, one per class and a labeled
+# copy of it for each vertex
+def render_holders(
+    polyhedron: Polyhedron,
+    options: GlobalOptions,
+    holder_dir: str,
+    scheduler: Union[RenderScheduler, NativeRenderer],
+    cache: Optional[RenderCache],
+    outputs: BuildManifest,
+    labels: Optional[LabelCache] = None,
+    classes: Optional[list[HolderClass]] = None,
+) -> list[RenderResult]:
+    vertex_options = copy.deepcopy(options)
+    vertex_options.object_type = ObjectType.VERTEX_HOLDER
+    results = []
+    if classes is None:
+        openscad_args = OpenscadArgs(polyhedron, vertex_options)
+        render_jobs = [
+            vertex_holder_job(openscad_args, holder_dir, i)
+            for i in range(len(polyhedron.vertices))
+        ]
+        if not options.dry_run:
+            results += render_all(
+                scheduler, render_jobs, cache, outputs=outputs, labels=labels
+            )
+        return results
+
+    vertex_options.label_vertices = False
+    class_args = OpenscadArgs(polyhedron, vertex_options)
+    render_jobs = [class_holder_job(class_args, holder_dir, c) for c in classes]
+    if not options.dry_run:
+        results += render_all(scheduler, render_jobs, cache, outputs=outputs)
+
+    # Conical holders and native renders carry no labels
+    if (
+        options.label_vertices
+        and options.vertex_type == VertexType.TUBULAR
+        and options.backend == RenderBackend.OPENSCAD
+    ):
+        label_options = copy.deepcopy(options)
+        label_options.object_type = ObjectType.LABELED_HOLDER
+        label_args = OpenscadArgs(polyhedron, label_options)
+        render_jobs = [
+            labeled_holder_job(label_args, holder_dir, c, i)
+            for c in classes
+            for i in c.members
+        ]
+        if not options.dry_run:
+            results += render_all(
+                scheduler, render_jobs, cache, "labeled_holder", outputs, labels
+            )
+    return results
 
 
 def call_openscad(
@@ -665,27 +3507,115 @@ def call_openscad(
     if generate_outputs:
         start_time = time.time()
         os.makedirs(output_dir, exist_ok=True)
-        with open(f"{output_dir}/lengths.csv", "w") as f:
-            for edge, data in sorted(
-                polyhedron.edges.items(), key=lambda x: x[1]["offset_length"]
-            ):
-                f.write(f"{data['name']},{data['offset_length']:.6f}\n")
+        outputs = BuildManifest(output_dir, options.force)
+        mesh = mesh_digest(polyhedron)
+        derived = option_fields(options, COMPILED_OPTION_FIELDS)
+        outputs.build(
+            "vertices.csv",
+            outputs.fingerprint(mesh, derived),
+            lambda: save_vertices(polyhedron, output_dir),
+        )
+        outputs.build(
+            "lengths.csv",
+            outputs.fingerprint(mesh, derived),
+            lambda: save_lengths(polyhedron, output_dir),
+        )
+        outputs.build(
+            "histogram.png",
+            outputs.fingerprint(mesh, derived),
+            lambda: save_histogram(polyhedron, output_dir),
+        )
+        outputs.build(
+            "lasercut",
+            outputs.fingerprint(mesh, derived, option_fields(options, SVG_FIELDS)),
+            lambda: save_svg(polyhedron, output_dir),
+        )
 
-        with open(f"{output_dir}/vertices.csv", "w") as f:
-            for vf in polyhedron.vertex_figures:
-                index = vf.vertex_index
-                degree = len(vf.neighbors)
-                edge_names = ",".join(str(e) for e in vf.edges)
-                f.write(f"{index},{degree},{edge_names}\n")
+        cache = None
+        if options.cache_dir is not None and not options.dry_run:
+            cache = RenderCache(options.cache_dir, options.cache_max_bytes)
+        if options.backend == RenderBackend.NATIVE:
+            if options.vertex_type != VertexType.TUBULAR:
+                raise ValueError(
+                    "The native backend only builds tubular vertex holders"
+                )
+            if options.label_vertices:
+                print("The native backend does not engrave labels")
+        else:
+            if (
+                options.scad_codegen == ScadCodegen.FLAT
+                and options.vertex_type != VertexType.TUBULAR
+            ):
+                raise ValueError("Flat SCAD codegen only builds tubular vertex holders")
+            # Resolve auto so that cache keys and build.json name the engine
+            # that actually renders
+            options = copy.deepcopy(options)
+            options.openscad_engine = openscad_features().resolve(
+                options.openscad_engine
+            )
 
-        save_histogram(polyhedron, output_dir)
-        save_svg(polyhedron, output_dir)
+        classes = None
+        if options.render_mode == RenderMode.PER_TAG:
+            with PROFILER.stage("holder_classes"):
+                classes = polyhedron.holder_classes()
+            outputs.build(
+                "manifest.csv",
+                outputs.fingerprint(mesh, derived),
+                lambda: save_manifest(classes, output_dir),
+            )
+            print(
+                f"{len(classes)} distinct vertex holders for "
+                f"{len(polyhedron.vertices)} vertices"
+            )
 
-        call_with_args = partial(
-            call_openscad_for_vertex, polyhedron, options, output_dir
-        )
-        with ProcessPoolExecutor() as executor:
-            list(executor.map(call_with_args, range(len(polyhedron.vertices))))
+        # With --draft, every holder is first rendered coarsely into draft/,
+        # and the final pass only runs if all of them render
+        passes = [(options, output_dir, False)]
+        if options.draft:
+            draft_options = copy.deepcopy(options)
+            draft_options.chordal_error = DRAFT_CHORDAL_ERROR
+            passes.insert(0, (draft_options, os.path.join(output_dir, "draft"), True))
+        results = []
+        for pass_options, holder_dir, draft in passes:
+            os.makedirs(holder_dir, exist_ok=True)
+            labels = None
+            if (
+                options.label_cache
+                and options.label_vertices
+                and options.vertex_type == VertexType.TUBULAR
+                and options.backend == RenderBackend.OPENSCAD
+            ):
+                labels = LabelCache(options.cache_dir or output_dir, pass_options)
+            pass_results = render_holders(
+                polyhedron,
+                pass_options,
+                holder_dir,
+                holder_renderer(pass_options),
+                cache,
+                outputs,
+                labels,
+                classes,
+            )
+            results += pass_results
+            if labels is not None:
+                print(labels.summary())
+            if draft:
+                failed = sum(not result.ok for result in pass_results)
+                print(
+                    f"draft: {len(pass_results)} renders at $fn="
+                    f"{holder_fn(pass_options)} in {holder_dir}, {failed} failed"
+                )
+                if failed:
+                    print("Skipping the final pass")
+                    break
+
+        outputs.save()
+        print(outputs.summary())
+        if cache is not None:
+            cache.evict()
+            print(cache.summary())
+        if results:
+            print_render_summary(results)
         time_delta = time.time() - start_time
         print(
             f"{len(polyhedron.vertices)} vertices generated in {time_delta:.2f} seconds"
@@ -693,8 +3623,13 @@ def call_openscad(
 
     else:
         openscad_args = OpenscadArgs(polyhedron, options)
+        features = openscad_features()
         command = (
-            ["openscad"] + openscad_args.to_openscad_args() + ["scad/interface.scad"]
+            ["openscad"]
+            + features.flags(features.resolve(options.openscad_engine))
+            + options.openscad_flags
+            + openscad_args.to_openscad_args()
+            + ["scad/interface.scad"]
         )
         if not options.dry_run:
             subprocess.run(command)
@@ -795,6 +3730,136 @@ def main():
         action="store_true",
         help="Don't produce stl outputs",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of OpenSCAD renders to run at once (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--render-timeout",
+        type=float,
+        help="Kill an OpenSCAD render after this many seconds",
+    )
+    parser.add_argument(
+        "--render-retries",
+        type=int,
+        help="Retry a failed or timed out render up to this many times",
+    )
+    parser.add_argument(
+        "--no-payload-files",
+        action="store_true",
+        help="Pass the whole mesh to every OpenSCAD render with -D flags instead of "
+        "writing only the rendered holder's data to a generated file",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Reuse vertex holders rendered in earlier runs from this directory",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=float,
+        help="Evict least recently used renders once the cache exceeds this many MB "
+        "(default 1024)",
+    )
+    parser.add_argument(
+        "--render-mode",
+        choices=["per_vertex", "per_tag"],
+        help="per_vertex renders one holder per vertex. "
+        "per_tag renders one unlabeled holder per class of congruent vertices and "
+        "writes manifest.csv; with --label-vertices, each vertex's labels are then "
+        "cut into a copy of its class holder",
+    )
+
+    parser.add_argument(
+        "--backend",
+        choices=["openscad", "native"],
+        help="openscad (default) renders holders with OpenSCAD. native builds tubular "
+        "holders in-process without labels, for fast draft iterations",
+    )
+    parser.add_argument(
+        "--scad-codegen",
+        choices=["interface", "flat"],
+        help="interface (default) has OpenSCAD evaluate interface.scad for every "
+        "holder. flat computes the placement of every tube in Python and writes "
+        "each tubular holder as literal transforms and primitives, so that "
+        "OpenSCAD only does the CSG",
+    )
+    parser.add_argument(
+        "--openscad-engine",
+        choices=["auto", "cgal", "manifold"],
+        help="Geometry engine OpenSCAD renders with. auto (default) uses Manifold "
+        "if the installed openscad supports it, and CGAL otherwise",
+    )
+    parser.add_argument(
+        "--openscad-flag",
+        action="append",
+        dest="openscad_flags",
+        metavar="FLAG",
+        help="Pass FLAG to every openscad render, e.g. "
+        "--openscad-flag=--enable=lazy-union. May be repeated",
+    )
+    parser.add_argument(
+        "--chordal-error",
+        type=float,
+        metavar="MM",
+        help="Tessellate holders so that no facet strays more than MM from the "
+        "round tube surface, instead of with a fixed $fn of 60",
+    )
+    parser.add_argument(
+        "--draft",
+        action="store_true",
+        help="Render every holder coarsely into draft/ in the output directory "
+        "first, then at full resolution only if all draft renders succeed",
+    )
+    parser.add_argument(
+        "--label-cache",
+        action="store_true",
+        help="With --label-vertices, render each distinct label once into "
+        "labels/ under --cache-dir (or the output directory) and import it into "
+        "every holder that engraves it, instead of building text in each render",
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every output, even those build.json in the output directory "
+        "records as up to date",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile.json",
+        metavar="JSON",
+        help="Record wall time, CPU time and peak RSS of each pipeline stage, write "
+        "them to JSON (default profile.json) and print a summary table",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also trace Python allocations with tracemalloc. "
+        "Slows down Python-heavy stages",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="append",
+        metavar="STAGE",
+        help="With --profile, run cProfile around this stage (e.g. "
+        "annotate_vertex_figures) and write STAGE.prof next to the JSON report. "
+        "May be repeated",
+    )
+    parser.add_argument(
+        "--preview",
+        metavar="PATH",
+        help="Write the assembled rods and holder tubes to PATH (.stl, or .ply with "
+        "holders colored by tag) without OpenSCAD and exit",
+    )
+    parser.add_argument(
+        "--compile",
+        metavar="PATH",
+        help="Save the mesh and everything derived from it to PATH (.npz) and exit. "
+        "Later runs given PATH as --file skip parsing and analysis",
+    )
 
     args = parser.parse_args()
     options_dict = {
@@ -817,6 +3882,23 @@ def main():
         "label_vertices": args.label_vertices,
         "tubular_supports": not args.no_tubular_supports,
         "dry_run": args.dry_run,
+        "render_mode": args.render_mode,
+        "payload_files": not args.no_payload_files,
+        "jobs": args.jobs,
+        "render_timeout": args.render_timeout,
+        "render_retries": args.render_retries,
+        "backend": args.backend,
+        "scad_codegen": args.scad_codegen,
+        "label_cache": args.label_cache,
+        "openscad_engine": args.openscad_engine,
+        "openscad_flags": args.openscad_flags,
+        "chordal_error": args.chordal_error,
+        "draft": args.draft,
+        "force": args.force,
+        "cache_dir": args.cache_dir,
+        "cache_max_bytes": (
+            int(args.cache_max_size * 1e6) if args.cache_max_size is not None else None
+        ),
     }
     options_dict = {k: v for k, v in options_dict.items() if v is not None}
     if "vertex_type" in options_dict:
@@ -825,18 +3907,64 @@ def main():
         options_dict["offset_type"] = OffsetType(options_dict["offset_type"])
     if "object_type" in options_dict:
         options_dict["object_type"] = ObjectType(options_dict["object_type"])
+    if "render_mode" in options_dict:
+        options_dict["render_mode"] = RenderMode(options_dict["render_mode"])
+    if "backend" in options_dict:
+        options_dict["backend"] = RenderBackend(options_dict["backend"])
+    if "scad_codegen" in options_dict:
+        options_dict["scad_codegen"] = ScadCodegen(options_dict["scad_codegen"])
+    if "openscad_engine" in options_dict:
+        options_dict["openscad_engine"] = OpenscadEngine(
+            options_dict["openscad_engine"]
+        )
     options = GlobalOptions(**options_dict)
 
     file_ext = os.path.splitext(args.file)[1].lower()
-    if file_ext == ".stl":
-        polyhedron = parse_stl(args.file, options)
-    elif file_ext == ".obj":
-        polyhedron = parse_obj(args.file, options)
-    else:
-        raise ValueError(f"Unsupported file format: {file_ext}. Use .stl or .obj")
+    if file_ext == ".npz" and args.isotropize:
+        parser.error("--isotropize must be given when the mesh is compiled")
+    if args.preview and not args.preview.lower().endswith(PREVIEW_FORMATS):
+        parser.error(f"--preview must end in {' or '.join(PREVIEW_FORMATS)}")
+    if args.profile:
+        PROFILER.start(trace_memory=args.profile_memory)
+        if args.cprofile:
+            profile_dir = os.path.dirname(os.path.abspath(args.profile))
+            PROFILER.add_hook(CProfileHook(profile_dir), args.cprofile)
+    try:
+        run_pipeline(args, options, options_dict)
+    finally:
+        if args.profile:
+            PROFILER.save(args.profile)
+            print(PROFILER.report())
+
+
+def run_pipeline(args, options: GlobalOptions, options_dict: dict[str, Any]):
+    file_ext = os.path.splitext(args.file)[1].lower()
+    with PROFILER.stage("parse"):
+        if file_ext == ".npz":
+            polyhedron = load_compiled(args.file, options_dict)
+            options = polyhedron.options
+        elif file_ext == ".stl":
+            polyhedron = parse_stl(args.file, options)
+        elif file_ext == ".obj":
+            polyhedron = parse_obj(args.file, options)
+        else:
+            raise ValueError(
+                f"Unsupported file format: {file_ext}. "
+                "Use .stl, .obj or a compiled .npz"
+            )
 
     if args.isotropize:
         polyhedron.isotropize()
+    if args.compile:
+        with PROFILER.stage("compile"):
+            save_compiled(polyhedron, args.compile)
+        print(f"Compiled {polyhedron.name} to {args.compile}")
+        return
+    if args.preview:
+        with PROFILER.stage("preview"):
+            AssemblyPreview(polyhedron, options).save(args.preview)
+        print(f"Wrote the {polyhedron.name} assembly preview to {args.preview}")
+        return
     call_openscad(polyhedron, options, args.generate_outputs, args.output_dir)
 
 